@@ -0,0 +1,344 @@
+"""Benchmark suite for the DisplayPad driver and library. Runs without hardware.
+
+Usage:
+    python benchmarks/run.py                      # run everything, print a table
+    python benchmarks/run.py -o bench.json        # also write machine-readable results
+    python benchmarks/run.py --compare old.json   # show change against a previous run
+    python benchmarks/run.py --quick -k encode    # fewer iterations, only matching benchmarks
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+from unittest import mock
+
+from standin import StandInDriver
+
+import PIL
+from PIL import Image, ImageDraw
+
+import displaypad_driver
+import displaypad_lib
+from displaypad_driver import ColorCalibration, ICON_SIZE, NUM_KEYS
+from displaypad_driver.image import image_to_bgr102, split_image_to_tiles, split_gif_to_tiles, load_gif_frames
+from displaypad_lib import DisplayPad, GifKey, KeyContext, LabelKey, PreparedImage
+from displaypad_lib import displaypad as displaypad_module
+from displaypad_lib.clock import AnimationClock
+
+BENCHMARKS: Dict[str, Callable[[bool], dict]] = {}
+FIXTURE_DIR = tempfile.TemporaryDirectory(prefix="displaypad-bench-")
+
+
+def benchmark(name: str):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def measure(fn: Callable[[], object], number: int, repeat: int = 5, unit: str = "op") -> dict:
+    """Time fn over `repeat` rounds of `number` calls; report per-call seconds and throughput."""
+    fn()  # warm up caches, fonts and lazy imports
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    best = min(rounds)
+    return {
+        'unit': unit,
+        'min_s': best,
+        'median_s': statistics.median(rounds),
+        'mean_s': statistics.fmean(rounds),
+        'per_second': 1.0 / best if best > 0 else float("inf"),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+# --- Fixtures ---
+
+def make_panel_image() -> Image.Image:
+    img = Image.new("RGB", (612, 204))
+    draw = ImageDraw.Draw(img)
+    for x in range(0, 612, 12):
+        draw.rectangle([x, 0, x + 5, 204], fill=(x % 256, 80, 255 - x % 256))
+    return img
+
+
+def make_gif(size=(612, 204), frames: int = 10) -> str:
+    """Write a synthetic animated GIF and return its path (copies of opened GIFs lose their frames)."""
+    images = []
+    for i in range(frames):
+        img = Image.new("RGB", size, (0, 0, 0))
+        ImageDraw.Draw(img).ellipse([i * 8, 10, i * 8 + 60, 70], fill=(255, 200, 0))
+        images.append(img)
+    path = os.path.join(FIXTURE_DIR.name, f"{size[0]}x{size[1]}_{frames}.gif")
+    images[0].save(path, format="GIF", save_all=True, append_images=images[1:], duration=40, loop=0)
+    return path
+
+
+def make_icon() -> Image.Image:
+    icon = Image.new("RGBA", (82, 82), (0, 0, 0, 0))
+    ImageDraw.Draw(icon).ellipse([0, 0, 81, 81], fill=(30, 144, 255, 255))
+    return icon
+
+
+def make_pad() -> DisplayPad:
+    with mock.patch.object(displaypad_module, "Driver", StandInDriver):
+        return DisplayPad()
+
+
+# --- Driver encoding ---
+
+@benchmark("encode.image_to_bgr102.tile")
+def bench_encode_tile(quick: bool) -> dict:
+    tile = make_panel_image().crop((0, 0, ICON_SIZE, ICON_SIZE))
+    return measure(lambda: image_to_bgr102(tile), 200 if quick else 2000, unit="tile")
+
+
+@benchmark("encode.image_to_bgr102.resize")
+def bench_encode_resize(quick: bool) -> dict:
+    src = make_panel_image().resize((300, 300))
+    return measure(lambda: image_to_bgr102(src), 20 if quick else 200, unit="tile")
+
+
+@benchmark("encode.split_image_to_tiles")
+def bench_split_panel(quick: bool) -> dict:
+    panel = make_panel_image()
+    return measure(lambda: split_image_to_tiles(panel), 20 if quick else 200, unit="panel")
+
+
+@benchmark("encode.split_gif_to_tiles")
+def bench_split_gif(quick: bool) -> dict:
+    path = make_gif()
+    return measure(lambda: split_gif_to_tiles(path), 2 if quick else 10, unit="gif")
+
+
+@benchmark("encode.load_gif_frames")
+def bench_load_gif_frames(quick: bool) -> dict:
+    path = make_gif(size=(ICON_SIZE, ICON_SIZE))
+    return measure(lambda: load_gif_frames(path), 5 if quick else 50, unit="gif")
+
+
+@benchmark("encode.calibration")
+def bench_calibration(quick: bool) -> dict:
+    bgr = image_to_bgr102(make_panel_image().crop((0, 0, ICON_SIZE, ICON_SIZE)))
+    calibration = ColorCalibration(gamma=1.1, white_point=(255, 240, 225))
+    return measure(lambda: calibration.apply(bgr), 200 if quick else 2000, unit="tile")
+
+
+# --- KeyContext drawing ---
+
+@benchmark("keycontext.center_text")
+def bench_center_text(quick: bool) -> dict:
+    ctx = KeyContext(width=ICON_SIZE, height=ICON_SIZE)
+    return measure(lambda: ctx.center_text("Volume 42"), 100 if quick else 1000, unit="call")
+
+
+@benchmark("keycontext.paste_image")
+def bench_paste_image(quick: bool) -> dict:
+    ctx = KeyContext(width=ICON_SIZE, height=ICON_SIZE)
+    icon = make_icon()
+    return measure(lambda: ctx.paste_image(icon, 10, 10), 200 if quick else 2000, unit="call")
+
+
+@benchmark("keycontext.paste_image.prepared")
+def bench_paste_prepared(quick: bool) -> dict:
+    ctx = KeyContext(width=ICON_SIZE, height=ICON_SIZE)
+    icon = PreparedImage(make_icon())
+    return measure(lambda: ctx.paste_image(icon, 10, 10), 200 if quick else 2000, unit="call")
+
+
+def _draw_icon(ctx: KeyContext, icon: Image.Image):
+    ctx.rounded_rectangle(0, 0, ICON_SIZE, ICON_SIZE, radius=12, fill=(40, 40, 60))
+    ctx.paste_image(icon, 10, 4)
+    ctx.center_text("Inbox", y=84)
+
+
+def _draw_badge(ctx: KeyContext, count: int):
+    ctx.ellipse(66, 4, 32, 32, fill="red")
+    ctx.center_text(str(count % 100), y=10)
+
+
+@benchmark("keycontext.icon_badge.direct")
+def bench_icon_badge_direct(quick: bool) -> dict:
+    ctx = KeyContext(width=ICON_SIZE, height=ICON_SIZE)
+    icon = make_icon()
+    counter = iter(range(10 ** 9))
+
+    def render():
+        ctx.reset()
+        _draw_icon(ctx, icon)
+        _draw_badge(ctx, next(counter))
+    return measure(render, 100 if quick else 1000, unit="render")
+
+
+@benchmark("keycontext.icon_badge.layers")
+def bench_icon_badge_layers(quick: bool) -> dict:
+    ctx = KeyContext(width=ICON_SIZE, height=ICON_SIZE)
+    icon = make_icon()
+    counter = iter(range(10 ** 9))
+
+    def render():
+        count = next(counter)
+        ctx.reset()
+        ctx.layer("icon", lambda c: _draw_icon(c, icon))
+        ctx.layer("badge", lambda c: _draw_badge(c, count), state=count)
+    return measure(render, 100 if quick else 1000, unit="render")
+
+
+# --- Library update loop ---
+
+def _tick_cost(pad: DisplayPad, quick: bool) -> dict:
+    pad.update(0)  # initial full sync
+    try:
+        return measure(lambda: pad.update(0), 20 if quick else 200, unit="tick")
+    finally:
+        pad.disable()
+
+
+@benchmark("update.static_12_keys")
+def bench_update_static(quick: bool) -> dict:
+    pad = make_pad()
+    for idx in range(NUM_KEYS):
+        pad[idx] = LabelKey(f"Key {idx}")
+    return _tick_cost(pad, quick)
+
+
+@benchmark("update.animated_12_keys")
+def bench_update_animated(quick: bool) -> dict:
+    pad = make_pad()
+    path = make_gif(size=(ICON_SIZE, ICON_SIZE), frames=8)
+    now = [0.0]
+    clock = AnimationClock(lambda: now[0])
+    keys = []
+    for idx in range(NUM_KEYS):
+        key = GifKey(path, clock=clock)
+        pad[idx] = key
+        keys.append(key)
+
+    def advance_all():
+        # Move the shared clock to the next frame so each tick renders 12 tiles
+        now[0] += keys[0].frames[keys[0].current_frame_idx][1]
+
+    pad.update(0)
+
+    def tick():
+        advance_all()
+        pad.update(0)
+
+    try:
+        return measure(tick, 10 if quick else 100, unit="tick")
+    finally:
+        pad.disable()
+
+
+# --- End-to-end upload path ---
+
+@benchmark("upload.driver_upload_button")
+def bench_driver_upload(quick: bool) -> dict:
+    driver = StandInDriver()
+    tile = image_to_bgr102(make_panel_image())
+    counter = iter(range(10 ** 9))
+    return measure(lambda: driver.upload_button(next(counter) % NUM_KEYS, tile), 50 if quick else 500, unit="tile")
+
+
+@benchmark("upload.library_end_to_end")
+def bench_end_to_end(quick: bool) -> dict:
+    """Render and queue single-key redraws through update(); count tiles confirmed by the stand-in device."""
+    pad = make_pad()
+    keys = [LabelKey(f"{i}") for i in range(NUM_KEYS)]
+    for idx, key in enumerate(keys):
+        pad[idx] = key
+    pad.update(0)
+    usb = pad.driver.usb_dev
+    duration = 0.5 if quick else 3.0
+    start_tiles = usb.tiles_written
+    start = time.perf_counter()
+    i = 0
+    while time.perf_counter() - start < duration:
+        keys[i % NUM_KEYS].request_redraw()
+        keys[(i + 1) % NUM_KEYS].request_redraw()
+        pad.update(0)
+        i += 2
+    # Let the upload worker drain what was queued
+    while not pad._render_queue.empty() and time.perf_counter() - start < duration + 2.0:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    tiles = usb.tiles_written - start_tiles
+    pad.disable()
+    return {
+        'unit': "tile",
+        'tiles': tiles,
+        'seconds': elapsed,
+        'per_second': tiles / elapsed,
+        'min_s': elapsed / tiles if tiles else float("inf"),
+    }
+
+
+# --- Runner ---
+
+def environment() -> dict:
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'pillow': PIL.__version__,
+        'displaypad_driver': displaypad_driver.__version__,
+        'displaypad_lib': displaypad_lib.__version__,
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict]) -> List[str]:
+    lines = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old or not old.get('per_second'):
+            continue
+        change = (result['per_second'] / old['per_second'] - 1.0) * 100
+        lines.append(f"{name:<36} {old['per_second']:>12.1f} -> {result['per_second']:>12.1f} {result['unit']}/s ({change:+.1f}%)")
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations (smoke test)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, fn in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        result = fn(args.quick)
+        results[name] = result
+        print(f"{name:<36} {result['min_s'] * 1000:>10.3f} ms/{result['unit']:<6} {result['per_second']:>12.1f} {result['unit']}/s")
+
+    report = {'environment': environment(), 'quick': args.quick, 'results': results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        print()
+        print("\n".join(compare(results, baseline)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Hardware stand-in for benchmarks: fake HID/USB endpoints that speak the DisplayPad upload protocol."""
+
+import os
+import sys
+from collections import deque
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../packages/driver/src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../packages/library/src')))
+
+from displaypad_driver import DisplayPad as Driver, HEADER_SIZE, PACKET_SIZE
+
+READY_ACK = bytes([0x21, 0x00, 0x00]) + bytes(61)
+CONFIRM_ACK = bytes([0x21, 0x00, 0xFF]) + bytes(61)
+
+
+class StandInHid:
+    """Interface 3: answers image requests with a readiness ACK and payloads with a confirmation ACK."""
+
+    def __init__(self):
+        self.responses = deque()
+        self.nonblocking = False
+
+    def write(self, data: bytes):
+        if len(data) > 1 and data[1] == 0x21:
+            self.responses.append(READY_ACK)
+        return len(data)
+
+    def read(self, size: int, timeout: int = 0):
+        return self.responses.popleft() if self.responses else None
+
+    def close(self):
+        pass
+
+
+class StandInUsb:
+    """Interface 1: counts bulk pixel bytes and confirms each complete tile payload."""
+
+    def __init__(self, hid: StandInHid):
+        self.hid = hid
+        self.bytes_written = 0
+        self.tiles_written = 0
+        self._pending = 0
+
+    def write(self, endpoint: int, data: bytes, timeout: int = 1000):
+        self.bytes_written += len(data)
+        self._pending += len(data)
+        if self._pending >= HEADER_SIZE + PACKET_SIZE:
+            self._pending = 0
+            self.tiles_written += 1
+            self.hid.responses.append(CONFIRM_ACK)
+        return len(data)
+
+
+class StandInDriver(Driver):
+    """The real driver, wired to stand-in endpoints instead of USB."""
+
+    def connect(self):
+        with self._usb_lock:
+            self.hid_dev = StandInHid()
+            self.usb_dev = StandInUsb(self.hid_dev)
+            self.connected = True
+
+    def close(self):
+        with self._usb_lock:
+            self.connected = False
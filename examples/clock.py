@@ -7,6 +7,7 @@ from displaypad_lib import DisplayPad, Key
 from displaypad_lib.key import FramerateLimitedKey
 from PIL import ImageFont
 from datetime import datetime
+import time
 
 
 pad = DisplayPad()
@@ -25,6 +26,10 @@ class DateKey(Key):
             self.date_str = date_str
             self.request_redraw()
         return super().on_tick()
+
+    def next_wakeup(self):
+        # Only wake up on the next full second (covers minute/hour/day rollovers)
+        return int(time.time()) + 1
     
     def render(self, ctx):    
         ctx.fill("black")
@@ -40,8 +45,7 @@ pad[10] = DateKey(format="%Y")
 initial_screen_path = os.path.join(os.path.dirname(__file__), 'assets/initial_screen.png')
 
 try:
-    while True:
-        pad.update()
+    pad.run()
 except KeyboardInterrupt:
     pass
 finally:
@@ -1,10 +1,14 @@
-"""DisplayPad package exports."""
+"""DisplayPad package exports.
+
+Image helpers (which need Pillow) are imported on first access, so `import displaypad_driver`
+only loads the standard library; hidapi and PyUSB are imported when a device is opened.
+"""
+
+import importlib
 
 from .device import DisplayPad
-from .image import (
-    image_to_bgr102, split_image_to_tiles, split_gif_to_tiles,
-    load_gif_frames, make_label_icon, make_folder_icon
-)
+from .pack import AnimationPack, compile_pack, write_pack
+from .calibration import ColorCalibration
 from .exceptions import DisplayPadError, TransportError, DeviceNotFoundError
 from .protocol import (
     VID, PID, NUM_KEYS, KEYS_PER_ROW, ICON_SIZE, CHUNK_SIZE,
@@ -13,17 +17,45 @@ from .protocol import (
 
 __version__ = "1.2.0"
 
+_LAZY_EXPORTS = {
+    "image_to_bgr102": ".image",
+    "bgr102_to_image": ".image",
+    "split_image_to_tiles": ".image",
+    "split_gif_to_tiles": ".image",
+    "load_gif_frames": ".image",
+    "make_label_icon": ".image",
+    "make_folder_icon": ".image",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
 
 __all__ = [
     "__version__",
     "DisplayPad",
 
     "image_to_bgr102",
+    "bgr102_to_image",
     "split_image_to_tiles",
     "split_gif_to_tiles",
     "load_gif_frames",
     "make_label_icon",
     "make_folder_icon",
+    "AnimationPack",
+    "compile_pack",
+    "write_pack",
+    "ColorCalibration",
     "DisplayPadError",
     "TransportError",
     "DeviceNotFoundError",
@@ -0,0 +1,43 @@
+"""Command-line asset compiler for DisplayPad animation packs.
+
+    python -m displaypad_driver compile splash.png splash.dpak --kind panel
+    python -m displaypad_driver compile spinner.gif spinner.dpak --rotation 90
+    python -m displaypad_driver info spinner.dpak
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from .pack import KINDS, AnimationPack, compile_pack
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m displaypad_driver",
+                                     description="Compile images and GIFs into DisplayPad animation packs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_cmd = commands.add_parser("compile", help="compile an image or GIF into a .dpak file")
+    compile_cmd.add_argument("source")
+    compile_cmd.add_argument("output", nargs="?", help="defaults to the source name with .dpak")
+    compile_cmd.add_argument("--kind", choices=("auto",) + KINDS, default="auto")
+    compile_cmd.add_argument("--rotation", type=int, default=0, choices=(0, 90, 180, 270))
+
+    info_cmd = commands.add_parser("info", help="describe a .dpak file")
+    info_cmd.add_argument("pack")
+
+    args = parser.parse_args(argv)
+    if args.command == "compile":
+        output = args.output or os.path.splitext(args.source)[0] + ".dpak"
+        kind = compile_pack(args.source, output, kind=args.kind, rotation=args.rotation)
+        print(f"{args.source} -> {output} ({kind}, {os.path.getsize(output)} bytes)")
+    else:
+        with AnimationPack.open(args.pack) as pack:
+            print(f"{args.pack}: {pack.kind} pack, {pack.frame_count} frame(s), rotation {pack.rotation}, "
+                  f"{sum(pack.durations)} ms total")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Per-device color calibration applied to BGR payloads as lookup tables."""
+
+from typing import Callable, Dict, Optional, Sequence, Tuple, Union
+
+Curve = Union[Callable[[int], float], Sequence[int]]
+Channels = Tuple[float, float, float]
+
+
+class ColorCalibration:
+    """Gamma, white point and per-channel curves, precomputed into one 256-entry table per channel.
+
+    For each channel the value goes through `curves` (a callable or 256 values), then
+    gamma (`out = in ** gamma` on 0..1, so > 1 darkens mid-tones), then is scaled so
+    full white becomes `white_point`. All arguments take one value for all channels or
+    an (r, g, b) tuple.
+
+    `apply()` runs the tables over a BGR payload with `bytes.translate`: one C pass when
+    all channels share a table, one per channel over strided slices otherwise (well
+    under 0.1 ms per tile, against milliseconds for the USB transfer).
+
+    Example:
+        DisplayPad(calibration=ColorCalibration(gamma=1.1, white_point=(255, 240, 225)))
+    """
+
+    def __init__(self, gamma: Union[float, Channels] = 1.0,
+                 white_point: Union[int, Tuple[int, int, int]] = 255,
+                 curves: Optional[Union[Curve, Tuple[Curve, Curve, Curve]]] = None):
+        self.gamma = _per_channel(gamma)
+        self.white_point = _per_channel(white_point)
+        if curves is None or callable(curves) or (len(curves) == 256 and isinstance(curves[0], int)):
+            self.curves = (curves, curves, curves)
+        else:
+            self.curves = tuple(curves)
+        if any(g <= 0 for g in self.gamma):
+            raise ValueError(f"gamma must be positive, got {gamma}")
+
+        self.tables = tuple(_build_table(curve, g, white)
+                            for curve, g, white in zip(self.curves, self.gamma, self.white_point))
+        r, g, b = self.tables
+        self.is_identity = self.tables == (_IDENTITY, _IDENTITY, _IDENTITY)
+        self._shared = bytes(r) if r == g == b else None
+        self._bgr_tables = (bytes(b), bytes(g), bytes(r))  # Payload channel order
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "ColorCalibration":
+        """Build from a config mapping with optional "gamma", "white_point" and "curves" (value lists)."""
+        curves = config.get("curves")
+        return cls(
+            gamma=_tuple(config.get("gamma", 1.0)),
+            white_point=_tuple(config.get("white_point", 255)),
+            curves=tuple(curves) if curves and isinstance(curves[0], list) else curves,
+        )
+
+    def apply(self, bgr_pixels: bytes) -> bytes:
+        """Return the calibrated copy of a BGR payload (the payload itself if nothing changes)."""
+        if self.is_identity:
+            return bgr_pixels
+        data = bytes(bgr_pixels)
+        if self._shared is not None:
+            return data.translate(self._shared)
+        out = bytearray(len(data))
+        for channel, table in enumerate(self._bgr_tables):
+            out[channel::3] = data[channel::3].translate(table)
+        return bytes(out)
+
+    def __repr__(self):
+        return f"ColorCalibration(gamma={self.gamma}, white_point={self.white_point})"
+
+
+_IDENTITY = list(range(256))
+
+
+def _per_channel(value) -> Channels:
+    if isinstance(value, (int, float)):
+        return (value, value, value)
+    if len(value) != 3:
+        raise ValueError(f"Expected one value or an (r, g, b) triple, got {value!r}")
+    return tuple(value)
+
+
+def _tuple(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _build_table(curve: Optional[Curve], gamma: float, white: float) -> list:
+    if curve is None:
+        values = range(256)
+    elif callable(curve):
+        values = [curve(i) for i in range(256)]
+    else:
+        if len(curve) != 256:
+            raise ValueError(f"A curve table needs 256 entries, got {len(curve)}")
+        values = curve
+    table = []
+    for v in values:
+        v = min(max(v, 0), 255) / 255.0
+        table.append(int(round(min(max(v ** gamma * white, 0), 255))))
+    return table
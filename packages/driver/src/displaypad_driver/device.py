@@ -3,9 +3,11 @@
 import logging
 import threading
 import time
+from contextlib import contextmanager
 from typing import List, Dict, Optional, Tuple, Set
 
 
+from .calibration import ColorCalibration
 from .exceptions import DisplayPadError, TransportError, DeviceNotFoundError
 from .protocol import (
     VID, PID, NUM_KEYS, ICON_SIZE, CHUNK_SIZE, HEADER_SIZE, PACKET_SIZE,
@@ -19,21 +21,38 @@ log = logging.getLogger(__name__)
 class DisplayPad:
     """Object representing the DisplayPad device.
 
+    `calibration` (a `ColorCalibration`) corrects the colors of every uploaded payload,
+    whoever encoded it; it can be changed at any time.
+
     Example:
         with DisplayPad() as d:
             d.set_brightness(50)
             d.upload_button(0, bgr_data)
     """
 
-    def __init__(self, vendor_id: int = VID, product_id: int = PID):
+    def __init__(self, vendor_id: int = VID, product_id: int = PID,
+                 calibration: Optional[ColorCalibration] = None):
         self.vendor_id = vendor_id
         self.product_id = product_id
+        self.calibration = calibration
         self.usb_dev = None
         self.hid_dev = None
         self.pressed_keys: Set[int] = set()
         self.connected = False
         self._usb_lock = threading.Lock()
-        self._pending_key_packets: List[bytes] = []
+        # Tile uploads in progress (see fade_to); the HID read of poll_key also holds _usb_lock
+        self._uploads = 0
+        self._uploads_lock = threading.Lock()
+
+        # Brightness state: last value written, latest requested value and fade worker
+        self.brightness: Optional[int] = None
+        self._brightness_lock = threading.Lock()
+        self._brightness_pending: Optional[int] = None
+        self._brightness_writing = False
+        self._fade_cancel = threading.Event()
+        self._fade_thread: Optional[threading.Thread] = None
+
+        self._pending_key_packets: List[Tuple[bytes, float]] = []  # (report, perf_counter read time)
 
         self.connect()
 
@@ -45,10 +64,12 @@ class DisplayPad:
 
             self.usb_dev, self.hid_dev = open_interfaces()
             self._init_device()
+            self.brightness = None  # Unknown until the first write after (re)connecting
             self.connected = True
 
     def close(self):
         """Close USB interfaces and release resources."""
+        self._fade_cancel.set()
         with self._usb_lock:
             if self.connected:
                 close_interfaces(self.usb_dev, self.hid_dev)
@@ -97,12 +118,84 @@ class DisplayPad:
             raise DisplayPadError("DisplayPad did not respond to INIT handshake")
 
     def set_brightness(self, percent: int = 100):
-        """Set DisplayPad backlight brightness. percent: 0 to 100."""
+        """Set DisplayPad backlight brightness. percent: 0 to 100.
+
+        Writes are skipped if the value is unchanged. Calls arriving while another thread is
+        writing are coalesced: only the latest value is sent. Cancels a running `fade_to`.
+        """
+        self._fade_cancel.set()
+        self._request_brightness(percent)
+
+    def fade_to(self, percent: int, duration: float = 1.0, step_interval: float = 0.03) -> threading.Event:
+        """Fade the backlight to percent over duration seconds on a background thread.
+
+        Steps whose time comes while a tile upload is in progress are skipped, so
+        fades never delay key images; the final value is always written. A new fade or
+        `set_brightness` cancels a running fade. Returns an Event set when the fade ends.
+        """
+        percent = max(0, min(100, int(percent)))
+        self._fade_cancel.set()
+        if self._fade_thread is not None and self._fade_thread is not threading.current_thread():
+            self._fade_thread.join()
+        self._fade_cancel = cancel = threading.Event()
+        done = threading.Event()
+        self._fade_thread = threading.Thread(target=self._fade_loop,
+                                             args=(percent, duration, step_interval, cancel, done),
+                                             name="displaypad-fade", daemon=True)
+        self._fade_thread.start()
+        return done
+
+    def _fade_loop(self, target: int, duration: float, step_interval: float,
+                   cancel: threading.Event, done: threading.Event):
+        try:
+            start_value = self.brightness if self.brightness is not None else 100
+            start = time.monotonic()
+            while not cancel.is_set():
+                progress = (time.monotonic() - start) / duration if duration > 0 else 1.0
+                if progress >= 1.0:
+                    self._request_brightness(target, cancel)
+                    return
+                if not self._uploads:  # Thin out steps while uploads are busy
+                    self._request_brightness(round(start_value + (target - start_value) * progress), cancel)
+                cancel.wait(step_interval)
+        except DisplayPadError as e:
+            log.warning("Brightness fade aborted: %s", e)
+        finally:
+            done.set()
+
+    def _request_brightness(self, percent: int, cancel: Optional[threading.Event] = None):
+        """Send a brightness value, coalescing concurrent requests (latest wins).
+
+        A fade passes its cancel event: once it is set, the fade's steps are ignored so a
+        late step cannot override a newer value.
+        """
+        percent = max(0, min(100, int(percent)))
+        with self._brightness_lock:
+            if cancel is not None and cancel.is_set():
+                return
+            self._brightness_pending = percent
+            if self._brightness_writing:
+                return  # The writing thread picks up the latest value when it finishes
+            self._brightness_writing = True
+        try:
+            while True:
+                with self._brightness_lock:
+                    value = self._brightness_pending
+                    self._brightness_pending = None
+                    if value is None or value == self.brightness:
+                        self._brightness_writing = False
+                        return
+                self._write_brightness(value)
+        except Exception:
+            with self._brightness_lock:
+                self._brightness_writing = False
+            raise
+
+    def _write_brightness(self, percent: int):
         with self._usb_lock:
             if not self.hid_dev:
                 raise DisplayPadError("Device not connected")
 
-            percent = max(0, min(100, int(percent)))
             buf = bytearray(64)
             buf[0] = 0x12
             buf[1] = 0x03
@@ -111,6 +204,17 @@ class DisplayPad:
                 self.hid_dev.write(bytes(buf))
             except Exception as e:
                 raise DisplayPadError(f"Failed to set brightness: {e}")
+            self.brightness = percent
+
+    @contextmanager
+    def _upload_activity(self):
+        with self._uploads_lock:
+            self._uploads += 1
+        try:
+            yield
+        finally:
+            with self._uploads_lock:
+                self._uploads -= 1
 
     def upload_button(self, key_index: int, bgr_pixels: bytes, key_events: Optional[list] = None):
         """Upload a 102x102 BGR image payload to a specific button (key_index 0..11).
@@ -120,8 +224,11 @@ class DisplayPad:
         """
         if not (0 <= key_index < NUM_KEYS):
             raise ValueError(f"key_index must be between 0 and {NUM_KEYS - 1}")
+        calibration = self.calibration
+        if calibration is not None:
+            bgr_pixels = calibration.apply(bgr_pixels)
 
-        with self._usb_lock:
+        with self._upload_activity(), self._usb_lock:
             if not self.usb_dev or not self.hid_dev:
                 raise DisplayPadError("Device not connected")
 
@@ -137,8 +244,8 @@ class DisplayPad:
                     break
                 if resp and len(resp) >= 48 and resp[0] == 0x01:
                     raw_evt = bytes(resp)
-                    if not self._pending_key_packets or self._pending_key_packets[-1] != raw_evt:
-                        self._pending_key_packets.append(raw_evt)
+                    if not self._pending_key_packets or self._pending_key_packets[-1][0] != raw_evt:
+                        self._pending_key_packets.append((raw_evt, time.perf_counter()))
                     if key_events is not None:
                         key_events.append(list(resp))
             else:
@@ -158,8 +265,8 @@ class DisplayPad:
                     return
                 if resp and len(resp) >= 48 and resp[0] == 0x01:
                     raw_evt = bytes(resp)
-                    if not self._pending_key_packets or self._pending_key_packets[-1] != raw_evt:
-                        self._pending_key_packets.append(raw_evt)
+                    if not self._pending_key_packets or self._pending_key_packets[-1][0] != raw_evt:
+                        self._pending_key_packets.append((raw_evt, time.perf_counter()))
                     if key_events is not None:
                         key_events.append(list(resp))
 
@@ -172,8 +279,9 @@ class DisplayPad:
         if len(tiles_bgr) != NUM_KEYS:
             raise ValueError(f"Expected {NUM_KEYS} BGR tile payloads, got {len(tiles_bgr)}")
 
-        for idx, bgr in enumerate(tiles_bgr):
-            self.upload_button(idx, bgr, key_events=key_events)
+        with self._upload_activity():  # Keeps fade steps out of the gaps between tiles
+            for idx, bgr in enumerate(tiles_bgr):
+                self.upload_button(idx, bgr, key_events=key_events)
 
     def read_raw_report(self, timeout: int = 150) -> Optional[bytes]:
         """Read a raw HID report from Interface 3."""
@@ -190,24 +298,29 @@ class DisplayPad:
     def poll_key(self, timeout: int = 150) -> Dict[str, List[int]]:
         """Poll for key events and return newly pressed, newly released, and current key lists.
 
-        Drains buffered key events captured during image updates first.
+        Drains buffered key events captured during image updates first. 'timestamp' is the
+        `time.perf_counter()` at which the report was read from the device (or the poll ended).
         """
         raw = None
         with self._usb_lock:
             if self._pending_key_packets:
-                raw = self._pending_key_packets.pop(0)
+                raw, read_at = self._pending_key_packets.pop(0)
             elif self.hid_dev:
                 try:
                     data = self.hid_dev.read(64, timeout=timeout)
                     raw = bytes(data) if data else None
                 except Exception as e:
                     log.debug("poll_key read failed: %s", e)
+                read_at = time.perf_counter()
+            else:
+                read_at = time.perf_counter()
 
         if not raw or len(raw) < 48 or raw[0] != 0x01:
             return {
                 'pressed': [],
                 'released': [],
-                'current': sorted(list(self.pressed_keys))
+                'current': sorted(list(self.pressed_keys)),
+                'timestamp': read_at
             }
 
         current_pressed = set(get_pressed_keys(raw))
@@ -218,5 +331,6 @@ class DisplayPad:
         return {
             'pressed': sorted(newly_pressed),
             'released': sorted(newly_released),
-            'current': sorted(list(current_pressed))
+            'current': sorted(list(current_pressed)),
+            'timestamp': read_at
         }
\ No newline at end of file
@@ -16,32 +16,48 @@ def _to_pil_image(image_input: Union[str, Image.Image]) -> Image.Image:
     return Image.open(image_input)
 
 
-def image_to_bgr102(image_input: Union[str, Image.Image], rotation: int = 0) -> bytes:
-    """Convert an image (file path or PIL Image) to 102x102 raw BGR bytes."""
-    img = _to_pil_image(image_input).convert("RGB").resize((ICON_SIZE, ICON_SIZE), Image.LANCZOS)
+def _encode_bgr(tile: Image.Image, rotation: int = 0) -> bytes:
+    """Rotate an RGB tile if needed and pack it as raw BGR bytes in a single pass."""
     if rotation:
-        img = img.rotate(-rotation, expand=False)  # PIL rotates CCW, hardware wants CW
-    r, g, b = img.split()
-    return Image.merge("RGB", (b, g, r)).tobytes()
+        tile = tile.rotate(-rotation, expand=False)  # PIL rotates CCW, hardware wants CW
+    return tile.tobytes("raw", "BGR")
+
+
+def bgr102_to_image(bgr_pixels: bytes, rotation: int = 0) -> Image.Image:
+    """Decode a 102x102 BGR payload back into an upright RGB image (inverse of image_to_bgr102)."""
+    tile = Image.frombuffer("RGB", (ICON_SIZE, ICON_SIZE), bgr_pixels, "raw", "BGR", 0, 1)
+    return tile.rotate(rotation, expand=False) if rotation else tile
+
+
+def image_to_bgr102(image_input: Union[str, Image.Image], rotation: int = 0) -> bytes:
+    """Convert an image (file path or PIL Image) to 102x102 raw BGR bytes.
+
+    RGB (or RGBX) images that are already 102x102 are encoded directly, without a copy or resize.
+    """
+    img = image_input if isinstance(image_input, Image.Image) else Image.open(image_input)
+    if img.mode not in ("RGB", "RGBX"):
+        img = img.convert("RGB")
+    if img.size != (ICON_SIZE, ICON_SIZE):
+        img = img.resize((ICON_SIZE, ICON_SIZE), Image.LANCZOS)
+    return _encode_bgr(img, rotation)
 
 
 def split_image_to_tiles(image_input: Union[str, Image.Image], rotation: int = 0) -> List[bytes]:
     """Split a full panel image (612x204 nominal grid) into 12 BGR102 tile byte payloads."""
     grid_w = ICON_SIZE * KEYS_PER_ROW
     grid_h = ICON_SIZE * (NUM_KEYS // KEYS_PER_ROW)
-    img = _to_pil_image(image_input).convert("RGB").resize((grid_w, grid_h), Image.LANCZOS)
+    img = image_input if isinstance(image_input, Image.Image) else Image.open(image_input)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != (grid_w, grid_h):
+        img = img.resize((grid_w, grid_h), Image.LANCZOS)
 
     tiles = []
     for idx in range(NUM_KEYS):
         row = idx // KEYS_PER_ROW
         col = idx % KEYS_PER_ROW
         x, y = col * ICON_SIZE, row * ICON_SIZE
-        tile = img.crop((x, y, x + ICON_SIZE, y + ICON_SIZE))
-        if rotation:
-            tile = tile.rotate(-rotation, expand=False)
-        r, g, b = tile.split()
-        bgr = Image.merge("RGB", (b, g, r)).tobytes()
-        tiles.append(bgr)
+        tiles.append(_encode_bgr(img.crop((x, y, x + ICON_SIZE, y + ICON_SIZE)), rotation))
 
     return tiles
 
@@ -65,11 +81,7 @@ def load_gif_frames(image_input: Union[str, Image.Image], rotation: int = 0) ->
             img.seek(i)
             duration = max(img.info.get('duration', 100), 20)
             frame = img.convert("RGB").resize((ICON_SIZE, ICON_SIZE), Image.LANCZOS)
-            if rotation:
-                frame = frame.rotate(-rotation, expand=False)
-            r, g, b = frame.split()
-            bgr = Image.merge("RGB", (b, g, r)).tobytes()
-            frames.append((bgr, duration))
+            frames.append((_encode_bgr(frame, rotation), duration))
     except EOFError:
         pass
 
@@ -79,6 +91,8 @@ def load_gif_frames(image_input: Union[str, Image.Image], rotation: int = 0) ->
 def split_gif_to_tiles(image_input: Union[str, Image.Image], rotation: int = 0) -> Optional[Dict[int, List[Tuple[bytes, int]]]]:
     """Split an animated GIF into 12 synchronized tile frame lists.
 
+    Identical tiles of a key share one bytes object, so static regions cost no extra memory.
+
     Returns:
         {key_idx: [(bgr_bytes, duration_ms), ...]} or None if not animated.
     """
@@ -92,6 +106,7 @@ def split_gif_to_tiles(image_input: Union[str, Image.Image], rotation: int = 0)
     grid_w = ICON_SIZE * KEYS_PER_ROW
     grid_h = ICON_SIZE * (NUM_KEYS // KEYS_PER_ROW)
     result = {k: [] for k in range(NUM_KEYS)}
+    seen: List[Dict[bytes, bytes]] = [{} for _ in range(NUM_KEYS)]
     try:
         for i in range(img.n_frames):
             img.seek(i)
@@ -102,10 +117,9 @@ def split_gif_to_tiles(image_input: Union[str, Image.Image], rotation: int = 0)
                 col = idx % KEYS_PER_ROW
                 x, y = col * ICON_SIZE, row * ICON_SIZE
                 tile = frame.crop((x, y, x + ICON_SIZE, y + ICON_SIZE))
-                if rotation:
-                    tile = tile.rotate(-rotation, expand=False)
-                r, g, b = tile.split()
-                result[idx].append((Image.merge("RGB", (b, g, r)).tobytes(), duration))
+                bgr = _encode_bgr(tile, rotation)
+                bgr = seen[idx].setdefault(bgr, bgr)
+                result[idx].append((bgr, duration))
     except EOFError:
         pass
 
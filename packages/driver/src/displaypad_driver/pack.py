@@ -0,0 +1,174 @@
+"""Precompiled animation packs (.dpak): device-ready BGR102 payloads loaded via mmap.
+
+Layout (little endian):
+    header     16 bytes: magic b"DPAK", version u8, kind u8 (0 = tile, 1 = panel),
+               rotation u16, frame count u32, tiles per frame u16, 2 reserved bytes
+    durations  frame count x u32 milliseconds
+    payloads   frame count x tiles per frame x 31212 bytes (102x102 BGR, rotation applied)
+
+Compile assets once (see `python -m displaypad_driver --help`), then play them
+without decoding or encoding.
+"""
+
+import mmap
+import os
+import struct
+from typing import TYPE_CHECKING, List, Optional, Sequence, Union
+
+from .exceptions import DisplayPadError
+from .protocol import ICON_SIZE, NUM_KEYS
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+PACK_MAGIC = b"DPAK"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<4sBBHIH2x")
+TILE_BYTES = ICON_SIZE * ICON_SIZE * 3
+KINDS = ("tile", "panel")
+STATIC_DURATION_MS = 0  # Single-frame packs never advance
+
+
+class AnimationPack:
+    """A memory-mapped .dpak file. Tiles are returned as zero-copy memoryviews of the mapping.
+
+    Example:
+        with AnimationPack.open("spinner.dpak") as pack:
+            for frame in range(pack.frame_count):
+                device.upload_button(0, pack.tile(frame))
+    """
+
+    def __init__(self, buffer, kind: str, rotation: int, durations: List[int], tiles_per_frame: int,
+                 data_offset: int, path: Optional[str] = None):
+        self.kind = kind
+        self.rotation = rotation
+        self.durations = durations
+        self.tiles_per_frame = tiles_per_frame
+        self.path = path
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._data_offset = data_offset
+
+    @classmethod
+    def open(cls, path: str) -> "AnimationPack":
+        """Map a .dpak file read-only; pages are loaded lazily by the OS and shared between processes."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls.from_buffer(buffer, path)
+        except Exception:
+            buffer.close()
+            raise
+
+    @classmethod
+    def from_buffer(cls, buffer, path: Optional[str] = None) -> "AnimationPack":
+        name = path or "buffer"
+        if len(buffer) < PACK_HEADER.size:
+            raise DisplayPadError(f"{name} is too short to be an animation pack")
+        magic, version, kind, rotation, frame_count, tiles_per_frame = PACK_HEADER.unpack_from(buffer, 0)
+        if magic != PACK_MAGIC:
+            raise DisplayPadError(f"{name} is not an animation pack")
+        if version != PACK_VERSION:
+            raise DisplayPadError(f"{name} has unsupported pack version {version}")
+        if kind >= len(KINDS) or tiles_per_frame not in (1, NUM_KEYS):
+            raise DisplayPadError(f"{name} has an invalid pack header")
+        durations = list(struct.unpack_from(f"<{frame_count}I", buffer, PACK_HEADER.size))
+        data_offset = PACK_HEADER.size + 4 * frame_count
+        if len(buffer) < data_offset + frame_count * tiles_per_frame * TILE_BYTES:
+            raise DisplayPadError(f"{name} is truncated")
+        return cls(buffer, KINDS[kind], rotation, durations, tiles_per_frame, data_offset, path)
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.durations)
+
+    @property
+    def is_animated(self) -> bool:
+        return self.frame_count > 1
+
+    def tile(self, frame: int, index: int = 0) -> memoryview:
+        """BGR payload of tile `index` (0 for tile packs, 0..11 for panel packs) of a frame."""
+        if not (0 <= index < self.tiles_per_frame):
+            raise IndexError(f"tile index {index} out of range (0..{self.tiles_per_frame - 1})")
+        start = self._data_offset + (frame * self.tiles_per_frame + index) * TILE_BYTES
+        return self._view[start:start + TILE_BYTES]
+
+    def frame(self, frame: int) -> List[memoryview]:
+        """All tile payloads of a frame."""
+        return [self.tile(frame, idx) for idx in range(self.tiles_per_frame)]
+
+    def close(self):
+        try:
+            self._view.release()
+            if isinstance(self._buffer, mmap.mmap):
+                self._buffer.close()
+        except BufferError:
+            pass  # Tiles are still referenced (e.g. queued uploads); the mapping goes away with them
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return (f"AnimationPack({self.path or 'buffer'!r}, kind={self.kind!r}, frames={self.frame_count}, "
+                f"rotation={self.rotation})")
+
+
+def write_pack(path: str, frames: Sequence[Sequence[bytes]], durations: Sequence[int],
+               kind: str = "tile", rotation: int = 0):
+    """Write frames of already encoded BGR102 tiles (1 per frame for "tile", 12 for "panel")."""
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {KINDS}, got {kind!r}")
+    if len(frames) != len(durations) or not frames:
+        raise ValueError("Need at least one frame and exactly one duration per frame")
+    tiles_per_frame = 1 if kind == "tile" else NUM_KEYS
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, KINDS.index(kind), rotation % 360,
+                                 len(frames), tiles_per_frame))
+        f.write(struct.pack(f"<{len(durations)}I", *durations))
+        for frame in frames:
+            if len(frame) != tiles_per_frame or any(len(tile) != TILE_BYTES for tile in frame):
+                raise ValueError(f"Each {kind} frame needs {tiles_per_frame} tiles of {TILE_BYTES} bytes")
+            for tile in frame:
+                f.write(tile)
+    os.replace(tmp_path, path)
+
+
+def compile_pack(source: Union[str, "Image.Image"], path: str, kind: str = "auto", rotation: int = 0) -> str:
+    """Compile an image or animated GIF into a .dpak file and return the kind used.
+
+    kind "auto" picks "panel" for wide images (the 3:1 panel layout) and "tile" otherwise.
+    """
+    # Imported here so playing packs never needs Pillow
+    from PIL import Image
+    from .image import image_to_bgr102, load_gif_frames, split_gif_to_tiles, split_image_to_tiles
+
+    img = Image.open(source) if isinstance(source, str) else source
+    if kind == "auto":
+        kind = "panel" if img.width >= 2 * img.height else "tile"
+    if kind not in KINDS:
+        raise ValueError(f"kind must be 'auto' or one of {KINDS}, got {kind!r}")
+
+    frames: List[List[bytes]]
+    if kind == "tile":
+        animated = load_gif_frames(source, rotation=rotation)
+        if animated:
+            frames = [[bgr] for bgr, _duration in animated]
+            durations = [duration for _bgr, duration in animated]
+        else:
+            frames = [[image_to_bgr102(img, rotation=rotation)]]
+            durations = [STATIC_DURATION_MS]
+    else:
+        animated = split_gif_to_tiles(source, rotation=rotation)
+        if animated:
+            frames = [[animated[idx][i][0] for idx in range(NUM_KEYS)] for i in range(len(animated[0]))]
+            durations = [duration for _bgr, duration in animated[0]]
+        else:
+            frames = [split_image_to_tiles(img, rotation=rotation)]
+            durations = [STATIC_DURATION_MS]
+
+    write_pack(path, frames, durations, kind=kind, rotation=rotation)
+    return kind
@@ -10,28 +10,40 @@ from .protocol import VID, PID
 
 log = getLogger(__name__)
 
-try:
-    import hid
-    HID_AVAILABLE = True
-except ImportError:
-    HID_AVAILABLE = False
+# hidapi and PyUSB are only imported when a device is opened (see _load_backends), so
+# importing the package stays cheap for code that never touches USB
+hid = None
+usb = None
+HID_AVAILABLE: Optional[bool] = None  # None: not checked yet
+PYUSB_AVAILABLE: Optional[bool] = None
 
-try:
-    import usb.core
-    import usb.util
-    PYUSB_AVAILABLE = True
-except ImportError:
-    PYUSB_AVAILABLE = False
+
+def _load_backends():
+    global hid, usb, HID_AVAILABLE, PYUSB_AVAILABLE
+    if HID_AVAILABLE is None:
+        try:
+            import hid  # Binds the module global declared above
+            HID_AVAILABLE = True
+        except ImportError:
+            HID_AVAILABLE = False
+    if PYUSB_AVAILABLE is None:
+        try:
+            import usb.core
+            import usb.util
+            PYUSB_AVAILABLE = True
+        except ImportError:
+            PYUSB_AVAILABLE = False
 
 
 def check_dependencies():
+    _load_backends()
     if not HID_AVAILABLE:
         raise TransportError("hidapi is not installed (pip install hid)")
     if not PYUSB_AVAILABLE:
         raise TransportError("PyUSB is not installed (pip install pyusb)")
 
 
-def open_interfaces() -> Tuple[usb.core.Device, hid.Device]:
+def open_interfaces() -> "Tuple[usb.core.Device, hid.Device]":
     """Open PyUSB device (Interface 1 for pixel bulk data) and HID device (Interface 3 for commands/events)."""
     check_dependencies()
     gc.collect()
@@ -124,7 +136,7 @@ def init_handshake_ctrl(usb_dev):
                 pass
 
 
-def close_interfaces(usb_dev: Optional[usb.core.Device], hid_dev: Optional[hid.Device]):
+def close_interfaces(usb_dev: "Optional[usb.core.Device]", hid_dev: "Optional[hid.Device]"):
     """Release interfaces and dispose of USB resources cleanly."""
     if usb_dev is not None:
         try:
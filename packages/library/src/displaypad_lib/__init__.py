@@ -1,12 +1,61 @@
-"""DisplayPad Library Package"""
+"""DisplayPad Library Package
 
-from .displaypad import DisplayPad
-from .key import Key, FramerateLimitedKey, LoggerKey, IconKey, GifKey, LabelKey
-from .keycontext import KeyContext
-from .page import Page, PageManager
+Exports are imported on first access (`displaypad_lib.DisplayPad` loads Pillow, the
+driver and the render pipeline), so tools that only need e.g. `DisplayPadClient`
+start without paying for them.
+"""
+
+import importlib
 
 __version__ = "1.2.0"
 
+_LAZY_EXPORTS = {
+    'ActionExecutor': '.actions',
+    'background': '.actions',
+    'PanelAnimation': '.animation',
+    'AssetRegistry': '.assets',
+    'asset_registry': '.assets',
+    'PreparedImage': '.assets',
+    'AnimationClock': '.clock',
+    'FrameTimeline': '.clock',
+    'animation_clock': '.clock',
+    'DaemonError': '.client',
+    'DisplayPadClient': '.client',
+    'DisplayPadDaemon': '.daemon',
+    'DisplayPad': '.displaypad',
+    'SharedFramebuffer': '.framebuffer',
+    'Key': '.key',
+    'FramerateLimitedKey': '.key',
+    'LoggerKey': '.key',
+    'IconKey': '.key',
+    'GifKey': '.key',
+    'LabelKey': '.key',
+    'PackKey': '.key',
+    'KeyContext': '.keycontext',
+    'MediaKey': '.media',
+    'FrameRecorder': '.offscreen',
+    'OffscreenDriver': '.offscreen',
+    'read_raw_frames': '.offscreen',
+    'run_offscreen': '.offscreen',
+    'Page': '.page',
+    'PageManager': '.page',
+    'ProcessKey': '.process',
+    'PerfStats': '.stats',
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
 
 __all__ = [
     '__version__',
@@ -18,6 +67,27 @@ __all__ = [
     'IconKey',
     'GifKey',
     'LabelKey',
+    'PackKey',
+    'MediaKey',
+    'ProcessKey',
     'Page',
     'PageManager',
+    'PanelAnimation',
+    'AnimationClock',
+    'FrameTimeline',
+    'animation_clock',
+    'SharedFramebuffer',
+    'ActionExecutor',
+    'background',
+    'PerfStats',
+    'AssetRegistry',
+    'asset_registry',
+    'PreparedImage',
+    'DisplayPadDaemon',
+    'DisplayPadClient',
+    'DaemonError',
+    'OffscreenDriver',
+    'FrameRecorder',
+    'read_raw_frames',
+    'run_offscreen',
 ]
\ No newline at end of file
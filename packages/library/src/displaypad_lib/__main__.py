@@ -0,0 +1,5 @@
+"""`python -m displaypad_lib`: run the DisplayPad daemon."""
+
+from .daemon import main
+
+main()
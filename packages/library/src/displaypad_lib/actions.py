@@ -0,0 +1,141 @@
+"""Action executor running key event handlers on a bounded worker pool."""
+
+import asyncio
+import inspect
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from typing import Callable, Deque, Dict, Hashable, Optional
+
+log = getLogger(__name__)
+
+POLICIES = ("queue", "drop", "latest")
+
+
+def background(policy: str = "queue", max_pending: int = 4):
+    """Mark a key hook (e.g. `on_press`) to run on the pad's action executor.
+
+    Runs of handlers belonging to the same key never overlap. While one is running,
+    further calls follow `policy`:
+        - "queue": run afterwards, in order (at most `max_pending` waiting, extra calls are dropped)
+        - "drop": ignore the call
+        - "latest": keep only the most recent waiting call
+
+    Example:
+        class ShellKey(LabelKey):
+            @background(policy="drop")
+            def on_press(self):
+                subprocess.run(["make", "deploy"])
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+
+    def decorate(fn):
+        fn._displaypad_action = (policy, max_pending)
+        return fn
+
+    return decorate
+
+
+class HandlerTiming:
+    """Accumulated run statistics for one handler."""
+
+    def __init__(self):
+        self.calls = 0
+        self.dropped = 0
+        self.slow = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'calls': self.calls,
+            'dropped': self.dropped,
+            'slow': self.slow,
+            'avg_time': self.total_time / self.calls if self.calls else 0.0,
+            'max_time': self.max_time,
+        }
+
+
+class ActionExecutor:
+    """Bounded worker pool for key handlers with per-key serialization and drop/queue policies."""
+
+    def __init__(self, max_workers: int = 4, slow_threshold: float = 0.25):
+        self.slow_threshold = slow_threshold
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="displaypad-action")
+        self._lock = threading.Lock()
+        self._running: Dict[Hashable, bool] = {}
+        self._pending: Dict[Hashable, Deque[tuple]] = {}
+        self._timings: Dict[str, HandlerTiming] = {}
+
+    def submit(self, owner: Hashable, name: str, fn: Callable, *args,
+               policy: str = "queue", max_pending: int = 4) -> bool:
+        """Run fn(*args) on the pool, serialized with other calls for the same owner.
+
+        Returns False if the call was dropped by its policy.
+        """
+        call = (name, fn, args)
+        with self._lock:
+            if self._running.get(owner):
+                pending = self._pending.setdefault(owner, deque())
+                if policy == "drop" or (policy == "queue" and len(pending) >= max_pending):
+                    self._timing(name).dropped += 1
+                    return False
+                if policy == "latest":
+                    for dropped_name, _fn, _args in pending:
+                        self._timing(dropped_name).dropped += 1
+                    pending.clear()
+                pending.append(call)
+                return True
+            self._running[owner] = True
+        self._pool.submit(self._run_chain, owner, call)
+        return True
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Return per-handler timing statistics: calls, dropped, slow, avg_time and max_time (seconds)."""
+        with self._lock:
+            return {name: timing.as_dict() for name, timing in self._timings.items()}
+
+    def shutdown(self, wait: bool = False):
+        self._pool.shutdown(wait=wait)
+
+    def _timing(self, name: str) -> HandlerTiming:
+        timing = self._timings.get(name)
+        if timing is None:
+            timing = self._timings[name] = HandlerTiming()
+        return timing
+
+    def _run_chain(self, owner: Hashable, call: Optional[tuple]):
+        """Run a call, then keep draining the owner's pending calls on the same worker."""
+        while call is not None:
+            self._run_timed(*call)
+            with self._lock:
+                pending = self._pending.get(owner)
+                if pending:
+                    call = pending.popleft()
+                else:
+                    call = None
+                    self._pending.pop(owner, None)
+                    self._running.pop(owner, None)
+
+    def _run_timed(self, name: str, fn: Callable, args: tuple):
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+            if inspect.isawaitable(result):
+                asyncio.run(result)
+        except Exception as e:
+            log.error(f"Key action {name} failed: {e!r}")
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            timing = self._timing(name)
+            timing.calls += 1
+            timing.total_time += elapsed
+            timing.max_time = max(timing.max_time, elapsed)
+            if elapsed >= self.slow_threshold:
+                timing.slow += 1
+        if elapsed >= self.slow_threshold:
+            log.warning(f"Slow key action {name}: {elapsed * 1000:.0f} ms")
@@ -0,0 +1,93 @@
+"""Full-panel animations that only upload the tiles changing between frames."""
+
+from typing import FrozenSet, List, Optional, Sequence, Tuple, Union
+
+from PIL import Image
+
+from displaypad_driver import AnimationPack, NUM_KEYS
+from displaypad_driver.image import split_gif_to_tiles
+from .clock import MIN_FRAME_DURATION, FrameTimeline
+
+
+class PanelAnimation:
+    """A 612x204 animation stored as per-frame tile references.
+
+    Each frame holds 12 references to encoded tiles; a tile that did not change is the
+    same object as in the frame before, so it costs no memory. `changed[i]` lists the
+    tiles that differ from the previous frame (for frame 0: from the last frame, so loops
+    only upload what changes too).
+
+    Play it with `DisplayPad.play_animation(animation)`.
+    """
+
+    def __init__(self, frames: Sequence[Sequence[bytes]], durations: Sequence[float], rotation: int = 0):
+        if not frames or len(frames) != len(durations):
+            raise ValueError("Need at least one frame and exactly one duration per frame")
+        self.rotation = rotation
+        self.timeline = FrameTimeline(durations, MIN_FRAME_DURATION)
+        self.durations: List[float] = self.timeline.durations
+        self.frames: List[Tuple[bytes, ...]] = []
+        for frame in frames:
+            if len(frame) != NUM_KEYS:
+                raise ValueError(f"Each frame needs {NUM_KEYS} tiles, got {len(frame)}")
+            previous = self.frames[-1] if self.frames else None
+            # Keep the earlier object for unchanged tiles so duplicates can be released
+            self.frames.append(tuple(
+                previous[idx] if previous is not None and _same(previous[idx], tile) else tile
+                for idx, tile in enumerate(frame)
+            ))
+        self.changed: List[FrozenSet[int]] = [
+            frozenset(idx for idx in range(NUM_KEYS) if not _same(self.frames[i - 1][idx], self.frames[i][idx]))
+            for i in range(len(self.frames))
+        ]
+        self.total_duration = self.timeline.total_duration
+
+    @classmethod
+    def from_gif(cls, path: Union[str, Image.Image], rotation: int = 0) -> "PanelAnimation":
+        """Split an animated GIF (scaled to the panel) into deduplicated tile frames."""
+        tiles = split_gif_to_tiles(path, rotation=rotation)
+        if tiles is None:
+            raise ValueError(f"{path} is not an animated image")
+        frames = [[tiles[idx][i][0] for idx in range(NUM_KEYS)] for i in range(len(tiles[0]))]
+        durations = [duration / 1000.0 for _bgr, duration in tiles[0]]
+        return cls(frames, durations, rotation)
+
+    @classmethod
+    def from_pack(cls, pack: AnimationPack) -> "PanelAnimation":
+        """Use the frames of a panel pack in place (tiles stay memory-mapped)."""
+        if pack.kind != "panel":
+            raise ValueError(f"PanelAnimation needs a panel pack, got a {pack.kind} pack")
+        frames = [pack.frame(i) for i in range(pack.frame_count)]
+        return cls(frames, [d / 1000.0 for d in pack.durations], pack.rotation)
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames)
+
+    @property
+    def tile_bytes(self) -> int:
+        """Payload bytes actually held, counting each shared tile once."""
+        unique = {id(tile): len(tile) for frame in self.frames for tile in frame}
+        return sum(unique.values())
+
+    def frame_at(self, elapsed: float, loop: bool = True) -> Optional[int]:
+        """Absolute frame number (counting across loops) shown `elapsed` seconds in; None once finished."""
+        return self.timeline.frame_at(elapsed, loop)
+
+    def next_frame_time(self, frame: int) -> float:
+        """Offset in seconds (from the start) at which absolute frame `frame + 1` begins."""
+        return self.timeline.next_frame_time(frame)
+
+    def tiles_between(self, shown: Optional[int], frame: int) -> dict:
+        """{idx: tile} to upload to go from absolute frame `shown` (None: unknown) to `frame`."""
+        tiles = self.frames[frame % self.frame_count]
+        if shown is None or frame - shown >= self.frame_count:
+            return dict(enumerate(tiles))
+        changed = set()
+        for f in range(shown + 1, frame + 1):
+            changed |= self.changed[f % self.frame_count]
+        return {idx: tiles[idx] for idx in sorted(changed)}
+
+
+def _same(a, b) -> bool:
+    return a is b or a == b
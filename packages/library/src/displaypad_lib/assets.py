@@ -0,0 +1,232 @@
+"""Process-wide registry of prepared images shared between keys and pages."""
+
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple, TypeVar, Union
+
+from PIL import Image
+
+T = TypeVar("T")
+ImageSource = Union[str, Image.Image]
+
+
+class Frames(list):
+    """A list of prepared animation frames that can be shared through the registry."""
+
+
+def fit_size(size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """Size of an image scaled down to fit box, keeping its aspect ratio (smaller images keep theirs)."""
+    iw, ih = size
+    available_width, available_height = box
+    if iw <= available_width and ih <= available_height:
+        return size
+    aspect_ratio = iw / ih if ih > 0 else 1.0
+    if aspect_ratio > 1:
+        iw = available_width
+        ih = int(iw / aspect_ratio)
+    else:
+        ih = available_height
+        iw = int(ih * aspect_ratio)
+    return (max(1, iw), max(1, ih))
+
+
+class PreparedImage:
+    """An image scaled once for its target box and split into RGB plus an optional alpha mask.
+
+    `KeyContext.paste_image`, `IconKey` and `GifKey` accept it, and pasting it is a single
+    masked paste instead of converting the image to RGBA and back on every render. Fully
+    opaque images carry no mask. Treat it as read-only, like registry images.
+
+    Example:
+        icon = PreparedImage.fit(Image.open("mail.png"), (82, 82))
+        ctx.paste_image(icon, 10, 10)
+    """
+
+    def __init__(self, image: Image.Image, size: Optional[Tuple[int, int]] = None):
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        if size is not None and image.size != tuple(size):
+            image = image.resize(size, Image.LANCZOS)
+        self.mask: Optional[Image.Image] = None
+        if has_alpha:
+            alpha = image.getchannel("A")
+            if alpha.getextrema() != (255, 255):
+                self.mask = alpha
+            image = image.convert("RGB")
+        self.rgb = image
+
+    @classmethod
+    def fit(cls, image: Image.Image, box: Tuple[int, int]) -> "PreparedImage":
+        """Prepare image scaled down to fit box, keeping its aspect ratio (see `fit_size`)."""
+        return cls(image, fit_size(image.size, box))
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.rgb.size
+
+    @property
+    def width(self) -> int:
+        return self.rgb.width
+
+    @property
+    def height(self) -> int:
+        return self.rgb.height
+
+    @property
+    def nbytes(self) -> int:
+        return self.width * self.height * (4 if self.mask is not None else 3)
+
+
+def source_key(source: ImageSource) -> Hashable:
+    """Identify an image source: path + mtime + size for paths, a content hash for images.
+
+    Opened images are hashed too, as they may have been modified since they were loaded.
+    Every frame of an animated image is hashed together with its duration.
+    """
+    if isinstance(source, str):
+        st = os.stat(source)
+        return ("file", os.path.abspath(source), st.st_mtime_ns, st.st_size)
+    digest = hashlib.blake2b(digest_size=16)
+    n_frames = getattr(source, "n_frames", 1)
+    position = source.tell() if n_frames > 1 else 0
+    try:
+        for frame in range(n_frames):
+            if n_frames > 1:
+                source.seek(frame)
+                digest.update(str(source.info.get("duration", 0)).encode())
+            digest.update(source.tobytes())
+            palette = source.getpalette()
+            if palette:
+                digest.update(bytes(palette))
+    finally:
+        if n_frames > 1:
+            source.seek(position)
+    return ("image", source.mode, source.size, n_frames, digest.hexdigest())
+
+
+def asset_bytes(value) -> int:
+    """Approximate memory held by an image or a list of (image, ...) frames."""
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    if isinstance(value, PreparedImage):
+        return value.nbytes
+    if isinstance(value, list):
+        return sum(asset_bytes(item[0] if isinstance(item, tuple) else item) for item in value)
+    return 0
+
+
+class AssetRegistry:
+    """Cache of decoded/converted images, keyed by source identity plus conversion parameters.
+
+    Values are held weakly: an entry lives while any key uses it, and the most recently
+    requested entries are also kept in a small LRU (`retain_bytes`, in-use entries
+    included) so pages that come and go do not decode their icons again. Returned images are shared: treat them as read-only and copy
+    before drawing on them.
+
+    Example:
+        icon = asset_registry.image("icons/back.png")  # same object for every key
+    """
+
+    def __init__(self, retain_bytes: int = 16 * 1024 * 1024):
+        self.retain_bytes = retain_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()  # Finalizers may run from GC while it is held
+        self._entries: "weakref.WeakValueDictionary[Hashable, object]" = weakref.WeakValueDictionary()
+        self._sizes: Dict[Hashable, int] = {}
+        self._retained: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._retained_bytes = 0
+
+    def get(self, key: Hashable, build: Callable[[], T]) -> T:
+        """Return the shared value for key, calling build() to create it if missing."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self.hits += 1
+                self._retain(key, value)
+                return value
+            self.misses += 1
+
+        value = build()
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:  # Built concurrently by another thread
+                return existing
+            self._entries[key] = value
+            self._sizes[key] = asset_bytes(value)
+            weakref.finalize(value, self._forget, key)
+            self._retain(key, value)
+        return value
+
+    def image(self, source: ImageSource, mode: str = "RGBA", key: Optional[Hashable] = None) -> Image.Image:
+        """Shared copy of an image file or PIL image converted to mode."""
+        key = key if key is not None else source_key(source)
+
+        def build():
+            if isinstance(source, str):
+                with Image.open(source) as img:
+                    return img.convert(mode)
+            return source.convert(mode)
+
+        return self.get((key, "convert", mode), build)
+
+    def resized(self, source: ImageSource, size: Tuple[int, int], mode: str = "RGBA",
+                key: Optional[Hashable] = None) -> Image.Image:
+        """Shared copy converted to mode and resized (LANCZOS) to size."""
+        key = key if key is not None else source_key(source)
+        base = self.image(source, mode, key)
+        if base.size == tuple(size):
+            return base
+        return self.get((key, "resize", mode, tuple(size)), lambda: base.resize(size, Image.LANCZOS))
+
+    def prepared(self, source: ImageSource, box: Optional[Tuple[int, int]] = None,
+                 key: Optional[Hashable] = None) -> PreparedImage:
+        """Shared PreparedImage of source, scaled down to fit box (None: at its own size)."""
+        key = key if key is not None else source_key(source)
+        base = self.image(source, "RGBA", key)
+        size = base.size if box is None else fit_size(base.size, box)
+        return self.get((key, "prepared", size), lambda: PreparedImage(base, size))
+
+    def report(self) -> dict:
+        """Memory use: live and retained entries, their bytes, and the hit/miss counts."""
+        with self._lock:
+            return {
+                'entries': len(self._sizes),
+                'bytes': sum(self._sizes.values()),
+                'retained_entries': len(self._retained),
+                'retained_bytes': self._retained_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def evict(self):
+        """Drop all retained entries; values stay only as long as keys still use them."""
+        with self._lock:
+            self._retained.clear()
+            self._retained_bytes = 0
+
+    def _retain(self, key: Hashable, value):
+        if key in self._retained:
+            self._retained.move_to_end(key)
+            return
+        size = self._sizes.get(key, 0)
+        if size > self.retain_bytes:
+            return
+        self._retained[key] = value
+        self._retained_bytes += size
+        while self._retained_bytes > self.retain_bytes:
+            old_key, _value = self._retained.popitem(last=False)
+            self._retained_bytes -= self._sizes.get(old_key, 0)
+
+    def _forget(self, key: Hashable):
+        with self._lock:
+            # The dead weakref may still be listed; only keep the size if the key was rebuilt
+            if self._entries.get(key) is None:
+                self._sizes.pop(key, None)
+
+
+# Registry shared by all keys of the process
+asset_registry = AssetRegistry()
@@ -0,0 +1,212 @@
+"""Client for the DisplayPad daemon (`displaypad-daemon`) and its UNIX-socket protocol.
+
+Each message is a 12-byte header (magic b"DPD1", JSON length u32, payload length u32,
+little endian), a UTF-8 JSON object, and an optional binary payload that operations
+reference by offset/length. Requests carry an `id` and a list of `ops`, applied in order
+as one batch; the daemon answers `{"id": ..., "ok": true}` or `{"id": ..., "error": "..."}`.
+Subscribed clients also receive `{"event": "press", "slot": 3}` messages.
+
+This module only needs the standard library (Pillow for `set_image` with PIL images),
+so short-lived scripts can draw on the pad without opening the device.
+
+Example:
+    with DisplayPadClient() as pad:
+        with pad.batch():
+            pad.set_label(0, "Build", bg="darkgreen")
+            pad.set_image(1, "icons/deploy.png")
+"""
+
+import io
+import json
+import os
+import socket
+import struct
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+MESSAGE_MAGIC = b"DPD1"
+MESSAGE_HEADER = struct.Struct("<4sII")
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+EVENTS = ("press", "release", "double_press", "long_press")
+
+
+class DaemonError(Exception):
+    """Raised when the daemon rejects a request or the connection breaks."""
+
+
+def default_socket_path() -> str:
+    """$DISPLAYPAD_SOCKET, else displaypad.sock in $XDG_RUNTIME_DIR or /tmp (per user)."""
+    path = os.environ.get("DISPLAYPAD_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "displaypad.sock")
+    return f"/tmp/displaypad-{os.getuid()}.sock"
+
+
+def send_message(sock: socket.socket, message: dict, payload: bytes = b""):
+    body = json.dumps(message, separators=(",", ":")).encode()
+    sock.sendall(MESSAGE_HEADER.pack(MESSAGE_MAGIC, len(body), len(payload)) + body + bytes(payload))
+
+
+def recv_message(sock: socket.socket) -> Optional[Tuple[dict, bytes]]:
+    """Read one (message, payload) pair; None if the peer closed the connection."""
+    header = _recv_exact(sock, MESSAGE_HEADER.size)
+    if header is None:
+        return None
+    magic, body_len, payload_len = MESSAGE_HEADER.unpack(header)
+    if magic != MESSAGE_MAGIC or body_len + payload_len > MAX_MESSAGE_BYTES:
+        raise DaemonError("Malformed message header")
+    body = _recv_exact(sock, body_len)
+    payload = _recv_exact(sock, payload_len) if payload_len else b""
+    if body is None or payload is None:
+        raise DaemonError("Connection closed mid-message")
+    return json.loads(body), payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            if buf:
+                raise DaemonError("Connection closed mid-message")
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+class DisplayPadClient:
+    """Connection to a running DisplayPad daemon.
+
+    Every call is one request unless it is made inside `batch()`, which sends all
+    operations as a single message once the block ends.
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = 5.0):
+        self.path = path or default_socket_path()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(self.path)
+        except OSError as e:
+            self._sock.close()
+            raise DaemonError(f"Cannot connect to the DisplayPad daemon at {self.path}: {e}") from e
+        self._next_id = 1
+        self._events: deque = deque()
+        self._batch: Optional[Tuple[List[dict], bytearray]] = None
+
+    # --- Operations ---
+
+    def set_tile(self, slot: int, bgr: bytes):
+        """Show a ready 102x102 BGR payload (as produced by `image_to_bgr102` for the daemon's rotation)."""
+        self._op({"op": "tile", "slot": slot}, bgr)
+
+    def set_label(self, slot: int, text: str, bg: str = "navy", fg: str = "white", font_size: int = 18):
+        self._op({"op": "label", "slot": slot, "text": text, "bg": bg, "fg": fg, "font_size": font_size})
+
+    def set_image(self, slot: int, image, margin: int = 0):
+        """Show an image file (path or bytes of any format Pillow reads) or a PIL image, fitted to the key."""
+        if isinstance(image, str):
+            with open(image, "rb") as f:
+                data = f.read()
+        elif isinstance(image, (bytes, bytearray, memoryview)):
+            data = bytes(image)
+        else:
+            buf = io.BytesIO()
+            image.save(buf, format="PNG")
+            data = buf.getvalue()
+        self._op({"op": "image", "slot": slot, "margin": margin}, data)
+
+    def clear(self, slot: Optional[int] = None):
+        """Blank one slot, or all of them."""
+        self._op({"op": "clear"} if slot is None else {"op": "clear", "slot": slot})
+
+    def set_brightness(self, percent: int):
+        self._op({"op": "brightness", "percent": percent})
+
+    def subscribe(self, events: Tuple[str, ...] = EVENTS):
+        """Receive key events on this connection; read them with `next_event()` or `events()`."""
+        self._op({"op": "subscribe", "events": list(events)})
+
+    @contextmanager
+    def batch(self):
+        """Collect the operations of the block and send them as one message."""
+        if self._batch is not None:
+            yield self
+            return
+        self._batch = ([], bytearray())
+        try:
+            yield self
+            ops, payload = self._batch
+        finally:
+            self._batch = None
+        if ops:
+            self._request(ops, payload)
+
+    # --- Events ---
+
+    def next_event(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Return the next key event ({"event": "press", "slot": 3}), or None on timeout."""
+        if self._events:
+            return self._events.popleft()
+        previous = self._sock.gettimeout()
+        self._sock.settimeout(timeout)
+        try:
+            while not self._events:
+                self._read_one()
+        except socket.timeout:
+            return None
+        finally:
+            self._sock.settimeout(previous)
+        return self._events.popleft()
+
+    def events(self) -> Iterator[dict]:
+        """Yield key events forever (subscribe first)."""
+        while True:
+            yield self.next_event()
+
+    # --- Plumbing ---
+
+    def _op(self, op: dict, data: bytes = b""):
+        if self._batch is not None:
+            ops, payload = self._batch
+        else:
+            ops, payload = [], bytearray()
+        if data:
+            op["offset"], op["length"] = len(payload), len(data)
+            payload += data
+        ops.append(op)
+        if self._batch is None:
+            self._request(ops, payload)
+
+    def _request(self, ops: List[dict], payload: bytes):
+        request_id = self._next_id
+        self._next_id += 1
+        send_message(self._sock, {"id": request_id, "ops": ops}, payload)
+        while True:
+            message = self._read_one()
+            if message.get("id") == request_id:
+                if "error" in message:
+                    raise DaemonError(message["error"])
+                return
+
+    def _read_one(self) -> dict:
+        received = recv_message(self._sock)
+        if received is None:
+            raise DaemonError("The DisplayPad daemon closed the connection")
+        message, _payload = received
+        if "event" in message:
+            self._events.append(message)
+        return message
+
+    def close(self):
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,79 @@
+"""Monotonic animation clock that animated keys derive their frames from."""
+
+import bisect
+import time
+from typing import Callable, List, Optional, Sequence
+
+MIN_FRAME_DURATION = 0.02
+
+
+class FrameTimeline:
+    """Frame start offsets for a sequence of frame durations (seconds).
+
+    Frames are numbered absolutely, counting across loops: frame `n` shows image
+    `n % frame_count`.
+    """
+
+    def __init__(self, durations: Sequence[float], min_duration: float = MIN_FRAME_DURATION):
+        if not durations:
+            raise ValueError("A timeline needs at least one frame")
+        self.durations: List[float] = [max(d, min_duration) for d in durations]
+        self.starts: List[float] = []
+        total = 0.0
+        for duration in self.durations:
+            self.starts.append(total)
+            total += duration
+        self.total_duration = total
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.durations)
+
+    def frame_at(self, elapsed: float, loop: bool = True) -> Optional[int]:
+        """Absolute frame shown `elapsed` seconds in; None once a non-looping timeline finished."""
+        if elapsed < 0:
+            return 0
+        cycle, within = divmod(elapsed, self.total_duration)
+        if cycle and not loop:
+            return None
+        return int(cycle) * self.frame_count + bisect.bisect_right(self.starts, within) - 1
+
+    def next_frame_time(self, frame: int) -> float:
+        """Offset in seconds (from the start) at which absolute frame `frame + 1` begins."""
+        cycle, idx = divmod(frame, self.frame_count)
+        return cycle * self.total_duration + self.starts[idx] + self.durations[idx]
+
+
+class AnimationClock:
+    """Monotonic timebase shared by animated keys.
+
+    Keys look their frame up from the time elapsed on the clock instead of advancing one
+    frame per tick, so late ticks skip frames rather than slowing the animation down,
+    and lateness never accumulates. Animations started at the same clock time (by
+    default its epoch) stay in phase, on any page and however long they were hidden.
+    `wall_time()` converts a deadline to the `time.time()` base of `Key.next_wakeup`.
+
+    Example:
+        frame = animation_clock.frame(timeline)
+        wakeup = animation_clock.wall_time(timeline.next_frame_time(frame))
+    """
+
+    def __init__(self, time_fn: Callable[[], float] = time.monotonic):
+        self._time = time_fn
+        self.epoch = time_fn()
+
+    def elapsed(self) -> float:
+        """Seconds since the clock's epoch."""
+        return self._time() - self.epoch
+
+    def frame(self, timeline: FrameTimeline, start: float = 0.0) -> int:
+        """Absolute frame of a looping timeline started at clock time `start`."""
+        return timeline.frame_at(self.elapsed() - start)
+
+    def wall_time(self, offset: float) -> float:
+        """The `time.time()` at which the clock reaches `offset` seconds."""
+        return time.time() + (self.epoch + offset - self._time())
+
+
+# Clock shared by all animated keys of the process
+animation_clock = AnimationClock()
@@ -0,0 +1,328 @@
+"""Daemon that owns the DisplayPad and serves the client protocol over a UNIX socket.
+
+Run it with `displaypad-daemon` (or `python -m displaypad_lib`), then draw from any
+number of processes with `DisplayPadClient` without opening the device again.
+"""
+
+import argparse
+import io
+import logging
+import os
+import queue
+import socket
+import threading
+from logging import getLogger
+from typing import Dict, List, Optional, Set, Tuple
+
+from PIL import Image, ImageOps
+
+from displaypad_driver import DisplayPadError, ICON_SIZE, NUM_KEYS
+from displaypad_driver.image import bgr102_to_image
+from .client import EVENTS, default_socket_path, recv_message, send_message
+from .displaypad import DisplayPad
+from .key import Key
+from .keycontext import KeyContext, get_default_font
+
+log = getLogger(__name__)
+
+TILE_BYTES = ICON_SIZE * ICON_SIZE * 3
+# Events a client may fall behind by before it is disconnected
+EVENT_BACKLOG = 256
+
+
+class RemoteKey(Key):
+    """A slot whose content is set by daemon clients: an encoded tile, an image or a label."""
+
+    def __init__(self, daemon: "DisplayPadDaemon"):
+        super().__init__()
+        self.daemon = daemon
+        self.content: Optional[Tuple] = None  # ("tile", bgr) | ("image", img) | ("label", text, bg, fg, size)
+        self.version = 0
+
+    def set_content(self, content: Optional[Tuple]):
+        self.content = content
+        self.version += 1
+        self.request_redraw()
+
+    def render_state(self):
+        return self.version
+
+    def encoded_tile(self, rotation: int) -> Optional[bytes]:
+        content = self.content
+        if content is not None and content[0] == "tile" and rotation == self.daemon.pad.rotation:
+            return content[1]
+        return None
+
+    def render(self, ctx: KeyContext):
+        content = self.content
+        if content is None:
+            ctx.clear()
+        elif content[0] == "tile":
+            ctx.image.paste(bgr102_to_image(content[1], self.daemon.pad.rotation), (0, 0))
+        elif content[0] == "image":
+            ctx.image.paste(content[1], (0, 0))
+        else:
+            _kind, text, bg, fg, font_size = content
+            ctx.fill(bg)
+            ctx.center_text(text, color=fg, font=get_default_font(font_size))
+
+    def on_press(self):
+        self.daemon.broadcast("press", self.index)
+
+    def on_release(self):
+        self.daemon.broadcast("release", self.index)
+
+    def on_double_press(self):
+        self.daemon.broadcast("double_press", self.index)
+
+    def on_long_press(self):
+        self.daemon.broadcast("long_press", self.index)
+
+
+class _Client:
+    """A connection; key events are written by its own thread so a slow reader blocks nobody else."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.events: Set[str] = set()
+        self.send_lock = threading.Lock()
+        self._outbox: queue.Queue = queue.Queue(maxsize=EVENT_BACKLOG)
+        self._writer = threading.Thread(target=self._write_events, name="displaypad-daemon-events", daemon=True)
+        self._writer.start()
+
+    def send(self, message: dict):
+        with self.send_lock:
+            send_message(self.sock, message)
+
+    def post(self, message: dict) -> bool:
+        """Queue an event for the writer thread; False if the client stopped reading."""
+        try:
+            self._outbox.put_nowait(message)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)  # Also wakes a writer blocked in sendall
+        except OSError:
+            pass
+        self.sock.close()
+        try:
+            self._outbox.put_nowait(None)
+        except queue.Full:
+            pass  # The writer's next send fails and it exits
+
+    def _write_events(self):
+        while True:
+            message = self._outbox.get()
+            if message is None:
+                return
+            try:
+                self.send(message)
+            except OSError:
+                return
+
+
+class DisplayPadDaemon:
+    """Owns a DisplayPad and applies client requests to its 12 slots.
+
+    Each request is a batch of operations that is validated completely (images are
+    decoded on the client's connection thread) before any of it is shown, so a batch
+    either applies as a whole or not at all. Key events are sent to subscribed clients.
+
+    Example:
+        DisplayPadDaemon().serve_forever()
+    """
+
+    def __init__(self, pad: Optional[DisplayPad] = None, path: Optional[str] = None, rotation: int = 0):
+        self.pad = pad or DisplayPad(rotation=rotation)
+        self.path = path or default_socket_path()
+        self.keys: List[RemoteKey] = [RemoteKey(self) for _ in range(NUM_KEYS)]
+        for idx, key in enumerate(self.keys):
+            self.pad[idx] = key
+        self._lock = threading.Lock()
+        self._clients: Dict[int, _Client] = {}
+        self._server: Optional[socket.socket] = None
+        self._accept_thread: Optional[threading.Thread] = None
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Listen on the socket and accept clients in the background."""
+        if self._server is not None:
+            return
+        self._remove_stale_socket()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        server.listen()
+        self._server = server
+        self._accept_thread = threading.Thread(target=self._accept_loop, name="displaypad-daemon", daemon=True)
+        self._accept_thread.start()
+        log.info(f"DisplayPad daemon listening on {self.path}")
+
+    def serve_forever(self):
+        """Serve clients and run the pad loop until `close()` (or Ctrl+C)."""
+        self.start()
+        try:
+            self.pad.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self.pad.stop()
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.unlink(self.path)  # Left behind by a daemon that did not exit cleanly
+            return
+        finally:
+            probe.close()
+        raise DisplayPadError(f"A DisplayPad daemon is already listening on {self.path}")
+
+    # --- Connections ---
+
+    def _accept_loop(self):
+        server = self._server
+        while True:
+            try:
+                sock, _addr = server.accept()
+            except OSError:
+                return
+            client = _Client(sock)
+            with self._lock:
+                self._clients[id(client)] = client
+            threading.Thread(target=self._serve_client, args=(client,), name="displaypad-daemon-client",
+                             daemon=True).start()
+
+    def _serve_client(self, client: _Client):
+        try:
+            while True:
+                received = recv_message(client.sock)
+                if received is None:
+                    break
+                message, payload = received
+                reply = {"id": message.get("id")}
+                try:
+                    self.apply(message.get("ops", []), payload, client)
+                    reply["ok"] = True
+                except (ValueError, KeyError, TypeError, OSError, DisplayPadError) as e:
+                    reply["error"] = str(e)
+                client.send(reply)
+        except Exception as e:
+            log.debug(f"Daemon client disconnected: {e!r}")
+        finally:
+            with self._lock:
+                self._clients.pop(id(client), None)
+            client.close()
+
+    def broadcast(self, event: str, slot: Optional[int]):
+        """Queue a key event for every client subscribed to it (never blocks on a client).
+
+        A client that falls more than EVENT_BACKLOG events behind is disconnected.
+        """
+        with self._lock:
+            clients = [c for c in self._clients.values() if event in c.events]
+        for client in clients:
+            if not client.post({"event": event, "slot": slot}):
+                log.warning("Disconnecting a daemon client that stopped reading events")
+                client.close()  # Its connection thread removes it
+
+    # --- Operations ---
+
+    def apply(self, ops: List[dict], payload: bytes = b"", client: Optional[_Client] = None):
+        """Validate and apply a batch of operations (see `displaypad_lib.client`)."""
+        changes: List[Tuple[int, Optional[Tuple]]] = []
+        brightness = None
+        subscribe = None
+        for op in ops:
+            kind = op["op"]
+            if kind == "brightness":
+                brightness = int(op["percent"])
+            elif kind == "subscribe":
+                subscribe = set(op.get("events", EVENTS))
+            elif kind == "clear" and "slot" not in op:
+                changes.extend((idx, None) for idx in range(NUM_KEYS))
+            else:
+                changes.append((_slot(op), self._content(kind, op, payload)))
+
+        with self.pad.render_lock:  # No tick renders part of a batch
+            for idx, content in changes:
+                self.keys[idx].set_content(content)
+        if brightness is not None:
+            self.pad.set_brightness(brightness)
+        if subscribe is not None and client is not None:
+            client.events = subscribe
+
+    def _content(self, kind: str, op: dict, payload: bytes) -> Optional[Tuple]:
+        if kind == "clear":
+            return None
+        if kind == "label":
+            return ("label", str(op["text"]), op.get("bg", "navy"), op.get("fg", "white"), int(op.get("font_size", 18)))
+        data = _blob(op, payload)
+        if kind == "tile":
+            if len(data) != TILE_BYTES:
+                raise ValueError(f"A tile needs {TILE_BYTES} bytes, got {len(data)}")
+            return ("tile", data)
+        if kind == "image":
+            return ("image", _fit_image(data, int(op.get("margin", 0))))
+        raise ValueError(f"Unknown operation {kind!r}")
+
+
+def _slot(op: dict) -> int:
+    slot = int(op["slot"])
+    if not 0 <= slot < NUM_KEYS:
+        raise ValueError(f"Slot {slot} out of range (0..{NUM_KEYS - 1})")
+    return slot
+
+
+def _blob(op: dict, payload: bytes) -> bytes:
+    offset, length = int(op["offset"]), int(op["length"])
+    if offset < 0 or length < 0 or offset + length > len(payload):
+        raise ValueError("Operation references data outside the message payload")
+    return payload[offset:offset + length]
+
+
+def _fit_image(data: bytes, margin: int) -> Image.Image:
+    with Image.open(io.BytesIO(data)) as img:
+        icon = ImageOps.contain(img.convert("RGBA"), (ICON_SIZE - 2 * margin, ICON_SIZE - 2 * margin),
+                                Image.LANCZOS)
+    tile = Image.new("RGB", (ICON_SIZE, ICON_SIZE), (0, 0, 0))
+    tile.paste(icon, ((ICON_SIZE - icon.width) // 2, (ICON_SIZE - icon.height) // 2), icon)
+    return tile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="displaypad-daemon",
+                                     description="Own the DisplayPad and serve drawing clients over a UNIX socket.")
+    parser.add_argument("--socket", default=None, help=f"Socket path (default: {default_socket_path()})")
+    parser.add_argument("--rotation", type=int, default=0, choices=(0, 90, 180, 270))
+    parser.add_argument("--brightness", type=int, default=None, help="Backlight brightness on start (0-100)")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    daemon = DisplayPadDaemon(path=args.socket, rotation=args.rotation)
+    if args.brightness is not None:
+        daemon.pad.set_brightness(args.brightness)
+    daemon.serve_forever()
@@ -9,18 +9,28 @@ log = getLogger(__name__)
 class DisplayPad:
     """Main DisplayPad class managing keys, multi-page layouts, and async display rendering."""
 
+import asyncio
+import inspect
 import logging
+import os
 import queue
 import threading
 import time
-from typing import Dict, List, Optional, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from PIL import Image, ImageDraw
 
-from displaypad_driver import DisplayPad as Driver, ICON_SIZE, KEYS_PER_ROW, NUM_KEYS
-from displaypad_driver.image import image_to_bgr102, split_image_to_tiles
+from displaypad_driver import AnimationPack, ColorCalibration, DisplayPad as Driver, ICON_SIZE, KEYS_PER_ROW, NUM_KEYS
+from displaypad_driver.image import bgr102_to_image, image_to_bgr102, split_image_to_tiles
+from .actions import ActionExecutor
+from .animation import PanelAnimation
+from .clock import AnimationClock, animation_clock
+from .framebuffer import SharedFramebuffer
+from .gestures import REPEAT, GestureEngine
 from .key import Key
-from .keycontext import KeyContext
+from .keycontext import KeyContext, LayerCache
 from .page import Page, PageManager
+from .stats import LatencyTrace, PerfStats
 
 log = logging.getLogger(__name__)
 
@@ -32,13 +42,31 @@ class DisplayPad:
     ```python
     pad = DisplayPad()
     pad[0] = LoggerKey(0)
-    while True:
-        pad.update()
+    pad.run()  # or: while True: pad.update()
     ```
+
+    Pass `render_workers > 0` to render the dirty keys of a tick concurrently on a
+    thread pool. Only `Key.render` runs off the main thread (see `Key.parallel_render`);
+    tiles are still composited and uploaded in slot order.
+
+    Pass `driver=OffscreenDriver(...)` to run without a device, e.g. to record the
+    uploaded frames or measure render throughput in CI (see `run_offscreen`).
+
+    Pass `calibration=ColorCalibration(...)` to correct the panel's color and gamma; the
+    driver applies it to every uploaded tile.
+
+    Hooks decorated with `@background(...)` run on `pad.actions`, a pool of
+    `action_workers` threads, instead of blocking polling and rendering.
     """
 
-    def __init__(self, rotation: int = 0, debounce_sec: float = 0.01, dc_window: float = 0.6):
-        self.driver = Driver()
+    def __init__(self, rotation: int = 0, debounce_sec: float = 0.01, dc_window: float = 0.6,
+                 render_workers: int = 0, action_workers: int = 4, slow_action_threshold: float = 0.25,
+                 collect_stats: bool = True, driver=None, calibration: Optional[ColorCalibration] = None,
+                 long_press_sec: float = 0.8, repeat_delay: float = 0.4, repeat_interval: float = 0.1):
+        # Any object with the displaypad_driver.DisplayPad interface, e.g. an OffscreenDriver
+        self.driver = driver if driver is not None else Driver()
+        if calibration is not None:
+            self.driver.calibration = calibration
         self.width = 612
         self.height = 204
         self.rotation = rotation
@@ -46,7 +74,11 @@ class DisplayPad:
         self.dc_window = dc_window
         self.dc_antibounce = 0.02
 
+        # Encoded tiles shown on the panel but not decoded into image_buffer yet: {idx: (bgr, rotation)}
+        self._undecoded_tiles: Dict[int, Tuple[bytes, int]] = {}
         self.image_buffer = Image.new("RGB", (self.width, self.height))
+        # Per-slot render surfaces, reused across redraws
+        self._surfaces: List[Optional[KeyContext]] = [None] * NUM_KEYS
 
         self.page_manager = PageManager()
         self._synced_keys: List[Optional[object]] = [object()] * NUM_KEYS
@@ -54,9 +86,25 @@ class DisplayPad:
 
         # Input timing state
         self._last_fire_time: Dict[int, float] = {}
-        self._press_start_time: Dict[int, float] = {}
-        self._dc_timers: Dict[int, float] = {}  # key_index -> timer_start_time
-        self._dc_pending_single: Dict[int, bool] = {}
+        # Gesture defaults (seconds), overridable per key via Key.long_press_time etc.
+        self.long_press_sec = long_press_sec
+        self.repeat_delay = repeat_delay
+        self.repeat_interval = repeat_interval
+        self.gestures = GestureEngine()
+
+        # Optional worker pool for concurrent key rendering
+        self._render_pool: Optional[ThreadPoolExecutor] = None
+        if render_workers > 0:
+            self._render_pool = ThreadPoolExecutor(max_workers=render_workers,
+                                                   thread_name_prefix="displaypad-render")
+
+        # Per-key performance metrics (see stats())
+        self.perf = PerfStats(enabled=collect_stats)
+        self._stats_export_stop = threading.Event()
+        self._stats_export_thread: Optional[threading.Thread] = None
+        # Open press-to-panel latency traces by slot, closed by the slot's next upload
+        self._traces: Dict[int, LatencyTrace] = {}
+        self.trace_timeout = 1.0
 
         # Async tile render queue & lock
         self._render_queue: queue.Queue = queue.Queue()
@@ -64,12 +112,64 @@ class DisplayPad:
         self._worker_thread = threading.Thread(target=self._async_render_loop, daemon=True)
         self._worker_thread.start()
 
+        # Held while a tick renders; hold it to change several keys without a frame showing half of it
+        self.render_lock = threading.RLock()
+
+        # Event-driven main loop state (see run())
+        self._events: queue.Queue = queue.Queue()
+        self._run_stop = threading.Event()
+        self._wake_pending = False
+
+        # asyncio integration: loop that runs coroutine hooks (see run_async())
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._hook_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending_hooks: Dict[Tuple[int, str], Future] = {}
+
+        # Full-panel animation currently owning the panel (see play_animation())
+        self._animation: Optional[PanelAnimation] = None
+        self._animation_loop = True
+        self._animation_clock = animation_clock
+        self._animation_start = 0.0  # Clock time at which the animation started
+        self._animation_shown: Optional[int] = None
+
+        # Shared framebuffer owning the panel (see attach_framebuffer())
+        self._framebuffer: Optional[SharedFramebuffer] = None
+        self._framebuffer_owned = False
+        self._framebuffer_interval = 1 / 30
+        self._framebuffer_due = 0.0
+
+        # Worker pool for @background key handlers
+        self.actions = ActionExecutor(max_workers=action_workers, slow_threshold=slow_action_threshold)
+
     # --- Property Shortcuts ---
 
     @property
     def keys(self) -> List[Optional[Key]]:
         return self.page_manager.get_current_page().keys
 
+    @property
+    def image_buffer(self) -> Image.Image:
+        """The panel contents as one RGB image.
+
+        Precompiled and cached tiles are uploaded as-is and only decoded into the
+        buffer when it is read.
+        """
+        # popitem() is atomic, so readers on other threads never lose a tile the pad adds meanwhile
+        while self._undecoded_tiles:
+            idx, (bgr_bytes, rotation) = self._undecoded_tiles.popitem()
+            self._image_buffer.paste(bgr102_to_image(bgr_bytes, rotation), self._get_key_coords(idx))
+        return self._image_buffer
+
+    @image_buffer.setter
+    def image_buffer(self, image: Image.Image):
+        self._image_buffer = image
+        self._undecoded_tiles = {}
+
+    def _slot_buffer(self, idx: int) -> Image.Image:
+        """image_buffer for overwriting slot idx, without decoding that slot's pending tile."""
+        self._undecoded_tiles.pop(idx, None)
+        return self._image_buffer
+
     def __getitem__(self, index: int) -> Optional[Key]:
         return self.page_manager.get_current_page()[index]
 
@@ -77,48 +177,92 @@ class DisplayPad:
         self.page_manager.get_current_page()[index] = key_instance
         self._synced_keys[index] = object()  # Force re-sync on next update
 
-    def add_page(self, page_id: Union[str, int], page: Page):
-        """Register a new Page layout. If adding/updating the active page, repaints the panel."""
-        self.page_manager.add_page(page_id, page)
+    def add_page(self, page_id: Union[str, int], page: Union[Page, Callable[[], Page]]):
+        """Register a new Page layout, or a factory building it on first use.
+
+        If adding/updating the active page, repaints the panel.
+        """
+        replaced = self.page_manager.add_page(page_id, page)
         current = self.page_manager.current_page_id
-        if page_id == current or page.name == current:
-            # Force re-sync of active page keys
-            self._synced_keys = [object()] * NUM_KEYS
+        if page_id == current or (isinstance(page, Page) and page.name == current):
             current_page = self.page_manager.get_current_page()
-            draw = ImageDraw.Draw(self.image_buffer)
-            draw.rectangle([0, 0, self.width, self.height], fill=(0, 0, 0))
+            current_page.clear_snapshots()
             for idx in range(NUM_KEYS):
                 key = current_page.keys[idx]
                 if key:
                     key.on_mount(idx)
-                    self._render_key_to_buffer(idx, key)
-                    key._needs_redraw = False
-            self.push_image()
-
+            self._show_page(current_page)
+        if replaced is not None:
+            replaced.unmount()  # The active lazy page it replaced
 
     def switch_to_page(self, page_id: Union[str, int]) -> bool:
-        """Switch active page and request full panel redraw."""
+        """Switch active page and push it to the panel.
+
+        Keys whose cached tile from the page's last render is still valid are not re-rendered.
+        """
         success = self.page_manager.switch_to(page_id)
         if success:
-            current_page = self.page_manager.get_current_page()
-            # Render all keys of new page onto image_buffer
-            draw = ImageDraw.Draw(self.image_buffer)
-            draw.rectangle([0, 0, self.width, self.height], fill=(0, 0, 0))
-            for idx in range(NUM_KEYS):
-                key = current_page.keys[idx]
-                if key:
-                    self._render_key_to_buffer(idx, key)
-                    key._needs_redraw = False
-            self.push_image()
+            self.gestures.cancel_all()  # Held keys must not long-press the new page's keys
+            self._show_page(self.page_manager.get_current_page())
         return success
 
     def set_brightness(self, percent: int):
         """Set hardware backlight brightness (0-100%)."""
         self.driver.set_brightness(percent)
 
+    def fade_brightness(self, percent: int, duration: float = 1.0) -> threading.Event:
+        """Fade the backlight to percent over duration seconds without blocking key uploads.
+
+        Returns an Event set when the fade has finished or was cancelled.
+        """
+        return self.driver.fade_to(percent, duration)
+
+    def stats(self) -> dict:
+        """Return a snapshot of per-key and per-page metrics.
+
+        Per slot ("page/slot"): `tick`, `render`, `encode`, `queue_wait` and `upload` timings
+        (count/total/avg/max seconds), `redraws`, `redraw_rate` (per second) and
+        `skipped_frames` (tiles replaced in the upload queue before being sent).
+        """
+        return self.perf.snapshot()
+
+    def export_stats(self, path: str, interval: float = 15.0):
+        """Periodically write `stats()` to a Prometheus text-format file from a background thread.
+
+        Calling it again replaces the previous export (path and interval).
+        """
+        self._stop_stats_export()
+        stop = self._stats_export_stop = threading.Event()
+
+        def export_loop():
+            while not stop.wait(interval):
+                try:
+                    self.perf.write_prometheus(path)
+                except OSError as e:
+                    log.warning(f"Failed to export stats to {path}: {e}")
+
+        self._stats_export_thread = threading.Thread(target=export_loop, name="displaypad-stats", daemon=True)
+        self._stats_export_thread.start()
+
+    def _stop_stats_export(self):
+        self._stats_export_stop.set()
+        thread, self._stats_export_thread = self._stats_export_thread, None
+        if thread is not None:
+            thread.join()
+
     def disable(self):
         """Close driver interfaces and stop worker threads."""
+        self.stop()
+        self.detach_framebuffer()
+        self._stop_stats_export()
         self._queue_worker_stop.set()
+        self.actions.shutdown()
+        if self._hook_loop is not None:
+            self._hook_loop.call_soon_threadsafe(self._hook_loop.stop)
+            self._hook_loop = None
+        if self._render_pool is not None:
+            self._render_pool.shutdown(wait=True)
+            self._render_pool = None
         self.driver.close()
 
     def _get_key_box(self, index: int) -> tuple[int, int, int, int]:
@@ -156,68 +300,344 @@ class DisplayPad:
         now = time.time()
 
         # 1. Check page auto-timeouts
-        timeout_target = self.page_manager.check_timeout()
-        if timeout_target:
-            self.switch_to_page(timeout_target)
+        self._check_page_timeout()
 
         # 2. Poll Driver for key events
         input_state = self.driver.poll_key(timeout=timeout)
 
-        # 3. Handle key presses
+        # 3. Fire key hooks, then tick, render and upload the current page
+        self._dispatch_input(input_state, now)
+        self._fire_gestures(time.time())
+        self._tick_and_render(now)
+
+    def run(self, poll_timeout: int = 20, max_idle: float = 1.0):
+        """Run the main loop until `stop()` is called, sleeping while nothing can change.
+
+        Unlike a `while True: pad.update()` loop, keys are only ticked when their
+        `next_wakeup()` deadline is due. The loop wakes on the earliest of: an input
+        report, a key wakeup, a page timeout, or a `request_redraw()` from any thread.
+
+        Args:
+            poll_timeout: HID read timeout of the input thread in milliseconds.
+            max_idle: Upper bound in seconds for a single sleep.
+        """
+        self._run_stop.clear()
+        input_thread = threading.Thread(target=self._input_loop, args=(poll_timeout,),
+                                        name="displaypad-input", daemon=True)
+        input_thread.start()
+        try:
+            self._check_page_timeout()
+            self._tick_and_render(time.time())
+            while not self._run_stop.is_set():
+                wait = self._next_deadline(max_idle) - time.time()
+                self._step(self._wait_for_input(wait))
+        finally:
+            self._run_stop.set()
+            input_thread.join(timeout=1.0)
+
+    async def run_async(self, poll_timeout: int = 20, max_idle: float = 1.0):
+        """Run the `run()` loop from asyncio, e.g. `await pad.run_async()`.
+
+        The loop itself (USB polling, rendering and uploads) runs on a worker thread, so
+        the event loop thread never blocks on USB. `async def` key hooks and
+        `render_state` methods are scheduled on the running event loop instead of being
+        awaited in the input path. Cancelling the task stops the pad loop.
+        """
+        self._loop = asyncio.get_running_loop()
+        try:
+            await asyncio.to_thread(self.run, poll_timeout, max_idle)
+        except asyncio.CancelledError:
+            self.stop()
+            raise
+        finally:
+            self._loop = None
+
+    def flush(self):
+        """Block until all queued single-key tile uploads have been sent."""
+        if self._worker_thread.is_alive():
+            self._render_queue.join()
+
+    def stop(self):
+        """Ask a running `run()` loop to return (thread-safe)."""
+        self._run_stop.set()
+        self._events.put(None)
+
+    def _step(self, input_states: List[dict]):
+        """Process queued input states and tick only the keys whose wakeup is due."""
+        self._check_page_timeout()
+        for input_state in input_states:
+            self._dispatch_input(input_state, time.time())
+        now = time.time()
+        self._fire_gestures(now)
+        self._tick_and_render(now, due_only=True)
+
+    def _input_loop(self, poll_timeout: int):
+        """Input thread for `run()`: blocks on HID reads and queues key transitions."""
+        while not self._run_stop.is_set():
+            if not self.driver.connected:
+                self._run_stop.wait(poll_timeout / 1000)
+                continue
+            try:
+                input_state = self.driver.poll_key(timeout=poll_timeout)
+            except Exception as e:
+                log.debug(f"Input poll failed: {e}")
+                self._run_stop.wait(poll_timeout / 1000)
+                continue
+            if input_state['pressed'] or input_state['released']:
+                self._events.put(input_state)
+
+    def _wait_for_input(self, timeout: float) -> List[dict]:
+        """Sleep until an event is queued or timeout (seconds) elapses; return queued input states."""
+        try:
+            if timeout > 0:
+                items = [self._events.get(timeout=timeout)]
+            else:
+                items = [self._events.get_nowait()]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                items.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+        self._wake_pending = False
+        return [item for item in items if item is not None]
+
+    def _notify_redraw(self):
+        """Wake a sleeping `run()` loop after a key requested a redraw (thread-safe)."""
+        if not self._wake_pending:
+            self._wake_pending = True
+            self._events.put(None)
+
+    def _next_deadline(self, max_idle: float) -> float:
+        """Return the earliest time at which the loop has work to do without new input."""
+        now = time.time()
+        deadline = now + max_idle
+        animation = self._animation
+        if self._framebuffer is not None or animation is not None:
+            if self._framebuffer is not None:
+                wakeup = self._framebuffer_due
+            elif self._animation_shown is None:
+                wakeup = now
+            else:
+                wakeup = self._animation_clock.wall_time(
+                    self._animation_start + animation.next_frame_time(self._animation_shown))
+            page_deadline = self.page_manager.next_timeout_deadline()
+            gesture_deadline = self.gestures.next_deadline()
+            return min(deadline, wakeup, page_deadline if page_deadline is not None else deadline,
+                       gesture_deadline if gesture_deadline is not None else deadline)
+        for key in self.page_manager.get_current_page().keys:
+            if key is None:
+                continue
+            if key._needs_redraw:
+                return now
+            wakeup = key.next_wakeup()
+            if wakeup is not None:
+                deadline = min(deadline, wakeup)
+        page_deadline = self.page_manager.next_timeout_deadline()
+        if page_deadline is not None:
+            deadline = min(deadline, page_deadline)
+        gesture_deadline = self.gestures.next_deadline()
+        if gesture_deadline is not None:
+            deadline = min(deadline, gesture_deadline)
+        return deadline
+
+    def _call_hook(self, hook, *args):
+        """Call a key hook; if it is a coroutine function, schedule the coroutine instead.
+
+        Hooks marked with `@background` are handed to the action executor.
+        """
+        action = getattr(hook, "_displaypad_action", None)
+        if action is not None:
+            key = hook.__self__
+            policy, max_pending = action
+            name = f"{type(key).__name__}[{key.index}].{hook.__name__}"
+            self.actions.submit(id(key), name, hook, *args, policy=policy, max_pending=max_pending)
+            return
+        result = hook(*args)
+        if inspect.isawaitable(result):
+            self._schedule(result)
+
+    def _tick_key(self, key: Key, now: float):
+        """Run a key's on_tick and refresh a due async render_state, never overlapping runs."""
+        if inspect.iscoroutinefunction(key.on_tick):
+            if not self._hook_pending(key, "on_tick"):
+                self._track_hook(key, "on_tick", self._schedule(key.on_tick()))
+        else:
+            key.on_tick()
+        if (inspect.iscoroutinefunction(key.render_state)
+                and now >= key._render_state_refreshed_at + key.render_state_interval
+                and not self._hook_pending(key, "render_state")):
+            key._render_state_refreshed_at = now
+            self._track_hook(key, "render_state", self._schedule(self._refresh_render_state(key)))
+
+    @staticmethod
+    async def _refresh_render_state(key: Key):
+        state = await key.render_state()
+        if state != key._resolved_render_state:
+            key._resolved_render_state = state
+            key.request_redraw()
+
+    def _hook_pending(self, key: Key, name: str) -> bool:
+        future = self._pending_hooks.get((id(key), name))
+        return future is not None and not future.done()
+
+    def _track_hook(self, key: Key, name: str, future: Future):
+        slot = (id(key), name)
+        self._pending_hooks[slot] = future
+
+        def untrack(done: Future):
+            # An older call can finish after a newer one was tracked in its place
+            if self._pending_hooks.get(slot) is done:
+                del self._pending_hooks[slot]
+
+        future.add_done_callback(untrack)
+
+    def _schedule(self, coro: Awaitable) -> Future:
+        """Schedule a coroutine from a key hook on the event loop (thread-safe).
+
+        Uses the loop of `run_async()`; outside of it, a private background loop is started.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            loop = self._ensure_hook_loop()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        future.add_done_callback(self._log_hook_error)
+        return future
+
+    def _ensure_hook_loop(self) -> asyncio.AbstractEventLoop:
+        if self._hook_loop is None:
+            self._hook_loop = asyncio.new_event_loop()
+            threading.Thread(target=self._hook_loop.run_forever, name="displaypad-hooks", daemon=True).start()
+        return self._hook_loop
+
+    @staticmethod
+    def _log_hook_error(future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            log.error(f"Async key hook failed: {future.exception()!r}")
+
+    def _check_page_timeout(self):
+        timeout_target = self.page_manager.check_timeout()
+        if timeout_target:
+            self.switch_to_page(timeout_target)
+
+    def _dispatch_input(self, input_state: dict, now: float):
+        """Fire key hooks for one polled input state."""
+        # Handle key presses
         if input_state['pressed']:
             self.page_manager.note_activity()
             for idx in input_state['pressed']:
                 if not self._key_down_state[idx]:
                     self._key_down_state[idx] = True
                     self._last_fire_time[idx] = now
-                    self._press_start_time[idx] = now
+                    self._start_trace(idx, input_state)
 
                     key = self[idx]
                     if key:
-                        key.on_press()
-
-                    # Double click check (additionally trigger on_double_press if within window)
-                    if idx in self._dc_timers and (now - self._dc_timers[idx] <= self.dc_window):
-                        del self._dc_timers[idx]
-                        self._dc_pending_single[idx] = False
-                        if key:
-                            key.on_double_press()
-                    else:
-                        self._dc_timers[idx] = now
-                        self._dc_pending_single[idx] = True
+                        self._call_hook(key.on_press)
+
+                    # A second press within dc_window additionally triggers on_double_press
+                    if self._press_gesture(idx, key, now) and key:
+                        self._call_hook(key.on_double_press)
 
-        # 4. Handle key releases
+        # Handle key releases
         if input_state['released']:
             for idx in input_state['released']:
                 if self._key_down_state[idx]:
                     self._key_down_state[idx] = False
-                    start_t = self._press_start_time.pop(idx, None)
-                    if start_t and (now - start_t >= 0.8):
-                        key = self[idx]
-                        if key:
-                            key.on_long_press()
-
+                    self.gestures.release(idx, now)
                     key = self[idx]
                     if key:
-                        key.on_release()
+                        self._call_hook(key.on_release)
                 else:
                     # Released without recorded down event (missed down poll on super fast tap)
                     self.page_manager.note_activity()
                     self._last_fire_time[idx] = now
+                    self._start_trace(idx, input_state)
                     key = self[idx]
+                    double = self._press_gesture(idx, key, now)
+                    self.gestures.release(idx, now)
                     if key:
-                        key.on_press()
-                        key.on_release()
+                        self._call_hook(key.on_press)
+                        if double:
+                            self._call_hook(key.on_double_press)
+                        self._call_hook(key.on_release)
+
+    def _start_trace(self, idx: int, input_state: dict):
+        """Open a latency trace for a press, starting at the driver's HID read timestamp."""
+        if not self.perf.enabled:
+            return
+        trace = LatencyTrace(self._stats_label(idx), input_state.get('timestamp', time.perf_counter()))
+        trace.mark("dispatch")
+        self._traces[idx] = trace
+
+    def _take_trace(self, idx: int, key: Key) -> Optional[LatencyTrace]:
+        """Return the slot's open press trace if this render answers it, marking redraw and render."""
+        trace = self._traces.get(idx)
+        if trace is None:
+            return None
+        requested_at = key._redraw_requested_at
+        if requested_at < trace.marks["dispatch"]:
+            if time.perf_counter() - trace.marks["read"] > self.trace_timeout:
+                del self._traces[idx]  # The press never caused a redraw of its key
+            return None
+        del self._traces[idx]
+        if requested_at - trace.marks["read"] > self.trace_timeout:
+            return None  # A later, unrelated redraw: the press itself never redrew its key
+        trace.mark("redraw", requested_at)
+        trace.mark("render")
+        return trace
+
+    def _press_gesture(self, idx: int, key: Optional[Key], now: float) -> bool:
+        """Start the gesture timers a key uses for a press; returns True for a double press.
+
+        Long press, auto-repeat and single-press timers are only armed for keys that
+        implement the matching hook, so other keys never wake the loop.
+        """
+        long_press = repeat = None
+        single = False
+        if key is not None:
+            if _overrides(key, "on_long_press"):
+                long_press = key.long_press_time if key.long_press_time is not None else self.long_press_sec
+            if _overrides(key, "on_repeat"):
+                repeat = (key.repeat_delay if key.repeat_delay is not None else self.repeat_delay,
+                          key.repeat_interval if key.repeat_interval is not None else self.repeat_interval)
+            single = _overrides(key, "on_single_press")
+        return self.gestures.press(idx, now, long_press=long_press, repeat=repeat,
+                                   window=self.dc_window, notify_single=single)
 
-        # 5. Handle pending single presses after double-click window elapses
-        for idx in list(self._dc_timers.keys()):
-            if now - self._dc_timers[idx] > self.dc_window:
-                del self._dc_timers[idx]
-                self._dc_pending_single.pop(idx, None)
+    def _fire_gestures(self, now: float):
+        """Run the hooks of gesture timers that expired (long press, repeat, single press)."""
+        for idx, gesture in self.gestures.pop_due(now):
+            key = self[idx]
+            if key is None:
+                continue
+            if gesture == REPEAT:
+                self.page_manager.note_activity()
+            self._call_hook(getattr(key, f"on_{gesture}"))
+
+    def _tick_and_render(self, now: float, due_only: bool = False):
+        """Tick current page keys, render dirty ones and queue their uploads.
+
+        With due_only, `on_tick` only runs for keys whose `next_wakeup()` has passed.
+        Runs under `render_lock`.
+        """
+        with self.render_lock:
+            self._tick_and_render_locked(now, due_only)
+
+    def _tick_and_render_locked(self, now: float, due_only: bool):
+        if self._framebuffer is not None:
+            self._tick_framebuffer(now)
+            return
+        if self._animation is not None:
+            self._tick_animation(now)
+            return
 
-        # 6. Render pass for current page keys
+        # Render pass for current page keys
         current_page = self.page_manager.get_current_page()
         dirty_indices = []
+        to_render: List[Tuple[int, Key]] = []
+        tiles: Dict[int, bytes] = {}
 
         for idx in range(NUM_KEYS):
             key = current_page.keys[idx]
@@ -229,49 +649,217 @@ class DisplayPad:
                     self._synced_keys[idx] = None
             else:
                 if self._synced_keys[idx] is not key:
-                    key._needs_redraw = True
                     self._synced_keys[idx] = key
+                    key._redraw_listener = self._notify_redraw
+                    cached = self._cached_tile(current_page, idx, key)
+                    if cached is not None:
+                        self._paste_encoded_tile(idx, cached)
+                        tiles[idx] = cached
+                        dirty_indices.append(idx)
+                    else:
+                        key._needs_redraw = True
 
-                key.on_tick()
+                if not due_only or self._is_tick_due(key, now):
+                    tick_start = time.perf_counter()
+                    self._tick_key(key, now)
+                    key._last_tick_time = now
+                    self.perf.record((current_page.name, idx), "tick", time.perf_counter() - tick_start,
+                                     type(key).__name__)
                 if key._needs_redraw:
-                    self._render_key_to_buffer(idx, key)
-                    key._needs_redraw = False
-                    dirty_indices.append(idx)
+                    to_render.append((idx, key))
+                    if idx not in tiles:
+                        dirty_indices.append(idx)
+
+        tiles.update(self._render_tiles(current_page, to_render))
+        traces: Dict[int, LatencyTrace] = {}
+        for idx, key in to_render:
+            if self._traces:
+                trace = self._take_trace(idx, key)
+                if trace is not None:
+                    traces[idx] = trace
+        if to_render:
+            self.page_manager.note_snapshot(current_page)
 
-        # 7. Upload pass: if 3 or more keys are dirty, batch update the whole panel!
+        # Upload pass: if 3 or more keys are dirty, batch update the whole panel!
         if len(dirty_indices) >= 3:
-            self.push_image()
+            # Every empty slot was blanked in the pass above
+            self._push_tiles(self._panel_tiles(tiles), blank_synced=True, traces=traces)
         elif dirty_indices:
             for idx in dirty_indices:
-                self._request_tile_upload(idx)
+                if idx in tiles:
+                    self._queue_tile(idx, tiles[idx], traces.get(idx))
+                else:
+                    self._request_tile_upload(idx)
 
-    def _render_key_to_buffer(self, idx: int, key: Key):
-        """Render a single key into the global image buffer."""
+    def _render_tiles(self, page: Page, items: List[Tuple[int, Key]]) -> Dict[int, bytes]:
+        """Render and encode (idx, key) pairs of a page; keys with an `encoded_tile` skip both."""
+        tiles: Dict[int, bytes] = {}
+        to_render: List[Tuple[int, Key]] = []
+        for idx, key in items:
+            bgr_bytes = key.encoded_tile(self.rotation)
+            if bgr_bytes is None:
+                to_render.append((idx, key))
+                continue
+            key._needs_redraw = False
+            self._paste_encoded_tile(idx, bgr_bytes)
+            self.perf.count((page.name, idx), "redraws", key_type=type(key).__name__)
+            tiles[idx] = bgr_bytes
+        self._render_keys(to_render)
+        for idx, _key in to_render:
+            tiles[idx] = self._encode_key_tile(page, idx)
+        return tiles
+
+    @staticmethod
+    def _is_tick_due(key: Key, now: float) -> bool:
+        wakeup = key.next_wakeup()
+        return wakeup is not None and wakeup <= now
+
+    def _render_keys(self, items: List[Tuple[int, Key]]):
+        """Render (idx, key) pairs into the global image buffer, clearing their redraw flags.
+
+        With a render pool, keys that allow it render concurrently into independent
+        surfaces; composition into image_buffer always happens here, in slot order.
+        """
+        pool = self._render_pool
+        # Flags are cleared before rendering so a redraw requested mid-render is not lost
+        for _idx, key in items:
+            key._needs_redraw = False
+
+        if pool is None or len(items) < 2:
+            for idx, key in items:
+                self._render_key_to_buffer(idx, key)
+            return
+
+        futures = {idx: pool.submit(self._render_key_surface, idx, key)
+                   for idx, key in items if key.parallel_render}
+        surfaces = {idx: self._render_key_surface(idx, key)
+                    for idx, key in items if idx not in futures}
+        for idx, key in items:
+            surface = futures[idx].result() if idx in futures else surfaces[idx]
+            box = self._get_key_box(idx)
+            self._slot_buffer(idx).paste(surface, (box[0], box[1]))
+
+    def _render_key_surface(self, idx: int, key: Key) -> Image.Image:
+        """Render a single key onto its slot's pooled surface and return the surface image.
+
+        The surface is reused for the next redraw of the same slot.
+        """
         box = self._get_key_box(idx)
         w, h = box[2] - box[0], box[3] - box[1]
-        key_img = Image.new("RGB", (w, h), (0, 0, 0))
-        draw = ImageDraw.Draw(key_img)
-        ctx = KeyContext(draw, width=w, height=h, image=key_img)
+        ctx = self._surfaces[idx]
+        if ctx is None or (ctx.width, ctx.height) != (w, h):
+            key_img = Image.new("RGB", (w, h), (0, 0, 0))
+            ctx = KeyContext(ImageDraw.Draw(key_img), width=w, height=h, image=key_img)
+            self._surfaces[idx] = ctx
+        else:
+            ctx.reset()
+        if key._layers is None:
+            key._layers = LayerCache()
+        ctx.layers = key._layers
+        start = time.perf_counter()
         key.render(ctx)
-        self.image_buffer.paste(key_img, (box[0], box[1]))
+        if self.perf.enabled:
+            self.perf.record(self._stats_label(idx), "render", time.perf_counter() - start, type(key).__name__)
+        return ctx.image
+
+    def _render_key_to_buffer(self, idx: int, key: Key):
+        """Render a single key into the global image buffer."""
+        box = self._get_key_box(idx)
+        self._slot_buffer(idx).paste(self._render_key_surface(idx, key), (box[0], box[1]))
 
     def _render_blank_key_to_buffer(self, idx: int):
         """Render a solid black tile for an unassigned key slot into global image buffer."""
-        box = self._get_key_box(idx)
-        w, h = box[2] - box[0], box[3] - box[1]
-        black_tile = Image.new("RGB", (w, h), (0, 0, 0))
-        self.image_buffer.paste(black_tile, (box[0], box[1]))
+        self._slot_buffer(idx).paste((0, 0, 0), self._get_key_box(idx))
 
-    def _request_tile_upload(self, idx: int):
-        """Extract a key's 102x102 tile from image_buffer and queue for USB transmission."""
-        box = self._get_key_box(idx)
-        tile_crop = self.image_buffer.crop(box)
-        bgr_bytes = image_to_bgr102(tile_crop, rotation=self.rotation)
-        self._render_queue.put((idx, bgr_bytes))
+    def _encode_tile(self, idx: int, tile: Optional[Image.Image] = None) -> bytes:
+        """Encode a key's 102x102 tile to BGR bytes.
+
+        A freshly rendered surface of ICON_SIZE is encoded directly; otherwise the
+        tile is cropped from image_buffer (or reused if it is still undecoded).
+        """
+        if tile is None or tile.size != (ICON_SIZE, ICON_SIZE):
+            pending = self._undecoded_tiles.get(idx)
+            if pending is None:
+                buffer = self._image_buffer  # Other slots' pending tiles stay undecoded
+            elif pending[1] == self.rotation:
+                return pending[0]
+            else:
+                buffer = self.image_buffer
+            tile = buffer.crop(self._get_key_box(idx))
+        return image_to_bgr102(tile, rotation=self.rotation)
+
+    def _encode_key_tile(self, page: Page, idx: int) -> bytes:
+        """Encode a slot's freshly rendered surface and remember it in the page's tile cache."""
+        start = time.perf_counter()
+        bgr_bytes = self._encode_tile(idx, self._surfaces[idx].image)
+        self.perf.record((page.name, idx), "encode", time.perf_counter() - start)
+        self.perf.count((page.name, idx), "redraws")
+        page.store_snapshot(idx, page.keys[idx], bgr_bytes, self.rotation)
+        return bgr_bytes
+
+    def _request_tile_upload(self, idx: int, tile: Optional[Image.Image] = None):
+        """Encode a key's 102x102 tile and queue it for USB transmission."""
+        self._queue_tile(idx, self._encode_tile(idx, tile))
+
+    def _queue_tile(self, idx: int, bgr_bytes: bytes, trace: Optional[LatencyTrace] = None):
+        """Queue an encoded tile for the upload worker."""
+        queued_at = time.perf_counter()
+        if trace is not None:
+            trace.mark("queued", queued_at)
+        self._render_queue.put((idx, bgr_bytes, self._stats_label(idx), queued_at, trace))
+
+    def _stats_label(self, idx: int) -> Tuple[str, int]:
+        return (self.page_manager.get_current_page().name, idx)
+
+    def _cached_tile(self, page: Page, idx: int, key: Key) -> Optional[bytes]:
+        """Return the page's cached encoded tile for a key if it is still valid."""
+        if self.rotation % 90:
+            return None  # Cached tiles can only be decoded back losslessly for right angles
+        return page.get_snapshot(idx, key, self.rotation)
+
+    def _paste_encoded_tile(self, idx: int, bgr_bytes: bytes, rotation: Optional[int] = None):
+        """Record an uploaded tile as the slot's contents; it is decoded when image_buffer is read."""
+        self._undecoded_tiles[idx] = (bgr_bytes, self.rotation if rotation is None else rotation)
+
+    def _panel_tiles(self, tiles: Dict[int, bytes]) -> List[bytes]:
+        """Complete a partial {idx: bgr} mapping into a 12-tile panel from image_buffer."""
+        return [tiles[idx] if idx in tiles else self._encode_tile(idx) for idx in range(NUM_KEYS)]
+
+    def _show_page(self, page: Page):
+        """Bring the whole panel in sync with a page, reusing cached tiles where valid.
+
+        While a panel animation plays or a framebuffer is attached, the page is shown
+        once they end instead.
+        """
+        if self._animation is not None or self._framebuffer is not None:
+            return
+        tiles: Dict[int, bytes] = {}
+        to_render: List[Tuple[int, Key]] = []
+        for idx, key in enumerate(page.keys):
+            if key is None:
+                self._render_blank_key_to_buffer(idx)
+                continue
+            cached = self._cached_tile(page, idx, key)
+            if cached is not None:
+                self._paste_encoded_tile(idx, cached)
+                tiles[idx] = cached
+            else:
+                to_render.append((idx, key))
+
+        tiles.update(self._render_tiles(page, to_render))
+        self.page_manager.note_snapshot(page)
+        self._push_tiles(self._panel_tiles(tiles), blank_synced=True)
 
 
     def push_image(self, image_or_path: Optional[Union[str, Image.Image]] = None):
-        """Slice full image buffer (or given image/path) into 12 key tiles and push to device immediately."""
+        """Slice full image buffer (or given image/path) into 12 key tiles and push to device immediately.
+
+        Paths ending in `.dpak` are pushed as precompiled panel packs (see `push_pack`).
+        """
+        if isinstance(image_or_path, str) and image_or_path.endswith(".dpak"):
+            with AnimationPack.open(image_or_path) as pack:
+                self.push_pack(pack)
+            return
         if image_or_path is not None:
             if isinstance(image_or_path, str):
                 self.image_buffer = Image.open(image_or_path).convert("RGB")
@@ -282,20 +870,148 @@ class DisplayPad:
             for idx in range(NUM_KEYS):
                 self._synced_keys[idx] = "CUSTOM_IMAGE"
 
-        tiles_bgr = split_image_to_tiles(self.image_buffer, rotation=self.rotation)
+        if self._push_tiles(split_image_to_tiles(self.image_buffer, rotation=self.rotation)):
+            for key in self.page_manager.get_current_page().keys:
+                if key:
+                    key._needs_redraw = False
+
+    def push_pack(self, pack: AnimationPack, frame: int = 0):
+        """Push one frame of a precompiled panel pack to the whole panel, without encoding.
+
+        Falls back to decoding and re-encoding if the pack was compiled for another rotation.
+        """
+        if pack.kind != "panel":
+            raise ValueError(f"push_pack needs a panel pack, got a {pack.kind} pack")
+        tiles = [bytes(tile) for tile in pack.frame(frame)]
+        for idx, tile in enumerate(tiles):
+            self._paste_encoded_tile(idx, tile, pack.rotation)
+            self._synced_keys[idx] = "CUSTOM_IMAGE"
+        if pack.rotation != self.rotation % 360:
+            tiles = split_image_to_tiles(self.image_buffer, rotation=self.rotation)
+        if self._push_tiles(tiles):
+            for key in self.page_manager.get_current_page().keys:
+                if key:
+                    key._needs_redraw = False
+
+    def play_animation(self, animation: PanelAnimation, loop: bool = True,
+                       clock: Optional[AnimationClock] = None):
+        """Play a full-panel animation, uploading only the tiles that change between frames.
+
+        Frames follow `clock` (default: the shared `animation_clock`); if uploads fall
+        behind, frames are skipped and their changes merged. Keys are not rendered while it plays (input hooks still fire). The
+        panel returns to the current page when a non-looping animation ends or on
+        `stop_animation()`.
+        """
+        if animation.rotation != self.rotation % 360:
+            raise ValueError(f"Animation was encoded for rotation {animation.rotation}, pad uses {self.rotation}")
+        self._animation = animation
+        self._animation_loop = loop
+        self._animation_clock = clock or animation_clock
+        self._animation_start = self._animation_clock.elapsed()
+        self._animation_shown = None
+        self._notify_redraw()
+
+    def stop_animation(self):
+        """Stop a playing panel animation and redraw the current page."""
+        if self._animation is None:
+            return
+        self._animation = None
+        for idx in range(NUM_KEYS):
+            self._synced_keys[idx] = object()  # Force re-sync on next update
+        self._notify_redraw()
+
+    def _tick_animation(self, now: float):
+        """Upload the tiles changed since the last shown frame of the playing animation."""
+        animation = self._animation
+        elapsed = self._animation_clock.elapsed() - self._animation_start
+        frame = animation.frame_at(elapsed, self._animation_loop)
+        if frame is None:
+            self.stop_animation()
+            self._tick_and_render(now)
+            return
+        if frame == self._animation_shown:
+            return
+        tiles = animation.tiles_between(self._animation_shown, frame)
+        self._animation_shown = frame
+        for idx, bgr_bytes in tiles.items():
+            self._queue_tile(idx, bgr_bytes)
+
+    def attach_framebuffer(self, framebuffer: Optional[SharedFramebuffer] = None,
+                           fps: float = 30) -> SharedFramebuffer:
+        """Show a shared framebuffer that other processes draw into (see `SharedFramebuffer`).
+
+        Without an argument, one is created at `default_framebuffer_path()` and closed again
+        by `detach_framebuffer()`. The pad checks it at most fps times per second and queues
+        only the tiles committed since the last check. Keys are not rendered while it is
+        attached (input hooks still fire).
+        """
+        if fps <= 0:
+            raise ValueError(f"fps must be positive, got {fps}")
+        self.detach_framebuffer()
+        self._framebuffer_owned = framebuffer is None
+        self._framebuffer = framebuffer or SharedFramebuffer(create=True)
+        self._framebuffer_interval = 1 / fps
+        self._framebuffer_due = 0.0
+        self._notify_redraw()
+        return self._framebuffer
+
+    def detach_framebuffer(self):
+        """Stop showing the attached framebuffer and redraw the current page."""
+        framebuffer, self._framebuffer = self._framebuffer, None
+        if framebuffer is None:
+            return
+        if self._framebuffer_owned:
+            framebuffer.close()
+            try:
+                os.unlink(framebuffer.path)
+            except FileNotFoundError:
+                pass
+        for idx in range(NUM_KEYS):
+            self._synced_keys[idx] = object()  # Force re-sync on next update
+        self._notify_redraw()
+
+    def _tick_framebuffer(self, now: float):
+        """Queue the framebuffer tiles committed since the last check, at most once per interval."""
+        if now < self._framebuffer_due:
+            return
+        self._framebuffer_due = now + self._framebuffer_interval
+        framebuffer = self._framebuffer
+        dirty = framebuffer.take_dirty()
+        for idx in range(NUM_KEYS):
+            if dirty & (1 << idx):
+                self._queue_tile(idx, framebuffer.tile_bgr(idx, self.rotation))
+                self._synced_keys[idx] = "CUSTOM_IMAGE"
+
+    def _push_tiles(self, tiles_bgr: List[bytes], blank_synced: bool = False,
+                    traces: Optional[Dict[int, LatencyTrace]] = None) -> bool:
+        """Upload 12 encoded tiles immediately and mark the current page's slots as in sync.
+
+        With blank_synced, empty slots are known to show black and are not re-cleared.
+        Press traces answered by this upload are completed. Returns False if the upload failed.
+        """
         try:
+            start = time.perf_counter()
             self.driver.upload_panel(tiles_bgr)
+            elapsed = time.perf_counter() - start
+            for trace in (traces or {}).values():
+                trace.mark("queued", start)
+                trace.mark("upload", start + elapsed)
+                self.perf.record_latency(trace)
             # Mark all slots as in sync
             current_page = self.page_manager.get_current_page()
+            for idx in range(NUM_KEYS):
+                self.perf.record((current_page.name, idx), "upload", elapsed / NUM_KEYS)
             for idx in range(NUM_KEYS):
                 key = current_page.keys[idx]
                 if key:
-                    key._needs_redraw = False
+                    key._redraw_listener = self._notify_redraw
                     self._synced_keys[idx] = key
                 else:
-                    self._synced_keys[idx] = "CUSTOM_IMAGE"
+                    self._synced_keys[idx] = None if blank_synced else "CUSTOM_IMAGE"
+            return True
         except Exception as e:
             log.error(f"Failed to push panel image to display: {e}")
+            return False
 
 
 
@@ -305,21 +1021,48 @@ class DisplayPad:
         """Background worker thread draining tile updates to keep key loops responsive."""
         while not self._queue_worker_stop.is_set():
             try:
-                latest: Dict[int, bytes] = {}
-                # Drain queue items and deduplicate per key index
-                while True:
-                    try:
-                        idx, bgr_bytes = self._render_queue.get(timeout=0.05)
-                        latest[idx] = bgr_bytes
-                    except queue.Empty:
-                        break
-
-                if latest and self.driver.connected:
-                    for idx, bgr_bytes in sorted(latest.items()):
+                try:
+                    item = self._render_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                latest: Dict[int, tuple] = {item[0]: item}
+                taken = 1
+                try:
+                    # Drain queue items and deduplicate per key index
+                    while True:
                         try:
-                            self.driver.upload_button(idx, bgr_bytes)
-                        except Exception as e:
-                            log.debug(f"Async upload failed for key {idx}: {e}")
+                            item = self._render_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        taken += 1
+                        replaced = latest.get(item[0])
+                        if replaced is not None:
+                            self.perf.count(replaced[2], "skipped_frames")
+                            if item[4] is None and replaced[4] is not None:
+                                # The newer tile also answers the older tile's press
+                                item = item[:4] + (replaced[4],)
+                        latest[item[0]] = item
+
+                    if latest and self.driver.connected:
+                        for idx, bgr_bytes, label, queued_at, trace in (latest[i] for i in sorted(latest)):
+                            start = time.perf_counter()
+                            self.perf.record(label, "queue_wait", start - queued_at)
+                            try:
+                                self.driver.upload_button(idx, bgr_bytes)
+                                done = time.perf_counter()
+                                self.perf.record(label, "upload", done - start)
+                                if trace is not None:
+                                    trace.mark("upload", done)
+                                    self.perf.record_latency(trace)
+                            except Exception as e:
+                                log.debug(f"Async upload failed for key {idx}: {e}")
+                finally:
+                    for _ in range(taken):
+                        self._render_queue.task_done()
             except Exception as e:
                 log.debug(f"Error in async render loop: {e}")
-            time.sleep(0.01)
\ No newline at end of file
+
+
+def _overrides(key: Key, hook: str) -> bool:
+    """True if the key (or the key a wrapper forwards to) implements a hook itself."""
+    return getattr(getattr(key, hook), "__func__", None) is not getattr(Key, hook)
@@ -0,0 +1,187 @@
+"""Memory-mapped 612x204 framebuffer that other processes draw into and the pad uploads from.
+
+Layout of the file (little endian):
+
+    0   magic b"DPFB", version (u16), width (u16), height (u16), 6 bytes padding
+    16  seq (u64)    bumped by the producer on every commit
+    24  ack (u64)    last seq the pad has taken
+    32  dirty (u32)  bitmap of tiles changed since the pad's last take (bit n = key n)
+    64  pixels       width * height RGB, row-major, in panel orientation
+
+Producers that write raw RGB into `pixels` only need the standard library; Pillow is
+imported when the pad encodes tiles.
+"""
+
+import mmap
+import os
+import struct
+from typing import Iterable, Optional, Tuple, Union
+
+from displaypad_driver.protocol import ICON_SIZE, KEYS_PER_ROW, NUM_KEYS
+
+MAGIC = b"DPFB"
+VERSION = 1
+WIDTH = ICON_SIZE * KEYS_PER_ROW
+HEIGHT = ICON_SIZE * (NUM_KEYS // KEYS_PER_ROW)
+ALL_TILES = (1 << NUM_KEYS) - 1
+
+_HEADER = struct.Struct("<4sHHH6x")
+_SEQ_OFFSET = 16
+_ACK_OFFSET = 24
+_DIRTY_OFFSET = 32
+_PIXELS_OFFSET = 64
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+
+
+def default_framebuffer_path() -> str:
+    """$DISPLAYPAD_FRAMEBUFFER, else displaypad.fb in $XDG_RUNTIME_DIR or /tmp (per user)."""
+    path = os.environ.get("DISPLAYPAD_FRAMEBUFFER")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "displaypad.fb")
+    return f"/tmp/displaypad-{os.getuid()}.fb"
+
+
+def tiles_in_box(box: Tuple[int, int, int, int]) -> int:
+    """Bitmap of the tiles a (left, top, right, bottom) panel region touches."""
+    left, top, right, bottom = max(box[0], 0), max(box[1], 0), min(box[2], WIDTH), min(box[3], HEIGHT)
+    mask = 0
+    if left >= right or top >= bottom:
+        return mask
+    for row in range(top // ICON_SIZE, (bottom - 1) // ICON_SIZE + 1):
+        for col in range(left // ICON_SIZE, (right - 1) // ICON_SIZE + 1):
+            mask |= 1 << (row * KEYS_PER_ROW + col)
+    return mask
+
+
+class SharedFramebuffer:
+    """A full-panel RGB framebuffer in a shared memory-mapped file.
+
+    Producers write pixels (`write()` for PIL images, or `pixels` directly) and then
+    `commit()` the tiles they changed: this ORs them into the dirty bitmap and bumps
+    `seq`. The pad (see `DisplayPad.attach_framebuffer`) polls `seq` at a bounded rate,
+    takes the dirty bitmap and uploads only those tiles on its upload thread, so a
+    producer never waits for USB.
+
+    The pad acknowledges each seq it takes; a commit resets the bitmap only once the
+    previous one was taken, so no dirty tile is lost and at worst a tile is uploaded
+    twice. Pixels are not locked: a tile read while a producer is overwriting it may
+    show a mix of both frames until the producer's next commit, which marks it again.
+    Use one producer at a time (or serialize commits between producers).
+
+    Example:
+        fb = SharedFramebuffer(default_framebuffer_path())  # Opened by the producer
+        fb.write(dashboard_image)                            # Writes and commits
+    """
+
+    def __init__(self, path: Optional[str] = None, create: bool = False):
+        self.path = path or default_framebuffer_path()
+        size = _PIXELS_OFFSET + WIDTH * HEIGHT * 3
+        if create:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                os.ftruncate(fd, size)
+                self._map = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+            _HEADER.pack_into(self._map, 0, MAGIC, VERSION, WIDTH, HEIGHT)
+        else:
+            fd = os.open(self.path, os.O_RDWR)
+            try:
+                if os.fstat(fd).st_size < size:
+                    raise ValueError(f"{self.path} is not a DisplayPad framebuffer (file too small)")
+                self._map = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+            magic, version, width, height = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION or (width, height) != (WIDTH, HEIGHT):
+                self._map.close()
+                raise ValueError(f"{self.path} is not a version {VERSION} DisplayPad framebuffer")
+        self.pixels = memoryview(self._map)[_PIXELS_OFFSET:]
+        self._last_seq: Optional[int] = None  # Consumer side: seq of the last take
+
+    # --- Producer ---
+
+    def write(self, image, xy: Tuple[int, int] = (0, 0), commit: bool = True) -> int:
+        """Copy a PIL image into the framebuffer at xy (clipped to the panel) and commit its tiles.
+
+        Returns the bitmap of the tiles it covers.
+        """
+        x, y = xy
+        box = (max(x, 0), max(y, 0), min(x + image.width, WIDTH), min(y + image.height, HEIGHT))
+        mask = tiles_in_box(box)
+        if mask:
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            left, top, right, bottom = box
+            if (right - left, bottom - top) != image.size:
+                image = image.crop((left - x, top - y, right - x, bottom - y))
+            data = image.tobytes()
+            row_bytes = (right - left) * 3
+            if row_bytes == WIDTH * 3:
+                self.pixels[top * row_bytes:bottom * row_bytes] = data
+            else:
+                for row in range(bottom - top):
+                    start = ((top + row) * WIDTH + left) * 3
+                    self.pixels[start:start + row_bytes] = data[row * row_bytes:(row + 1) * row_bytes]
+        if commit:
+            self.commit(mask)
+        return mask
+
+    def commit(self, tiles: Optional[Union[int, Iterable[int]]] = None):
+        """Mark tiles as changed and bump seq: a bitmap, key indices, or None for the whole panel."""
+        if tiles is None:
+            mask = ALL_TILES
+        elif isinstance(tiles, int):
+            mask = tiles & ALL_TILES
+        else:
+            mask = 0
+            for idx in tiles:
+                mask |= 1 << idx
+        seq = _U64.unpack_from(self._map, _SEQ_OFFSET)[0]
+        ack = _U64.unpack_from(self._map, _ACK_OFFSET)[0]
+        if ack != seq:
+            mask |= _U32.unpack_from(self._map, _DIRTY_OFFSET)[0]  # Not taken yet: accumulate
+        _U32.pack_into(self._map, _DIRTY_OFFSET, mask)
+        _U64.pack_into(self._map, _SEQ_OFFSET, seq + 1)
+
+    @property
+    def seq(self) -> int:
+        return _U64.unpack_from(self._map, _SEQ_OFFSET)[0]
+
+    # --- Consumer ---
+
+    def take_dirty(self) -> int:
+        """Return the tiles committed since the last take (all of them on the first) and acknowledge them."""
+        seq = self.seq
+        if seq == self._last_seq:
+            return 0
+        mask = _U32.unpack_from(self._map, _DIRTY_OFFSET)[0]
+        _U64.pack_into(self._map, _ACK_OFFSET, seq)
+        first = self._last_seq is None
+        self._last_seq = seq
+        return ALL_TILES if first else mask
+
+    def tile_bgr(self, idx: int, rotation: int = 0) -> bytes:
+        """Encode the current pixels of one tile as a device-ready BGR102 payload."""
+        from PIL import Image
+        from displaypad_driver.image import image_to_bgr102
+        x, y = (idx % KEYS_PER_ROW) * ICON_SIZE, (idx // KEYS_PER_ROW) * ICON_SIZE
+        row_bytes = ICON_SIZE * 3
+        # Gather the tile's rows; Image.frombuffer would copy the whole RGB panel instead
+        data = b"".join(self.pixels[start:start + row_bytes]
+                        for start in range((y * WIDTH + x) * 3, ((y + ICON_SIZE) * WIDTH + x) * 3, WIDTH * 3))
+        return image_to_bgr102(Image.frombytes("RGB", (ICON_SIZE, ICON_SIZE), data), rotation)
+
+    def close(self):
+        self.pixels.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,108 @@
+"""Timer-driven key gestures: long press while held, auto-repeat and single/double press decisions."""
+
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+LONG_PRESS = "long_press"
+REPEAT = "repeat"
+SINGLE_PRESS = "single_press"
+
+
+class GestureEngine:
+    """Per-key gesture timers kept in one heap.
+
+    Only held keys and presses waiting for a possible second press have timers, so
+    idle keys cost nothing; `next_deadline()` tells the pad loop when to wake up.
+    Timers are never searched and removed: stale ones (from an earlier press, or for a
+    key released in the meantime) are skipped when they expire.
+
+    Example:
+        double = engine.press(idx, now, long_press=0.8, repeat=(0.4, 0.1), window=0.6)
+        for idx, gesture in engine.pop_due(time.time()):
+            ...
+    """
+
+    def __init__(self):
+        self._timers: List[Tuple[float, int, int, str, int]] = []  # (when, seq, idx, gesture, generation)
+        self._seq = 0
+        self._generation: Dict[int, int] = {}
+        self._held: Dict[int, float] = {}  # idx -> press time
+        self._repeat_interval: Dict[int, float] = {}
+        self._first_press: Dict[int, float] = {}  # idx -> press time awaiting a second press
+
+    def press(self, idx: int, now: float, long_press: Optional[float] = None,
+              repeat: Optional[Tuple[float, float]] = None, window: float = 0.0,
+              notify_single: bool = True) -> bool:
+        """Start a hold; returns True if the press completes a double press.
+
+        long_press: hold time after which LONG_PRESS fires (None: never).
+        repeat: (delay, interval) for REPEAT events while held (None: no auto-repeat).
+        window: double-press window; with notify_single, SINGLE_PRESS fires once it passes
+            without a second press.
+        """
+        generation = self._generation.get(idx, 0) + 1
+        self._generation[idx] = generation
+        self._held[idx] = now
+
+        if long_press is not None:
+            self._schedule(now + long_press, idx, LONG_PRESS, generation)
+        if repeat is not None:
+            delay, interval = repeat
+            self._repeat_interval[idx] = max(interval, 0.01)
+            self._schedule(now + delay, idx, REPEAT, generation)
+
+        first = self._first_press.pop(idx, None)
+        if first is not None and now - first <= window:
+            return True
+        if window > 0:
+            self._first_press[idx] = now
+            if notify_single:
+                self._schedule(now + window, idx, SINGLE_PRESS, generation)
+        return False
+
+    def release(self, idx: int, now: float) -> Optional[float]:
+        """End a hold (cancelling its long press and repeat timers); returns how long it was held."""
+        start = self._held.pop(idx, None)
+        self._repeat_interval.pop(idx, None)
+        return None if start is None else now - start
+
+    def is_held(self, idx: int) -> bool:
+        return idx in self._held
+
+    def cancel_all(self):
+        """Drop every timer, e.g. when the keys under held fingers change."""
+        for idx in list(self._generation):
+            self._generation[idx] += 1
+        self._timers.clear()
+        self._held.clear()
+        self._repeat_interval.clear()
+        self._first_press.clear()
+
+    def next_deadline(self) -> Optional[float]:
+        return self._timers[0][0] if self._timers else None
+
+    def pop_due(self, now: float) -> List[Tuple[int, str]]:
+        """Return (idx, gesture) for every timer that expired by now, in time order."""
+        fired = []
+        while self._timers and self._timers[0][0] <= now:
+            when, _seq, idx, gesture, generation = heapq.heappop(self._timers)
+            if generation != self._generation.get(idx):
+                continue  # A newer press replaced this one
+            if gesture == SINGLE_PRESS:
+                if self._first_press.pop(idx, None) is None:
+                    continue  # Turned into a long press or auto-repeat
+            elif idx not in self._held:
+                continue  # Released before the timer expired
+            else:
+                self._first_press.pop(idx, None)  # A long press or repeating hold is not a tap
+                if gesture == REPEAT:
+                    interval = self._repeat_interval[idx]
+                    # Skip repeats the loop was too late for instead of firing a burst
+                    next_time = when + interval if when + interval > now else now + interval
+                    self._schedule(next_time, idx, REPEAT, generation)
+            fired.append((idx, gesture))
+        return fired
+
+    def _schedule(self, when: float, idx: int, gesture: str, generation: int):
+        self._seq += 1
+        heapq.heappush(self._timers, (when, self._seq, idx, gesture, generation))
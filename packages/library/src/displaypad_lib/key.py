@@ -1,11 +1,16 @@
 """Base Key class for DisplayPad keys, and specialized key implementations."""
 
+import inspect
 import time
 from abc import ABC, abstractmethod
-from typing import Optional, Union, List, Tuple
+from typing import Callable, Optional, Union, List, Tuple
 from PIL import Image, ImageFont
 
-from .keycontext import KeyContext, get_default_font
+from displaypad_driver import AnimationPack
+from .assets import AssetRegistry, Frames, PreparedImage, asset_bytes, asset_registry, source_key
+from .clock import AnimationClock, FrameTimeline, animation_clock
+from displaypad_driver.image import bgr102_to_image
+from .keycontext import KeyContext, LayerCache, get_default_font
 from logging import getLogger
 
 
@@ -16,15 +21,108 @@ class Key(ABC):
     """Base abstract class for a DisplayPad key.
 
     Subclass this and override `render(ctx)` and lifecycle hooks like `on_press()`.
+
+    `on_press`, `on_release`, `on_double_press`, `on_long_press`, `on_repeat`,
+    `on_single_press`, `on_tick` and `render_state` may be `async def`. Their coroutines
+    are scheduled on the event loop of `DisplayPad.run_async()` (or a background loop
+    otherwise) instead of blocking input handling; an async `on_tick`/`render_state`
+    never overlaps with itself.
+
+    Threading, by kind of hook:
+
+    - Plain input hooks (`on_press`, `on_release`, `on_double_press`, `on_long_press`,
+      `on_repeat`, `on_single_press`) and `on_tick` run on the pad's loop thread: the
+      thread calling `update()` or `run()` (a worker thread under `run_async()`).
+    - `on_mount` and `on_unmount` run on the thread that adds, switches or unloads the page.
+    - `async def` hooks, including an async `render_state`, run on the event loop (see above).
+    - Hooks decorated with `@background` run on a `pad.actions` pool thread. Calls for
+      one key never overlap each other, but they may overlap this key's `render` and
+      its other hooks.
+    - `render(ctx)` runs on the loop thread, or on a pool thread when the pad has
+      `render_workers`, concurrently with other keys' `render` (never with this key's
+      plain hooks). It should only read key state and draw into `ctx`. Set
+      `parallel_render = False` to keep a key's `render` on the loop thread.
     """
 
+    parallel_render: bool = True
+    # Tick interval (seconds) used by `DisplayPad.run()` for keys that override
+    # `on_tick` but not `next_wakeup`
+    tick_interval: float = 0.02
+    # Seconds between re-evaluations of an async `render_state` (e.g. an HTTP or IPC call)
+    render_state_interval: float = 1.0
+    # Gesture timing in seconds; None uses the pad's `long_press_sec`, `repeat_delay`
+    # and `repeat_interval`
+    long_press_time: Optional[float] = None
+    repeat_delay: Optional[float] = None
+    repeat_interval: Optional[float] = None
+
+    _last_tick_time: float = 0.0
+    _render_state_refreshed_at: float = 0.0  # time.time() of the last async render_state refresh
+    _resolved_render_state: object = None
+    _redraw_listener: Optional[Callable[[], None]] = None
+    _redraw_requested_at: float = 0.0  # time.perf_counter() of the last request_redraw()
+    _layers: Optional[LayerCache] = None  # Rasters of `ctx.layer()`, created on first render
+
     def __init__(self):
         self._needs_redraw = True
         self.index: Optional[int] = None
 
     def request_redraw(self):
-        """Call this when state changes to trigger a screen update."""
+        """Call this when state changes to trigger a screen update. Safe to call from any thread."""
         self._needs_redraw = True
+        self._redraw_requested_at = time.perf_counter()
+        listener = self._redraw_listener
+        if listener is not None:
+            listener()
+
+    def invalidate_layer(self, name: Optional[str] = None):
+        """Redraw a `ctx.layer()` layer (or all of them) and request a redraw of the key."""
+        if self._layers is not None:
+            self._layers.invalidate(name)
+        self.request_redraw()
+
+    def next_wakeup(self) -> Optional[float]:
+        """Return the time (`time.time()` base) at which `on_tick` next has work to do.
+
+        `DisplayPad.run()` sleeps until the earliest wakeup of the current page and only
+        ticks keys whose wakeup has passed. Return None if the key only changes in response
+        to input or `request_redraw()`. By default, keys overriding `on_tick` are ticked
+        every `tick_interval` seconds, and keys with an async `render_state` every
+        `render_state_interval` seconds.
+        """
+        wakeups = []
+        if type(self).on_tick is not Key.on_tick:
+            wakeups.append(self._last_tick_time + self.tick_interval)
+        if inspect.iscoroutinefunction(self.render_state):
+            wakeups.append(self._render_state_refreshed_at + self.render_state_interval)
+        return min(wakeups) if wakeups else None
+
+    def render_state(self):
+        """Optionally return a comparable value capturing everything `render` depends on.
+
+        A page's cached tile for this key is only reused while the value is unchanged
+        (and no redraw was requested). Defaults to None.
+
+        May be `async def`: it is then re-evaluated at most every `render_state_interval`
+        seconds (1 s by default) when the key is ticked, and a changed result requests a
+        redraw. Read it in `render` via `current_render_state()`.
+        """
+        return None
+
+    def current_render_state(self):
+        """Return `render_state()`, or the last resolved value of an async `render_state`."""
+        if inspect.iscoroutinefunction(self.render_state):
+            return self._resolved_render_state
+        return self.render_state()
+
+    def encoded_tile(self, rotation: int) -> Optional[bytes]:
+        """Optionally return a ready 102x102 BGR payload for the key's current state.
+
+        Keys holding precompiled tiles (e.g. `PackKey`) return them here to skip `render`
+        and encoding. `rotation` is the pad's rotation the payload must be encoded for.
+        Defaults to None: render normally.
+        """
+        return None
 
     # --- Lifecycle Hooks ---
 
@@ -32,6 +130,18 @@ class Key(ABC):
         """Called when the key is assigned to a board slot (0..11)."""
         self.index = index
 
+    def on_unmount(self):
+        """Called when the key's page is unloaded (see lazy pages in `PageManager`).
+
+        Release decoded images, threads or handles here. The key is normally discarded
+        afterwards and the page factory builds a new one when the page is shown again.
+        """
+        pass
+
+    def resource_bytes(self) -> int:
+        """Estimated memory held by the key's resources, used for the page memory budget."""
+        return 0
+
     def on_press(self):
         """Called when the key is pressed down."""
         pass
@@ -44,8 +154,20 @@ class Key(ABC):
         """Called when the key is double-tapped within the double-click window."""
         pass
 
+    def on_single_press(self):
+        """Called once the double-click window after a press passed without a second press.
+
+        Use it instead of `on_press` for actions that must not also run on a double press.
+        Not called for holds that turned into a long press or auto-repeat.
+        """
+        pass
+
     def on_long_press(self):
-        """Called when the key is held down longer than long-press duration."""
+        """Called while the key is still held, once it has been down for the long-press time."""
+        pass
+
+    def on_repeat(self):
+        """Auto-repeat while held: first after `repeat_delay`, then every `repeat_interval` seconds."""
         pass
 
     def on_tick(self):
@@ -59,18 +181,28 @@ class Key(ABC):
 
 
 class FramerateLimitedKey(Key):
-    """A Key that limits redraw requests to a target frame rate (fps)."""
+    """A Key that limits redraw requests to a target frame rate (fps).
+
+    Frames follow `clock`, so redraws stay on a fixed 1/fps grid instead of drifting by
+    each tick's lateness.
+    """
 
-    def __init__(self, fps: float = 10.0):
+    def __init__(self, fps: float = 10.0, clock: Optional[AnimationClock] = None):
         super().__init__()
         self.fps = fps
-        self._last_render_time = 0.0
+        self.clock = clock or animation_clock
+        self._frame: Optional[int] = None
 
     def on_tick(self):
-        current_time = time.time()
-        if current_time - self._last_render_time >= 1.0 / self.fps:
+        frame = int(self.clock.elapsed() * self.fps)
+        if frame != self._frame:
             self.request_redraw()
-            self._last_render_time = current_time
+            self._frame = frame
+
+    def next_wakeup(self) -> Optional[float]:
+        if self._frame is None:
+            return self._last_tick_time + 1.0 / self.fps
+        return self.clock.wall_time((self._frame + 1) / self.fps)
 
 
 class LoggerKey(Key):
@@ -92,84 +224,128 @@ class LoggerKey(Key):
 
 
 class IconKey(Key):
-    """A Key that displays a static icon image (PIL Image or file path)."""
+    """A Key that displays a static icon image (PIL Image, file path or PreparedImage).
+
+    Images are scaled down once to fit within the margins and cached as a `PreparedImage`,
+    so rendering is a single masked paste. A `PreparedImage` is shown as given, centered.
+    """
 
-    def __init__(self, image_or_path: Union[str, Image.Image], margin: int = 10):
+    def __init__(self, image_or_path: Union[str, Image.Image, PreparedImage], margin: int = 10,
+                 registry: Optional[AssetRegistry] = None):
         super().__init__()
-        if isinstance(image_or_path, str):
-            self.pil_image = Image.open(image_or_path).convert("RGBA")
-        else:
-            self.pil_image = image_or_path.convert("RGBA")
+        self._registry = registry  # None: the process-wide asset_registry
         self.margin = margin
+        self._fitted_box: Optional[Tuple[int, int]] = None
+        if isinstance(image_or_path, PreparedImage):
+            self._source = None
+            self.pil_image = None
+            self._fitted: Optional[PreparedImage] = image_or_path
+            return
+        self._source = image_or_path
+        self._source_key = source_key(image_or_path)
+        # Shared with every other key showing the same image (read-only)
+        self.pil_image = (registry or asset_registry).image(image_or_path, "RGBA", key=self._source_key)
+        self._fitted = None
+
+    def __getstate__(self):
+        # Registries hold a lock and cannot be pickled (e.g. by ProcessKey); an unpickled
+        # key uses the shared registry of its process
+        state = self.__dict__.copy()
+        state["_registry"] = None
+        return state
 
     def render(self, ctx: KeyContext):
         ctx.clear()
-        available_width = ctx.width - 2 * self.margin
-        available_height = ctx.height - 2 * self.margin
-
-        iw, ih = self.pil_image.size
-        aspect_ratio = iw / ih if ih > 0 else 1.0
-
-        if iw > available_width or ih > available_height:
-            if aspect_ratio > 1:
-                iw = available_width
-                ih = int(iw / aspect_ratio)
-            else:
-                ih = available_height
-                iw = int(ih * aspect_ratio)
-            resized = self.pil_image.resize((max(1, iw), max(1, ih)), Image.LANCZOS)
-        else:
-            resized = self.pil_image
+        box = (ctx.width - 2 * self.margin, ctx.height - 2 * self.margin)
+        prepared = self._fitted
+        if self._source is not None and (prepared is None or self._fitted_box != box):
+            registry = self._registry or asset_registry
+            prepared = self._fitted = registry.prepared(self._source, box, key=self._source_key)
+            self._fitted_box = box
+
+        x = self.margin + (box[0] - prepared.width) // 2
+        y = self.margin + (box[1] - prepared.height) // 2
+        ctx.paste_image(prepared, x, y)
+
+    def on_unmount(self):
+        if self._source is not None:
+            self._fitted = None
 
-        x = self.margin + (available_width - iw) // 2
-        y = self.margin + (available_height - ih) // 2
-        ctx.paste_image(resized, x, y)
+    def resource_bytes(self) -> int:
+        return asset_bytes(self.pil_image) + asset_bytes(self._fitted)
 
 
 class GifKey(Key):
-    """A Key that plays an animated GIF at its native frame rate."""
+    """A Key that plays an animated GIF at its native frame rate.
+
+    Also accepts a PreparedImage (a still frame) or a list of (PreparedImage, seconds)
+    frames, which are shown as given (`rotation` only applies to decoded GIFs).
+
+    The frame is looked up from `clock` (see `AnimationClock`): late ticks skip frames
+    (counted in `skipped_frames`) and keys playing the same GIF stay in sync.
+    """
 
-    def __init__(self, gif_path_or_image: Union[str, Image.Image], rotation: int = 0):
+    def __init__(self, gif_path_or_image: Union[str, Image.Image, PreparedImage, List[Tuple[PreparedImage, float]]],
+                 rotation: int = 0, registry: Optional[AssetRegistry] = None,
+                 clock: Optional[AnimationClock] = None):
         super().__init__()
         self.rotation = rotation
-        self.frames: List[Tuple[Image.Image, float]] = []  # (frame_image, duration_seconds)
-        self.current_frame_idx = 0
-        self.last_frame_time = time.time()
+        self.clock = clock or animation_clock
+        self.start = 0.0  # Clock time at which frame 0 was (or would have been) shown
         self.is_playing = True
+        self.skipped_frames = 0
 
-        self._load_gif(gif_path_or_image)
-
-    def _load_gif(self, src: Union[str, Image.Image]):
+        # (frame, duration_seconds), decoded once per GIF and shared between keys
+        if isinstance(gif_path_or_image, PreparedImage):
+            self.frames: List[Tuple[PreparedImage, float]] = Frames([(gif_path_or_image, 1.0)])
+        elif isinstance(gif_path_or_image, list):
+            self.frames = Frames(gif_path_or_image)
+        else:
+            registry = registry or asset_registry
+            self.frames = registry.get(
+                (source_key(gif_path_or_image), "gif_frames", rotation),
+                lambda: self._load_gif(gif_path_or_image),
+            )
+        self.timeline = FrameTimeline([duration for _frame, duration in self.frames] or [1.0])
+        self._frame = self.clock.frame(self.timeline, self.start)  # Absolute frame, counting loops
+        self.current_frame_idx = self._frame % len(self.frames) if self.frames else 0
+
+    def _load_gif(self, src: Union[str, Image.Image]) -> Frames:
         img = Image.open(src) if isinstance(src, str) else src.copy()
         if not getattr(img, 'is_animated', False) and getattr(img, 'n_frames', 1) <= 1:
-            frame = img.convert("RGBA").resize((133, 120), Image.LANCZOS)
-            if self.rotation:
-                frame = frame.rotate(-self.rotation, expand=False)
-            self.frames = [(frame, 1.0)]
-            return
+            return Frames([(self._prepare_frame(img), 1.0)])
 
+        frames = Frames()
         try:
             for i in range(img.n_frames):
                 img.seek(i)
                 duration = max(img.info.get('duration', 100), 20) / 1000.0
-                frame = img.convert("RGBA").resize((133, 120), Image.LANCZOS)
-                if self.rotation:
-                    frame = frame.rotate(-self.rotation, expand=False)
-                self.frames.append((frame, duration))
+                frames.append((self._prepare_frame(img), duration))
         except EOFError:
             pass
+        return frames
+
+    def _prepare_frame(self, img: Image.Image) -> PreparedImage:
+        frame = img.convert("RGBA").resize((133, 120), Image.LANCZOS)
+        if self.rotation:
+            frame = frame.rotate(-self.rotation, expand=False)
+        return PreparedImage(frame)
 
     def on_tick(self):
-        if not self.is_playing or not self.frames:
+        if not self.is_playing or len(self.frames) < 2:
             return
-
-        now = time.time()
-        _frame_img, duration = self.frames[self.current_frame_idx]
-        if now - self.last_frame_time >= duration:
-            self.current_frame_idx = (self.current_frame_idx + 1) % len(self.frames)
-            self.last_frame_time = now
+        frame = self.clock.frame(self.timeline, self.start)
+        if frame != self._frame:
+            self.skipped_frames += max(frame - self._frame - 1, 0)
+            self._frame = frame
+            self.current_frame_idx = frame % len(self.frames)
             self.request_redraw()
 
+    def next_wakeup(self) -> Optional[float]:
+        if not self.is_playing or len(self.frames) < 2:
+            return None
+        return self.clock.wall_time(self.start + self.timeline.next_frame_time(self._frame))
+
     def render(self, ctx: KeyContext):
         ctx.clear()
         if not self.frames:
@@ -177,6 +353,57 @@ class GifKey(Key):
         frame_img, _ = self.frames[self.current_frame_idx]
         ctx.paste_image(frame_img, 0, 0)
 
+    def resource_bytes(self) -> int:
+        return asset_bytes(self.frames)
+
+
+class PackKey(Key):
+    """A Key that plays a precompiled animation pack (.dpak) without decoding or encoding.
+
+    `tile` selects the tile of panel packs (0..11). Frames are uploaded straight from the
+    memory-mapped pack when its rotation matches the pad's; otherwise they are decoded.
+    Frames follow `clock` like `GifKey`'s.
+    """
+
+    def __init__(self, pack: Union[str, AnimationPack], tile: int = 0, clock: Optional[AnimationClock] = None):
+        super().__init__()
+        self.pack = AnimationPack.open(pack) if isinstance(pack, str) else pack
+        self.tile = tile
+        self.clock = clock or animation_clock
+        self.start = 0.0  # Clock time at which frame 0 was (or would have been) shown
+        self.is_playing = True
+        self.skipped_frames = 0
+        self.timeline = FrameTimeline([d / 1000.0 for d in self.pack.durations])
+        self._frame = self.clock.frame(self.timeline, self.start) if self.pack.is_animated else 0
+        self.current_frame_idx = self._frame % self.pack.frame_count
+
+    def on_tick(self):
+        if not self.is_playing or not self.pack.is_animated:
+            return
+        frame = self.clock.frame(self.timeline, self.start)
+        if frame != self._frame:
+            self.skipped_frames += max(frame - self._frame - 1, 0)
+            self._frame = frame
+            self.current_frame_idx = frame % self.pack.frame_count
+            self.request_redraw()
+
+    def next_wakeup(self) -> Optional[float]:
+        if not self.is_playing or not self.pack.is_animated:
+            return None
+        return self.clock.wall_time(self.start + self.timeline.next_frame_time(self._frame))
+
+    def render_state(self):
+        return self.current_frame_idx
+
+    def encoded_tile(self, rotation: int) -> Optional[bytes]:
+        if rotation % 360 != self.pack.rotation:
+            return None
+        return self.pack.tile(self.current_frame_idx, self.tile)
+
+    def render(self, ctx: KeyContext):
+        tile = self.pack.tile(self.current_frame_idx, self.tile)
+        ctx.image.paste(bgr102_to_image(tile, self.pack.rotation), (0, 0))
+
 
 class LabelKey(Key):
     """A Key that displays a simple text label with background color."""
@@ -1,6 +1,10 @@
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
 import PIL.ImageDraw as ImageDraw
 from PIL import Image, ImageFont
 
+from .assets import PreparedImage
+
 
 def get_default_font(size: int = 18) -> ImageFont.ImageFont:
     """Load a crisp, bold system font (size 18pt by default) for high-density key displays."""
@@ -23,6 +27,40 @@ def get_default_font(size: int = 18) -> ImageFont.ImageFont:
         return ImageFont.load_default()
 
 
+class LayerCache:
+    """Rasterized layers of one key (see `KeyContext.layer`), kept between renders.
+
+    Holds each layer's RGBA raster (cropped to what it drew) with the state it was drawn
+    for, and the tile after each layer of the last render but the topmost, so a render
+    whose first layers are unchanged starts from a single paste.
+    """
+
+    def __init__(self):
+        self.size: Optional[Tuple[int, int]] = None
+        # name -> (state, version, raster, (x, y)); raster is None for an empty layer
+        self.rasters: Dict[str, Tuple[object, int, Optional[Image.Image], Tuple[int, int]]] = {}
+        self.stack: List[Tuple[str, int]] = []  # (name, version) of the last render's layers
+        self.composites: List[Image.Image] = []  # Tile after layer i of the last render
+        self._version = 0
+
+    def invalidate(self, name: Optional[str] = None):
+        """Redraw a layer (or every layer) on its next use."""
+        if name is None:
+            self.rasters.clear()
+        else:
+            self.rasters.pop(name, None)
+
+    def clear(self):
+        self.rasters.clear()
+        self.stack.clear()
+        self.composites.clear()
+
+    @property
+    def nbytes(self) -> int:
+        images = [entry[2] for entry in self.rasters.values() if entry[2] is not None] + self.composites
+        return sum(len(image.getbands()) * image.width * image.height for image in images)
+
+
 class KeyContext:
     """A drawing context for a single key on the DisplayPad.
     
@@ -30,6 +68,9 @@ class KeyContext:
     Provides native access to PIL ImageDraw (`ctx.draw`) and per-key PIL Image (`ctx.image`),
     as well as layout and shape convenience helpers.
     Unrecognized method calls are forwarded directly to `self.draw`.
+
+    `layer()` composes the tile from named, cached layers; `layers` holds their cache
+    (the pad gives each key its own).
     """
 
     def __init__(
@@ -49,6 +90,72 @@ class KeyContext:
         self.image = image if image is not None else Image.new("RGB", (self.width, self.height), (0, 0, 0))
         self.draw = pil_draw if pil_draw is not None else ImageDraw.Draw(self.image)
         self.font = font or get_default_font(18)
+        self._default_font = self.font
+        self.layers: Optional[LayerCache] = None
+        self._layer_index = 0  # Layers drawn since the last reset()
+        self._layer_prefix = True  # All layers so far matched the last render
+
+    def reset(self):
+        """Restore a reused context to a black surface with its default font."""
+        self.draw.rectangle([0, 0, self.width, self.height], fill=(0, 0, 0))
+        self.font = self._default_font
+        self._layer_index = 0
+        self._layer_prefix = True
+
+    def layer(self, name: str, draw: Callable[["KeyContext"], None], state=None):
+        """Draw a named layer, reusing its raster while state is unchanged.
+
+        draw(ctx) paints the layer onto a transparent RGBA surface of the tile size; it
+        only runs again when state differs from the state it was last drawn for (or after
+        `invalidate_layer`). Layers stack in call order from a black tile, replacing
+        anything drawn before the first layer; draw on top of them as usual afterwards.
+        While the first layers of a render match the previous render, the tile is
+        restored from their cached composite and only the changed layers are composited.
+
+        Example:
+            ctx.layer("icon", lambda c: c.paste_image(icon), state=icon_path)  # Drawn once
+            ctx.layer("badge", draw_badge, state=unread)                       # On change
+        """
+        cache = self.layers
+        if cache is None:
+            cache = self.layers = LayerCache()
+        if cache.size != (self.width, self.height):
+            cache.clear()
+            cache.size = (self.width, self.height)
+
+        entry = cache.rasters.get(name)
+        if entry is None or entry[0] != state:
+            raster = Image.new("RGBA", (self.width, self.height), (0, 0, 0, 0))
+            draw(KeyContext(ImageDraw.Draw(raster), font=self._default_font, image=raster,
+                            width=self.width, height=self.height))
+            bbox = raster.getbbox()  # Only what the layer drew is composited
+            cache._version += 1
+            entry = (state, cache._version, raster.crop(bbox) if bbox else None, bbox[:2] if bbox else (0, 0))
+            cache.rasters[name] = entry
+
+        index = self._layer_index
+        self._layer_index += 1
+        stacked = (name, entry[1])
+        if (self._layer_prefix and index < len(cache.composites) and cache.stack[index] == stacked):
+            self.image.paste(cache.composites[index], (0, 0))
+            return
+        if self._layer_prefix:
+            # First layer that differs from the last render: continue from the cached prefix
+            self._layer_prefix = False
+            del cache.stack[index:], cache.composites[index:]
+            if index == 0:
+                self.image.paste((0, 0, 0), (0, 0, self.width, self.height))
+        elif len(cache.composites) < index:
+            cache.composites.append(self.image.copy())  # Tile after the previous layer
+        _state, _version, raster, offset = entry
+        if raster is not None:
+            self.image.paste(raster, offset, raster)
+        cache.stack.append(stacked)
+
+    def invalidate_layer(self, name: Optional[str] = None):
+        """Redraw a layer (or every layer) on its next `layer()` call."""
+        if self.layers is not None:
+            self.layers.invalidate(name)
 
     def set_font(self, font):
         self.font = font
@@ -96,10 +203,13 @@ class KeyContext:
         fill = kwargs.pop('color', fill)
         self.draw.arc([x1, y1, x2, y2], start, end, fill=fill, width=width, **kwargs)
 
-    def paste_image(self, pil_image: Image.Image, x=0, y=0):
-        """Paste an image onto this key's surface."""
+    def paste_image(self, pil_image: Union[Image.Image, PreparedImage], x=0, y=0):
+        """Paste an image onto this key's surface (a PreparedImage needs no conversion)."""
         if self.image is None:
             raise ValueError("KeyContext needs a base image to paste onto")
+        if isinstance(pil_image, PreparedImage):
+            self.image.paste(pil_image.rgb, (x, y), pil_image.mask)
+            return
         src = pil_image.convert("RGBA")
         alpha = src.getchannel("A") if "A" in src.getbands() else None
         rgb = src.convert("RGB")
@@ -0,0 +1,243 @@
+"""Streaming media key: plays image sequences or videos without preloading them."""
+
+import glob
+import importlib.util
+import os
+import queue
+import threading
+import time
+from logging import getLogger
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from PIL import Image, ImageOps
+
+from displaypad_driver import ICON_SIZE
+from .key import Key
+from .keycontext import KeyContext
+
+log = getLogger(__name__)
+
+# PyAV is only imported when a video is played
+AV_AVAILABLE = importlib.util.find_spec("av") is not None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tif", ".tiff")
+VIDEO_EXTENSIONS = (".mp4", ".m4v", ".mkv", ".webm", ".mov", ".avi")
+
+MediaSource = Union[str, Sequence[str], Iterable[Image.Image]]
+
+_END = object()
+
+FrameLoader = Callable[[], Image.Image]
+
+
+class MediaKey(Key):
+    """A Key that streams an image sequence or a video at its native timing.
+
+    `source` may be a directory of images, a glob pattern, a list of image paths or an
+    iterable of PIL images (all shown at `fps`), or a video file (needs the optional
+    `av` package; played at its own timestamps). A decode thread keeps at most
+    `prefetch` frames, already scaled to the key, in a queue, so memory stays constant
+    regardless of clip length. Playback follows the wall clock: frames that are late
+    when they come due are dropped (`dropped_frames`) instead of slowing the clip down,
+    and the decoder skips scaling frames that are already late.
+
+    Directories and glob patterns are listed again on every loop, so a folder of
+    camera snapshots that is refreshed externally keeps playing its newest images.
+    """
+
+    def __init__(self, source: MediaSource, fps: float = 10.0, loop: bool = True,
+                 prefetch: int = 8, rotation: int = 0, size: Tuple[int, int] = (ICON_SIZE, ICON_SIZE)):
+        super().__init__()
+        self.source = source
+        self.fps = fps
+        self.loop = loop
+        self.rotation = rotation
+        self.size = size
+        self.is_playing = True
+
+        self.decoded_frames = 0
+        self.shown_frames = 0
+        self.dropped_frames = 0
+
+        self.prefetch = max(1, prefetch)
+        self._frames: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        self._next: Optional[Tuple[float, Image.Image]] = None  # Dequeued, not yet due
+        self._current: Optional[Image.Image] = None
+        self._clock_start: Optional[float] = None  # time.time() at which pts 0 is shown
+        self._stop = threading.Event()
+        self._decoder: Optional[threading.Thread] = None
+
+    # --- Playback (main thread) ---
+
+    def on_tick(self):
+        if self._decoder is None:
+            self.start()
+        if not self.is_playing:
+            return
+
+        now = time.time()
+        frame = None
+        while True:
+            if self._next is None:
+                try:
+                    item = self._frames.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _END:
+                    self.is_playing = False
+                    break
+                self._next = item
+            pts, img = self._next
+            if self._clock_start is None:
+                self._clock_start = now - pts
+            if self._clock_start + pts > now:
+                break
+            if frame is not None:
+                self.dropped_frames += 1  # Superseded by a later frame that is also due
+            frame = img
+            self._next = None
+
+        if frame is not None:
+            self._current = frame
+            self.shown_frames += 1
+            self.request_redraw()
+
+    def next_wakeup(self) -> Optional[float]:
+        if not self.is_playing:
+            return None
+        if self._next is not None and self._clock_start is not None:
+            return self._clock_start + self._next[0]
+        # Waiting for the decoder: poll the prefetch queue
+        return super().next_wakeup()
+
+    def render(self, ctx: KeyContext):
+        ctx.clear()
+        if self._current is not None:
+            ctx.image.paste(self._current, (0, 0))
+
+    def on_unmount(self):
+        self.close()
+
+    def resource_bytes(self) -> int:
+        width, height = self.size
+        return (self._frames.qsize() + 2) * width * height * 3
+
+    def pause(self):
+        self.is_playing = False
+
+    def resume(self):
+        """Continue playback; the clock restarts at the next frame, so nothing is dropped for the pause."""
+        if not self.is_playing:
+            self._clock_start = None
+            self.is_playing = True
+
+    # --- Decoding (background thread) ---
+
+    def start(self):
+        """Start the decode thread (done automatically on the first tick)."""
+        if self._decoder is not None:
+            return
+        # Each decode thread gets its own stop event and queue: one that outlives close()
+        # never feeds or resumes next to its successor
+        self._stop = threading.Event()
+        self._frames = queue.Queue(maxsize=self.prefetch)
+        self._decoder = threading.Thread(target=self._decode_loop, args=(self._stop, self._frames),
+                                         name="displaypad-media", daemon=True)
+        self._decoder.start()
+
+    def close(self):
+        """Stop the decode thread and release queued frames; the next tick starts over."""
+        self._stop.set()
+        if self._decoder is not None:
+            self._decoder.join(timeout=1.0)
+        self._decoder = None
+        self._next = None
+        self._current = None
+        self._clock_start = None
+        self.is_playing = True
+        self._frames = queue.Queue(maxsize=self.prefetch)
+
+    def _decode_loop(self, stop: threading.Event, frames: queue.Queue):
+        offset = 0.0
+        try:
+            while not stop.is_set():
+                last_pts = None
+                for pts, load in self._iter_source():
+                    if stop.is_set():
+                        return
+                    last_pts = pts
+                    pts += offset
+                    if self._is_late(pts):
+                        self.dropped_frames += 1
+                        continue
+                    self._put(stop, frames, (pts, self._prepare(load())))
+                if last_pts is None or not self.loop:
+                    break
+                offset += last_pts + 1.0 / self.fps
+            self._put(stop, frames, _END)
+        except Exception as e:
+            log.error(f"MediaKey decoding failed: {e!r}")
+            self._put(stop, frames, _END)
+
+    @staticmethod
+    def _put(stop: threading.Event, frames: queue.Queue, item) -> bool:
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _is_late(self, pts: float) -> bool:
+        """True if the frame after this one is already due, so this frame can never be shown."""
+        start = self._clock_start
+        return start is not None and self.is_playing and start + pts + 1.0 / self.fps < time.time()
+
+    def _prepare(self, img: Image.Image) -> Image.Image:
+        frame = ImageOps.fit(img.convert("RGB"), self.size, Image.BILINEAR)
+        if self.rotation:
+            frame = frame.rotate(-self.rotation, expand=False)
+        self.decoded_frames += 1
+        return frame
+
+    def _iter_source(self) -> Iterator[Tuple[float, FrameLoader]]:
+        """Yield (pts seconds, loader) pairs; loaders are only called for frames that are not dropped."""
+        source = self.source
+        if isinstance(source, str) and os.path.isfile(source) and source.lower().endswith(VIDEO_EXTENSIONS):
+            yield from self._iter_video(source)
+            return
+
+        if isinstance(source, str):
+            if os.path.isdir(source):
+                paths = sorted(os.path.join(source, name) for name in os.listdir(source)
+                               if name.lower().endswith(IMAGE_EXTENSIONS))
+            else:
+                paths = sorted(glob.glob(source))
+            items = paths
+        else:
+            items = source
+
+        for i, item in enumerate(items):
+            if isinstance(item, Image.Image):
+                yield i / self.fps, (lambda item=item: item)
+            else:
+                yield i / self.fps, (lambda item=item: _open_image(item, self.size))
+
+    def _iter_video(self, path: str) -> Iterator[Tuple[float, FrameLoader]]:
+        if not AV_AVAILABLE:
+            raise RuntimeError("Video playback needs PyAV (pip install av)")
+        import av
+        with av.open(path) as container:
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"
+            for i, frame in enumerate(container.decode(stream)):
+                pts = frame.time if frame.time is not None else i / self.fps
+                yield pts, frame.to_image
+
+
+def _open_image(path: str, size: Tuple[int, int]) -> Image.Image:
+    with Image.open(path) as img:
+        img.draft("RGB", size)  # JPEG: let the decoder downscale
+        img.load()
+        return img.copy() if img.mode in ("RGB", "RGBA") else img.convert("RGB")
@@ -0,0 +1,242 @@
+"""Offscreen backend: runs the full page/key/render pipeline without a DisplayPad attached."""
+
+import csv
+import os
+import queue
+import struct
+import threading
+import time
+from logging import getLogger
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional
+
+from PIL import Image
+
+from displaypad_driver import ColorCalibration, DisplayPadError, ICON_SIZE, KEYS_PER_ROW, NUM_KEYS
+from displaypad_driver.image import bgr102_to_image
+
+log = getLogger(__name__)
+
+RAW_MAGIC = b"DPRAW1\n"
+# timestamp (seconds since recording start), key index, payload length
+RAW_RECORD = struct.Struct("<dBI")
+
+
+class RecordedTile(NamedTuple):
+    timestamp: float
+    key_index: int
+    bgr: bytes
+
+
+def read_raw_frames(path: str) -> Iterator[RecordedTile]:
+    """Iterate the tiles of a raw stream written by `FrameRecorder(fmt="raw")`."""
+    with open(path, "rb") as f:
+        if f.read(len(RAW_MAGIC)) != RAW_MAGIC:
+            raise DisplayPadError(f"{path} is not a DisplayPad raw frame stream")
+        while True:
+            header = f.read(RAW_RECORD.size)
+            if len(header) < RAW_RECORD.size:
+                return
+            timestamp, key_index, length = RAW_RECORD.unpack(header)
+            yield RecordedTile(timestamp, key_index, f.read(length))
+
+
+class FrameRecorder:
+    """Records tiles uploaded to an `OffscreenDriver`.
+
+    Formats:
+        - None: keep tiles in memory only (`tiles`)
+        - "raw": append tiles with timestamps to a single binary stream (see `read_raw_frames`)
+        - "png": write one PNG of the whole panel per upload into a directory, plus `frames.csv`
+          mapping frame numbers to timestamps and updated keys
+    """
+
+    def __init__(self, path: Optional[str] = None, fmt: Optional[str] = None, keep_tiles: bool = True):
+        if fmt not in (None, "raw", "png"):
+            raise ValueError(f"fmt must be None, 'raw' or 'png', got {fmt!r}")
+        if fmt and not path:
+            raise ValueError(f"fmt={fmt!r} requires a path")
+        self.path = path
+        self.fmt = fmt
+        self.keep_tiles = keep_tiles
+        self.tiles: List[RecordedTile] = []
+        self.frame_count = 0
+        self.tile_count = 0
+        self.started = time.perf_counter()
+        self.panel = Image.new("RGB", (ICON_SIZE * KEYS_PER_ROW, ICON_SIZE * (NUM_KEYS // KEYS_PER_ROW)))
+        self._lock = threading.Lock()
+        self._raw: Optional[BinaryIO] = None
+        self._index = None
+        self._index_file = None
+
+        if fmt == "raw":
+            self._raw = open(path, "wb")
+            self._raw.write(RAW_MAGIC)
+        elif fmt == "png":
+            os.makedirs(path, exist_ok=True)
+            self._index_file = open(os.path.join(path, "frames.csv"), "w", newline="")
+            self._index = csv.writer(self._index_file)
+            self._index.writerow(["frame", "timestamp", "keys"])
+
+    def record(self, tiles: Dict[int, bytes]):
+        """Record one upload: {key_index: bgr} for a single key or the whole panel."""
+        timestamp = time.perf_counter() - self.started
+        with self._lock:
+            for key_index, bgr in tiles.items():
+                self.tile_count += 1
+                if self.keep_tiles:
+                    self.tiles.append(RecordedTile(timestamp, key_index, bgr))
+                if self._raw:
+                    self._raw.write(RAW_RECORD.pack(timestamp, key_index, len(bgr)))
+                    self._raw.write(bgr)
+                row, col = divmod(key_index, KEYS_PER_ROW)
+                self.panel.paste(bgr102_to_image(bgr), (col * ICON_SIZE, row * ICON_SIZE))
+            if self._index:
+                self.panel.save(os.path.join(self.path, f"frame_{self.frame_count:06d}.png"))
+                self._index.writerow([self.frame_count, f"{timestamp:.6f}", " ".join(map(str, sorted(tiles)))])
+            self.frame_count += 1
+
+    def close(self):
+        with self._lock:
+            if self._raw:
+                self._raw.close()
+                self._raw = None
+            if self._index_file:
+                self._index_file.close()
+                self._index_file = None
+                self._index = None
+
+
+class OffscreenDriver:
+    """Drop-in replacement for `displaypad_driver.DisplayPad` that needs no USB device.
+
+    Uploaded tiles go to a `FrameRecorder` (after `calibration`, like on the device, so
+    recordings preview it); key presses can be scripted with `press()` and `release()`.
+
+    Example:
+        pad = DisplayPad(driver=OffscreenDriver(FrameRecorder("out.raw", fmt="raw")))
+    """
+
+    def __init__(self, recorder: Optional[FrameRecorder] = None, calibration: Optional[ColorCalibration] = None):
+        self.recorder = recorder if recorder is not None else FrameRecorder()
+        self.calibration = calibration
+        self.pressed_keys = set()
+        self.brightness = 100
+        self.connected = True
+        self._inputs: queue.Queue = queue.Queue()
+
+    def connect(self):
+        self.connected = True
+
+    def close(self):
+        if self.connected:
+            self.connected = False
+            self.recorder.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def set_brightness(self, percent: int = 100):
+        self.brightness = max(0, min(100, int(percent)))
+
+    def fade_to(self, percent: int, duration: float = 1.0, step_interval: float = 0.03) -> threading.Event:
+        """Jump straight to the target brightness; offscreen there is nothing to fade."""
+        self.set_brightness(percent)
+        done = threading.Event()
+        done.set()
+        return done
+
+    def upload_button(self, key_index: int, bgr_pixels: bytes, key_events: Optional[list] = None):
+        if not (0 <= key_index < NUM_KEYS):
+            raise ValueError(f"key_index must be between 0 and {NUM_KEYS - 1}")
+        if not self.connected:
+            raise DisplayPadError("Device not connected")
+        self.recorder.record({key_index: self._calibrate(bgr_pixels)})
+
+    def upload_panel(self, tiles_bgr: List[bytes], key_events: Optional[list] = None):
+        if len(tiles_bgr) != NUM_KEYS:
+            raise ValueError(f"Expected {NUM_KEYS} BGR tile payloads, got {len(tiles_bgr)}")
+        if not self.connected:
+            raise DisplayPadError("Device not connected")
+        self.recorder.record({idx: self._calibrate(bgr) for idx, bgr in enumerate(tiles_bgr)})
+
+    def _calibrate(self, bgr_pixels: bytes) -> bytes:
+        calibration = self.calibration
+        return calibration.apply(bgr_pixels) if calibration is not None else bgr_pixels
+
+    def press(self, key_index: int):
+        """Queue a key press, delivered by the next `poll_key()`."""
+        self._inputs.put((key_index, True))
+
+    def release(self, key_index: int):
+        """Queue a key release, delivered by the next `poll_key()`."""
+        self._inputs.put((key_index, False))
+
+    def poll_key(self, timeout: int = 150) -> Dict[str, List[int]]:
+        """Return the next scripted key transition, waiting up to timeout milliseconds."""
+        pressed, released = [], []
+        try:
+            key_index, down = self._inputs.get(timeout=timeout / 1000) if timeout > 0 else self._inputs.get_nowait()
+            if down and key_index not in self.pressed_keys:
+                self.pressed_keys.add(key_index)
+                pressed.append(key_index)
+            elif not down and key_index in self.pressed_keys:
+                self.pressed_keys.discard(key_index)
+                released.append(key_index)
+        except queue.Empty:
+            pass
+        return {'pressed': pressed, 'released': released, 'current': sorted(self.pressed_keys),
+                'timestamp': time.perf_counter()}
+
+
+class OffscreenReport(NamedTuple):
+    frames: int
+    elapsed: float
+    frame_times: List[float]
+    over_budget: List[int]  # indices into frame_times
+    tiles: int
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+
+def run_offscreen(pad, frames: int = 300, fps: Optional[float] = None,
+                  budget: Optional[float] = None, force_redraw: bool = False) -> OffscreenReport:
+    """Drive `pad.update()` for a number of frames and time each one.
+
+    Args:
+        pad: A `DisplayPad` built with an `OffscreenDriver`.
+        frames: Number of update ticks to run.
+        fps: Tick rate in real time; None runs as fast as possible.
+        budget: Frame budget in seconds (default 1/fps); longer frames are reported and logged.
+        force_redraw: Redraw every key on every frame to measure worst-case render throughput.
+    """
+    if budget is None and fps:
+        budget = 1.0 / fps
+    recorder = pad.driver.recorder
+    tiles_before = recorder.tile_count
+    frame_times = []
+    over_budget = []
+    start = time.perf_counter()
+    for frame in range(frames):
+        if force_redraw:
+            for key in pad.keys:
+                if key:
+                    key.request_redraw()
+        frame_start = time.perf_counter()
+        pad.update(timeout=0)
+        frame_time = time.perf_counter() - frame_start
+        frame_times.append(frame_time)
+        if budget is not None and frame_time > budget:
+            over_budget.append(frame)
+            log.warning(f"Frame {frame} took {frame_time * 1000:.1f} ms (budget {budget * 1000:.1f} ms)")
+        if fps:
+            delay = start + (frame + 1) / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    pad.flush()
+    elapsed = time.perf_counter() - start
+    return OffscreenReport(frames, elapsed, frame_times, over_budget, recorder.tile_count - tiles_before)
@@ -1,9 +1,23 @@
 """Multi-page layout management and page auto-timeout engine for DisplayPad."""
 
 import time
-from typing import Dict, List, Optional, Union
+from collections import OrderedDict
+from logging import getLogger
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
 from .key import Key
 
+log = getLogger(__name__)
+
+PageFactory = Callable[[], "Page"]
+
+
+class TileSnapshot(NamedTuple):
+    """Encoded tile of a key from a page's last render."""
+    key: Key
+    state: object
+    rotation: int
+    bgr: bytes
+
 
 class Page:
     """Represents a single 12-key page layout with optional auto-timeout behavior."""
@@ -17,6 +31,7 @@ class Page:
         self.timeout_mode = timeout_mode  # "off", "after", "idle"
         self.timeout_seconds = timeout_seconds
         self.timeout_target = timeout_target
+        self._snapshots: Dict[int, TileSnapshot] = {}
 
     def __getitem__(self, index: int) -> Optional[Key]:
         if 0 <= index < 12:
@@ -26,18 +41,68 @@ class Page:
     def __setitem__(self, index: int, key_instance: Optional[Key]):
         if 0 <= index < 12:
             self.keys[index] = key_instance
+            self._snapshots.pop(index, None)
             if key_instance is not None:
                 key_instance.on_mount(index)
                 key_instance.request_redraw()
         else:
             raise IndexError(f"Key index {index} out of range (0..11)")
 
+    # --- Tile snapshot cache ---
+
+    def get_snapshot(self, index: int, key: Key, rotation: int = 0) -> Optional[bytes]:
+        """Return the cached encoded tile for a slot, or None if the key changed since it was rendered."""
+        snap = self._snapshots.get(index)
+        if snap is None or snap.key is not key or snap.rotation != rotation or key._needs_redraw:
+            return None
+        if snap.state != key.current_render_state():
+            return None
+        return snap.bgr
+
+    def store_snapshot(self, index: int, key: Key, bgr: bytes, rotation: int = 0):
+        """Remember the encoded tile a key rendered to in this slot."""
+        self._snapshots[index] = TileSnapshot(key, key.current_render_state(), rotation, bgr)
+
+    def clear_snapshots(self):
+        self._snapshots.clear()
+
+    @property
+    def snapshot_bytes(self) -> int:
+        return sum(len(snap.bgr) for snap in self._snapshots.values())
+
+    @property
+    def resource_bytes(self) -> int:
+        """Estimated memory held by the page: its keys' resources and layers plus cached tiles."""
+        return self.snapshot_bytes + sum(key.resource_bytes() + (key._layers.nbytes if key._layers else 0)
+                                         for key in self.keys if key is not None)
+
+    def unmount(self):
+        """Call `on_unmount` on every key and drop the cached tiles."""
+        self.clear_snapshots()
+        for key in self.keys:
+            if key is not None:
+                key.on_unmount()
+                key._layers = None
+
 
 class PageManager:
-    """Manages page registration, active page switching, and auto-timeout transitions."""
+    """Manages page registration, active page switching, and auto-timeout transitions.
+
+    Pages can be registered lazily as factories (`add_page("Media", build_media_page)`):
+    they are built on the first `switch_to`, and inactive ones are unloaded again (keys get
+    `on_unmount()`) once the loaded lazy pages exceed `page_budget` bytes.
+    """
 
-    def __init__(self, main_page: Optional[Page] = None):
+    def __init__(self, main_page: Optional[Page] = None, snapshot_budget: int = 8 * 1024 * 1024,
+                 page_budget: int = 32 * 1024 * 1024):
         self.pages: Dict[Union[str, int], Page] = {}
+        # Memory cap (bytes) for cached page tiles across all pages
+        self.snapshot_budget = snapshot_budget
+        # Memory cap (bytes) for resources of loaded, inactive lazy pages
+        self.page_budget = page_budget
+        self._snapshot_lru: "OrderedDict[int, Page]" = OrderedDict()
+        self._factories: Dict[Union[str, int], PageFactory] = {}
+        self._lazy_lru: "OrderedDict[Union[str, int], Page]" = OrderedDict()
         self.current_page_id: Union[str, int] = "Main"
         self.previous_page_id: Union[str, int] = "Main"
 
@@ -47,34 +112,107 @@ class PageManager:
         default_main = main_page or Page(name="Main")
         self.add_page("Main", default_main)
 
-    def add_page(self, page_id: Union[str, int], page: Page):
+    def add_page(self, page_id: Union[str, int], page: Union[Page, PageFactory]) -> Optional[Page]:
+        """Register a Page, or a factory returning one that is only called when the page is needed.
+
+        A loaded lazy page that is replaced is unmounted, unless it is the active page: that
+        one is returned for the caller to unmount once the new page is shown.
+        """
+        replaced = self._lazy_lru.pop(page_id, None)
+        if replaced is not None:
+            self._snapshot_lru.pop(id(replaced), None)
+            if page_id != self.current_page_id:
+                replaced.unmount()
+                replaced = None
+        if not isinstance(page, Page):
+            self.pages.pop(page_id, None)
+            self._factories[page_id] = page
+            return replaced
+        self._factories.pop(page_id, None)
         self.pages[page_id] = page
-        if page.name and page.name not in self.pages:
+        if page.name and page.name not in self.pages and page.name not in self._factories:
             self.pages[page.name] = page
+        return replaced
+
+    def has_page(self, page_id: Union[str, int]) -> bool:
+        return page_id in self.pages or page_id in self._factories
+
+    def get_page(self, page_id: Union[str, int]) -> Optional[Page]:
+        """Return a page, building it from its factory if it is not loaded."""
+        page = self.pages.get(page_id)
+        if page is not None:
+            if page_id in self._lazy_lru:
+                self._lazy_lru.move_to_end(page_id)
+            return page
+        factory = self._factories.get(page_id)
+        if factory is None:
+            return None
+        page = factory()
+        if not isinstance(page, Page):
+            raise TypeError(f"Page factory for {page_id!r} returned {type(page).__name__}, expected Page")
+        self.pages[page_id] = page
+        self._lazy_lru[page_id] = page
+        log.debug(f"Built lazy page {page_id!r}")
+        return page
+
+    def unload_page(self, page_id: Union[str, int]) -> bool:
+        """Unload a loaded lazy page (never the active one); it is rebuilt on its next use."""
+        page = self._lazy_lru.get(page_id)
+        if page is None or page_id == self.current_page_id:
+            return False
+        del self._lazy_lru[page_id]
+        del self.pages[page_id]
+        self._snapshot_lru.pop(id(page), None)
+        page.unmount()
+        log.debug(f"Unloaded lazy page {page_id!r}")
+        return True
+
+    def enforce_page_budget(self):
+        """Unload least recently used inactive lazy pages until they fit in `page_budget`."""
+        inactive = [(pid, page) for pid, page in self._lazy_lru.items() if pid != self.current_page_id]
+        total = sum(page.resource_bytes for _pid, page in inactive)
+        for page_id, page in inactive:
+            if total <= self.page_budget:
+                break
+            total -= page.resource_bytes
+            self.unload_page(page_id)
 
     def get_current_page(self) -> Page:
-        return self.pages.get(self.current_page_id) or self.pages.get("Main") or list(self.pages.values())[0]
+        return (self.get_page(self.current_page_id) or self.pages.get("Main")
+                or list(self.pages.values())[0])
 
     def switch_to(self, page_id: Union[str, int]) -> bool:
-        if page_id not in self.pages:
+        if not self.has_page(page_id):
             return False
 
         if page_id == self.current_page_id:
             return True
 
+        self.get_page(page_id)
         self.previous_page_id = self.current_page_id
         self.current_page_id = page_id
         now = time.time()
         self.last_switch_time = now
         self.last_activity_time = now
-
-        current_page = self.get_current_page()
-        for idx, key in enumerate(current_page.keys):
-            if key:
-                key.request_redraw()
-
+        self.enforce_page_budget()
         return True
 
+    def note_snapshot(self, page: Page):
+        """Mark a page's tile cache as most recently used and evict older caches over budget."""
+        self._snapshot_lru[id(page)] = page
+        self._snapshot_lru.move_to_end(id(page))
+
+        total = sum(p.snapshot_bytes for p in self._snapshot_lru.values())
+        current = self.get_current_page()
+        for page_key, cached_page in list(self._snapshot_lru.items()):
+            if total <= self.snapshot_budget:
+                break
+            if cached_page is current:
+                continue
+            total -= cached_page.snapshot_bytes
+            cached_page.clear_snapshots()
+            del self._snapshot_lru[page_key]
+
     def back(self) -> bool:
         return self.switch_to(self.previous_page_id)
 
@@ -87,11 +225,18 @@ class PageManager:
 
         Returns target page_id to switch to, or None.
         """
+        deadline = self.next_timeout_deadline()
+        if deadline is None or time.time() < deadline:
+            return None
+        page = self.get_current_page()
+        return self.previous_page_id if page.timeout_target == "prev" else page.timeout_target
+
+    def next_timeout_deadline(self) -> Optional[float]:
+        """Return the time at which the current page times out, or None if it never does."""
         page = self.get_current_page()
         if not page or page.timeout_mode == "off" or page.timeout_seconds <= 0:
             return None
 
-        now = time.time()
         target = page.timeout_target
         if target == "prev":
             resolved_target = self.previous_page_id
@@ -102,10 +247,8 @@ class PageManager:
             return None
 
         if page.timeout_mode == "after":
-            if now - self.last_switch_time >= page.timeout_seconds:
-                return resolved_target
+            return self.last_switch_time + page.timeout_seconds
         elif page.timeout_mode == "idle":
-            if now - self.last_activity_time >= page.timeout_seconds:
-                return resolved_target
+            return self.last_activity_time + page.timeout_seconds
 
         return None
@@ -0,0 +1,248 @@
+"""Keys whose rendering runs in a separate worker process."""
+
+import copy
+import multiprocessing
+import pickle
+import threading
+import weakref
+from logging import getLogger
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import PIL.ImageDraw as ImageDraw
+from PIL import Image
+
+from displaypad_driver import ICON_SIZE
+from displaypad_driver.image import image_to_bgr102
+from .key import Key
+from .keycontext import KeyContext
+
+log = getLogger(__name__)
+
+# Worker frames are stored as RGBX so both processes can map them without copying
+FRAME_MODE = "RGBX"
+
+
+class ProcessKey(Key):
+    """Runs another key's `render` in a worker process, so CPU-heavy drawing uses another core.
+
+    All hooks (`on_press`, `on_tick`, `render_state`, ...) still run on the wrapped key in
+    this process. Only `render` moves: the worker holds a pickled copy of the key, receives
+    `current_render_state()` for every redraw and must draw from it alone (in the worker,
+    `current_render_state()` returns the value that was sent). The worker draws directly
+    into one of two `multiprocessing.shared_memory` frames, and this process encodes the
+    tile for upload straight from the mapped frame: no pixels are copied in between.
+
+    Rendering never blocks `update()`: while the worker draws, the last finished frame is
+    shown, and the key redraws itself when the new one is ready. Redraws requested while
+    the worker is busy are merged into one.
+
+    The wrapped key must be picklable and its class importable by the worker (define it at
+    module level).
+
+    Example:
+        pad[0] = ProcessKey(ChartKey(series))
+    """
+
+    def __init__(self, key: Key, size: Tuple[int, int] = (ICON_SIZE, ICON_SIZE),
+                 mp_context: Optional[multiprocessing.context.BaseContext] = None):
+        super().__init__()
+        self.key = key
+        self.size = size
+        self.renders = 0  # Frames finished by the worker
+        self._mp_context = mp_context or multiprocessing.get_context()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._process = None
+        self._reader: Optional[threading.Thread] = None
+        self._buffers: List[shared_memory.SharedMemory] = []
+        self._frames: List[Image.Image] = []
+        self._shown: Optional[int] = None  # Slot of the last finished frame
+        self._busy = False
+        self._pending = None  # (state,) of a redraw requested while busy
+        self._fresh = False  # The next render shows a frame that just finished
+        self._finalizer = None
+
+        # Hooks run on the wrapped key itself (keeps async and @background hooks intact)
+        for name in ("on_press", "on_release", "on_double_press", "on_single_press", "on_long_press",
+                     "on_repeat", "on_tick", "render_state"):
+            setattr(self, name, getattr(key, name))
+        for name in ("tick_interval", "render_state_interval", "long_press_time", "repeat_delay",
+                     "repeat_interval"):
+            setattr(self, name, getattr(key, name))
+        key._redraw_listener = self.request_redraw
+
+    def on_mount(self, index: int):
+        super().on_mount(index)
+        self.key.on_mount(index)
+
+    def on_unmount(self):
+        self.key.on_unmount()
+        self.close()
+
+    def next_wakeup(self) -> Optional[float]:
+        self.key._last_tick_time = self._last_tick_time
+        self.key._render_state_refreshed_at = self._render_state_refreshed_at
+        return self.key.next_wakeup()
+
+    def resource_bytes(self) -> int:
+        return self.key.resource_bytes() + sum(shm.size for shm in self._buffers)
+
+    def encoded_tile(self, rotation: int) -> Optional[bytes]:
+        if self.size != (ICON_SIZE, ICON_SIZE):
+            return None
+        with self._lock:
+            self._advance()
+            if self._shown is None:
+                return bytes(ICON_SIZE * ICON_SIZE * 3)
+            # Held under the lock: the worker only ever writes the other slot
+            return image_to_bgr102(self._frames[self._shown], rotation)
+
+    def render(self, ctx: KeyContext):
+        with self._lock:
+            self._advance()
+            if self._shown is None:
+                ctx.clear()
+                return
+            ctx.image.paste(self._frames[self._shown], (0, 0))
+
+    def _advance(self):
+        """Show a frame that just finished, else request one for the current state. Needs _lock."""
+        if self._fresh:
+            self._fresh = False
+        else:
+            self._submit(self.current_render_state())
+
+    # --- Worker management ---
+
+    def start(self):
+        """Start the worker process (done automatically on the first render)."""
+        if self._process is not None:
+            return
+        width, height = self.size
+        self._buffers = [shared_memory.SharedMemory(create=True, size=width * height * 4) for _ in range(2)]
+        self._frames = [Image.frombuffer(FRAME_MODE, self.size, shm.buf, "raw", FRAME_MODE, 0, 1)
+                        for shm in self._buffers]
+        parent, child = self._mp_context.Pipe()
+        self._process = self._mp_context.Process(
+            target=_render_worker,
+            args=(child, _pickle_key(self.key), [shm.name for shm in self._buffers], self.size),
+            name=f"displaypad-render-{type(self.key).__name__}",
+            daemon=True,
+        )
+        self._process.start()
+        child.close()
+        self._conn = parent
+        self._reader = threading.Thread(target=self._read_results, name="displaypad-process-key", daemon=True)
+        self._reader.start()
+        self._finalizer = weakref.finalize(self, _shutdown, self._conn, self._process, self._buffers)
+
+    def close(self):
+        """Stop the worker and release the shared frames."""
+        with self._lock:
+            if self._process is None:
+                return
+            self._frames = []
+            self._shown = None
+            self._busy = False
+            self._pending = None
+            self._process = None
+        self._finalizer()
+        if self._reader is not None and self._reader is not threading.current_thread():
+            self._reader.join(timeout=1.0)
+        self._reader = None
+        self._buffers = []
+
+    def _submit(self, state):
+        """Send a render job for state, or remember it if the worker is still busy. Needs _lock."""
+        if self._process is None:
+            self.start()
+        if self._busy:
+            self._pending = (state,)
+            return
+        slot = 0 if self._shown is None else 1 - self._shown
+        self._conn.send((slot, state))
+        self._busy = True
+
+    def _read_results(self):
+        conn = self._conn
+        while True:
+            try:
+                slot, error = conn.recv()
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                if self._process is None:
+                    return
+                self._busy = False
+                if error is not None:
+                    log.error(f"ProcessKey {type(self.key).__name__} render failed: {error}")
+                else:
+                    self._shown = slot
+                    self._fresh = True
+                    self.renders += 1
+                if self._pending is not None:
+                    (state,), self._pending = self._pending, None
+                    self._submit(state)
+            if error is None:
+                self.request_redraw()
+
+
+def _pickle_key(key: Key) -> bytes:
+    clone = copy.copy(key)
+    vars(clone).pop("_redraw_listener", None)  # Bound to this process' pad
+    return pickle.dumps(clone)
+
+
+def _shutdown(conn, process, buffers: List[shared_memory.SharedMemory]):
+    try:
+        conn.send(None)
+    except (OSError, ValueError):
+        pass
+    process.join(timeout=1.0)
+    if process.is_alive():
+        process.terminate()
+    conn.close()
+    for shm in buffers:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # A frame image is still referenced; the mapping goes away with it
+        shm.unlink()
+
+
+def _render_worker(conn, payload: bytes, names: List[str], size: Tuple[int, int]):
+    """Worker process loop: render the key for each (slot, state) job into shared memory."""
+    key = pickle.loads(payload)
+    buffers = [shared_memory.SharedMemory(name=name) for name in names]
+    width, height = size
+    contexts = []
+    for shm in buffers:
+        image = Image.frombuffer(FRAME_MODE, size, shm.buf, "raw", FRAME_MODE, 0, 1)
+        image.readonly = 0  # Draw into the shared frame itself; Pillow would copy a read-only image first
+        contexts.append(KeyContext(ImageDraw.Draw(image), width=width, height=height, image=image))
+    try:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                break
+            if job is None:
+                break
+            slot, state = job
+            key.current_render_state = lambda state=state: state
+            ctx = contexts[slot]
+            try:
+                ctx.reset()
+                key.render(ctx)
+                conn.send((slot, None))
+            except Exception as e:
+                conn.send((slot, repr(e)))
+    finally:
+        contexts.clear()
+        image = ctx = None  # Release the views of the frames before unmapping them
+        for shm in buffers:
+            try:
+                shm.close()
+            except BufferError:
+                pass  # Still referenced by the key; the mapping goes away with the process
@@ -0,0 +1,283 @@
+"""Per-key and per-page performance statistics for the DisplayPad library."""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+TIMINGS = ("tick", "render", "encode", "queue_wait", "upload")
+COUNTERS = ("redraws", "skipped_frames")
+
+# Press-to-panel latency: upper bounds (seconds) of the histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.02, 0.03, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.5, 1.0, 2.0)
+# Trace marks in pipeline order; each stage lasts from the previous mark to its own
+LATENCY_MARKS = ("read", "dispatch", "redraw", "render", "queued", "upload")
+PERCENTILES = (50, 90, 99)
+
+# (page name, slot index)
+StatsKey = Tuple[str, int]
+
+
+class Timing:
+    """Running count/sum/max of one timed operation (seconds)."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "Timing"):
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'avg': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+        }
+
+
+class Histogram:
+    """Fixed-bucket histogram (seconds) with interpolated percentiles."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts: List[int] = [0] * (len(bounds) + 1)  # last bucket: above the highest bound
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        idx = 0
+        while idx < len(self.bounds) and seconds > self.bounds[idx]:
+            idx += 1
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "Histogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0-100), interpolating linearly inside the bucket."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if idx == len(self.bounds):
+                    return self.max
+                lower = self.bounds[idx - 1] if idx else 0.0
+                value = lower + (self.bounds[idx] - lower) * (rank - seen) / n
+                return min(value, self.max)
+            seen += n
+        return self.max
+
+    def as_dict(self) -> dict:
+        result = {
+            'count': self.count,
+            'avg': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+        }
+        for q in PERCENTILES:
+            result[f"p{q}"] = self.percentile(q)
+        return result
+
+
+class LatencyTrace:
+    """`time.perf_counter()` marks of one key press on its way to the panel (see LATENCY_MARKS)."""
+
+    __slots__ = ("label", "marks")
+
+    def __init__(self, label: StatsKey, read_at: float):
+        self.label = label
+        self.marks: Dict[str, float] = {"read": read_at}
+
+    def mark(self, stage: str, at: Optional[float] = None):
+        self.marks[stage] = time.perf_counter() if at is None else at
+
+    @property
+    def total(self) -> float:
+        return self.marks["upload"] - self.marks["read"]
+
+    def stages(self) -> Dict[str, float]:
+        """Duration of each reached stage, measured from the previous mark."""
+        result = {}
+        previous = self.marks["read"]
+        for stage in LATENCY_MARKS[1:]:
+            at = self.marks.get(stage)
+            if at is not None:
+                result[stage] = max(at - previous, 0.0)
+                previous = at
+        return result
+
+
+class SlotStats:
+    """Metrics of one key slot on one page."""
+
+    def __init__(self):
+        self.key_type = ""
+        self.timings: Dict[str, Timing] = {name: Timing() for name in TIMINGS}
+        self.counters: Dict[str, int] = {name: 0 for name in COUNTERS}
+        self.latency = Histogram()
+        self.latency_stages: Dict[str, Timing] = {name: Timing() for name in LATENCY_MARKS[1:]}
+
+
+class PerfStats:
+    """Thread-safe collector for tick, render, encode, upload queue wait and upload times.
+
+    Metrics are keyed by (page name, slot). `snapshot()` returns plain dicts; set
+    `enabled = False` to turn collection into a no-op.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._slots: Dict[StatsKey, SlotStats] = {}
+
+    def _slot(self, label: StatsKey, key_type: Optional[str]) -> SlotStats:
+        slot = self._slots.get(label)
+        if slot is None:
+            slot = self._slots[label] = SlotStats()
+        if key_type:
+            slot.key_type = key_type
+        return slot
+
+    def record(self, label: StatsKey, metric: str, seconds: float, key_type: Optional[str] = None):
+        """Add one timing sample (seconds) for a slot."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._slot(label, key_type).timings[metric].add(seconds)
+
+    def count(self, label: StatsKey, counter: str, n: int = 1, key_type: Optional[str] = None):
+        """Increment a counter for a slot."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._slot(label, key_type).counters[counter] += n
+
+    def record_latency(self, trace: LatencyTrace):
+        """Add a completed press trace to its slot's latency histogram."""
+        if not self.enabled:
+            return
+        with self._lock:
+            slot = self._slot(trace.label, None)
+            slot.latency.add(trace.total)
+            for stage, seconds in trace.stages().items():
+                slot.latency_stages[stage].add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._slots.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        """Return {'uptime', 'keys': {"page/slot": {...}}, 'pages': {page: {...}}}."""
+        with self._lock:
+            uptime = max(time.time() - self.started, 1e-9)
+            keys = {}
+            pages: Dict[str, SlotStats] = {}
+            for (page, idx), slot in sorted(self._slots.items(), key=lambda item: (str(item[0][0]), item[0][1])):
+                keys[f"{page}/{idx}"] = self._slot_dict(slot, uptime, page=page, slot=idx)
+                total = pages.get(page)
+                if total is None:
+                    total = pages[page] = SlotStats()
+                for name in TIMINGS:
+                    total.timings[name].merge(slot.timings[name])
+                for name in COUNTERS:
+                    total.counters[name] += slot.counters[name]
+                total.latency.merge(slot.latency)
+                for name, timing in slot.latency_stages.items():
+                    total.latency_stages[name].merge(timing)
+            return {
+                'uptime': uptime,
+                'keys': keys,
+                'pages': {page: self._slot_dict(total, uptime, page=page) for page, total in pages.items()},
+            }
+
+    @staticmethod
+    def _slot_dict(stats: SlotStats, uptime: float, **labels) -> dict:
+        result = dict(labels)
+        if stats.key_type:
+            result['key'] = stats.key_type
+        for name in TIMINGS:
+            result[name] = stats.timings[name].as_dict()
+        result.update(stats.counters)
+        result['redraw_rate'] = stats.counters['redraws'] / uptime
+        latency = stats.latency.as_dict()
+        latency['buckets'] = dict(zip(stats.latency.bounds + (float("inf"),), stats.latency.counts))
+        latency['stages'] = {name: timing.as_dict() for name, timing in stats.latency_stages.items()}
+        result['latency'] = latency
+        return result
+
+    def to_prometheus(self) -> str:
+        """Render the current metrics in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+        for name in TIMINGS:
+            metric = f"displaypad_key_{name}_seconds"
+            lines.append(f"# HELP {metric} Time spent in {name.replace('_', ' ')} per key slot.")
+            lines.append(f"# TYPE {metric} summary")
+            for entry in snap['keys'].values():
+                labels = _labels(entry)
+                lines.append(f"{metric}_sum{{{labels}}} {entry[name]['total']:.6f}")
+                lines.append(f"{metric}_count{{{labels}}} {entry[name]['count']}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            for entry in snap['keys'].values():
+                lines.append(f"{metric}_max{{{_labels(entry)}}} {entry[name]['max']:.6f}")
+        for name in COUNTERS:
+            metric = f"displaypad_key_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for entry in snap['keys'].values():
+                lines.append(f"{metric}{{{_labels(entry)}}} {entry[name]}")
+        metric = "displaypad_key_press_latency_seconds"
+        lines.append(f"# HELP {metric} Time from reading a key press to the confirmed upload of its redraw.")
+        lines.append(f"# TYPE {metric} histogram")
+        for entry in snap['keys'].values():
+            latency = entry['latency']
+            if not latency['count']:
+                continue
+            labels = _labels(entry)
+            cumulative = 0
+            for bound, n in latency['buckets'].items():
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{labels}}} {latency['avg'] * latency['count']:.6f}")
+            lines.append(f"{metric}_count{{{labels}}} {latency['count']}")
+        lines.append("# TYPE displaypad_uptime_seconds gauge")
+        lines.append(f"displaypad_uptime_seconds {snap['uptime']:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Atomically write the metrics to a Prometheus text-format file (e.g. for node_exporter)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def _labels(entry: dict) -> str:
+    page = str(entry['page']).replace('\\', '\\\\').replace('"', '\\"')
+    return f'page="{page}",slot="{entry["slot"]}",key="{entry.get("key", "")}"'
@@ -2,12 +2,18 @@
 
 import os
 import sys
+import threading
+import time
 import unittest
+from unittest import mock
 from PIL import Image
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../packages/driver/src')))
 
-from displaypad_driver.protocol import get_pressed_keys, NUM_KEYS, ICON_SIZE
+from displaypad_driver.calibration import ColorCalibration
+from displaypad_driver.device import DisplayPad
+from displaypad_driver.pack import AnimationPack, compile_pack
+from displaypad_driver.protocol import get_pressed_keys, NUM_KEYS, ICON_SIZE, HEADER_SIZE
 from displaypad_driver.image import (
     image_to_bgr102, split_image_to_tiles, split_gif_to_tiles,
     load_gif_frames, make_label_icon, make_folder_icon
@@ -46,6 +52,167 @@ class TestDriverProtocol(unittest.TestCase):
         self.assertEqual(get_pressed_keys(msg), [0, 1, 7, 8])
 
 
+class FakeHid:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+        return len(data)
+
+    def read(self, size, timeout=0):
+        time.sleep(timeout / 1000)  # No key events: a poll blocks for its whole timeout
+        return []
+
+
+class TestDriverBrightness(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.object(DisplayPad, "connect"):
+            self.pad = DisplayPad()
+        self.pad.hid_dev = FakeHid()
+
+    def brightness_writes(self):
+        return [w[4] for w in self.pad.hid_dev.writes if w[0] == 0x12]
+
+    def test_redundant_brightness_writes_are_dropped(self):
+        self.pad.set_brightness(50)
+        self.pad.set_brightness(50)
+        self.pad.set_brightness(150)
+        self.assertEqual(self.brightness_writes(), [50, 100])
+        self.assertEqual(self.pad.brightness, 100)
+
+    def test_brightness_requests_coalesce_while_interface_busy(self):
+        self.pad._usb_lock.acquire()
+        writer = threading.Thread(target=self.pad.set_brightness, args=(10,))
+        writer.start()
+        time.sleep(0.05)
+        for percent in (20, 30, 40):
+            self.pad.set_brightness(percent)  # Returns immediately, the writer sends the latest
+        self.pad._usb_lock.release()
+        writer.join(timeout=1)
+        self.assertEqual(self.brightness_writes(), [10, 40])
+
+    def test_fade_reaches_target_and_skips_steps_while_busy(self):
+        self.pad.set_brightness(100)
+        done = self.pad.fade_to(0, duration=0.2, step_interval=0.01)
+        self.assertTrue(done.wait(2))
+        writes = self.brightness_writes()
+        self.assertEqual(writes[-1], 0)
+        self.assertEqual(writes, sorted(writes, reverse=True))
+        self.assertGreater(len(writes), 3)
+
+        self.pad.hid_dev.writes.clear()
+        with self.pad._upload_activity(), self.pad._usb_lock:  # A long upload spans the whole fade
+            done = self.pad.fade_to(100, duration=0.1, step_interval=0.01)
+            time.sleep(0.15)
+        self.assertTrue(done.wait(2))
+        self.assertEqual(self.brightness_writes(), [100])
+
+    def test_fade_steps_while_keys_are_polled(self):
+        self.pad.set_brightness(0)
+        stop = threading.Event()
+
+        def poll():
+            while not stop.is_set():
+                self.pad.poll_key(timeout=20)  # Holds the interface during its blocking read
+
+        poller = threading.Thread(target=poll)
+        poller.start()
+        self.addCleanup(poller.join)
+        self.addCleanup(stop.set)
+        done = self.pad.fade_to(100, duration=0.3, step_interval=0.01)
+        self.assertTrue(done.wait(2))
+        writes = self.brightness_writes()
+        self.assertEqual(writes[-1], 100)
+        self.assertGreater(len(writes), 5)
+
+    def test_cancelled_fade_step_does_not_override_new_value(self):
+        cancel = threading.Event()
+        self.pad.set_brightness(10)
+        cancel.set()  # set_brightness() cancelled the fade while it was computing a step
+        self.pad._request_brightness(60, cancel)
+        self.assertEqual(self.brightness_writes(), [10])
+
+
+class TestColorCalibration(unittest.TestCase):
+
+    def test_tables_combine_curve_gamma_and_white_point(self):
+        self.assertTrue(ColorCalibration().is_identity)
+        cal = ColorCalibration(gamma=2.0, white_point=(255, 128, 0))
+        self.assertEqual(cal.tables[0][255], 255)
+        self.assertEqual(cal.tables[0][128], round((128 / 255) ** 2 * 255))
+        self.assertEqual(cal.tables[1][255], 128)
+        self.assertEqual(cal.tables[2][255], 0)
+
+        inverted = ColorCalibration(curves=lambda v: 255 - v)
+        self.assertEqual(inverted.apply(bytes([0, 10, 255])), bytes([255, 245, 0]))
+
+    def test_apply_maps_channels_in_bgr_order(self):
+        cal = ColorCalibration(white_point=(200, 100, 50))
+        bgr = image_to_bgr102(Image.new("RGB", (ICON_SIZE, ICON_SIZE), (255, 255, 255)))
+        self.assertEqual(cal.apply(bgr)[:3], bytes([50, 100, 200]))
+        self.assertIs(ColorCalibration().apply(bgr), bgr)
+
+    def test_driver_calibrates_every_upload(self):
+        class AckHid(FakeHid):
+            def __init__(self):
+                super().__init__()
+                self.acks = []
+
+            def read(self, size, timeout=0):
+                return self.acks.pop(0) if self.acks else []
+
+        class FakeUsb:
+            def __init__(self):
+                self.data = bytearray()
+
+            def write(self, endpoint, data, timeout=0):
+                self.data += data
+
+        with mock.patch.object(DisplayPad, "connect"):
+            pad = DisplayPad(calibration=ColorCalibration(curves=lambda v: v // 2))
+        pad.hid_dev, pad.usb_dev = AckHid(), FakeUsb()
+        pad.hid_dev.acks = [[0x21, 0x00, 0x00], [0x21, 0x00, 0xFF]]
+        pad.upload_button(0, bytes([200]) * (ICON_SIZE * ICON_SIZE * 3))
+        self.assertEqual(pad.usb_dev.data[HEADER_SIZE:HEADER_SIZE + 3], bytes([100, 100, 100]))
+
+
+# Seconds `import displaypad_driver` / `import displaypad_lib` may take in a fresh interpreter
+IMPORT_TIME_BUDGET = float(os.environ.get("DISPLAYPAD_IMPORT_BUDGET", "0.2"))
+
+
+def measure_import(statement: str, attempts: int = 3):
+    """Best-of-N wall time of statement in fresh interpreters, plus the heavy modules it loaded."""
+    import json
+    import subprocess
+    src = os.path.join(os.path.dirname(__file__), '..', 'packages')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [os.path.join(src, 'driver', 'src'), os.path.join(src, 'library', 'src')]))
+    script = ("import json, sys, time\n"
+              "start = time.perf_counter()\n"
+              f"{statement}\n"
+              "elapsed = time.perf_counter() - start\n"
+              "heavy = [m for m in ('PIL', 'hid', 'usb', 'av', 'asyncio') if m in sys.modules]\n"
+              "print(json.dumps([elapsed, heavy]))")
+    runs = [json.loads(subprocess.run([sys.executable, "-c", script], env=env, check=True,
+                                      capture_output=True, text=True).stdout)
+            for _ in range(attempts)]
+    return min(elapsed for elapsed, _heavy in runs), runs[0][1]
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_driver_import_is_light(self):
+        elapsed, heavy = measure_import("import displaypad_driver; displaypad_driver.DisplayPad")
+        self.assertEqual(heavy, [])  # Pillow, hidapi and PyUSB load on first use
+        self.assertLess(elapsed, IMPORT_TIME_BUDGET)
+
+    def test_image_helpers_load_on_first_access(self):
+        _elapsed, heavy = measure_import("import displaypad_driver; displaypad_driver.image_to_bgr102", attempts=1)
+        self.assertEqual(heavy, ["PIL"])
+
+
 class TestDriverImage(unittest.TestCase):
 
     def setUp(self):
@@ -57,6 +224,14 @@ class TestDriverImage(unittest.TestCase):
         # Red RGB (255, 0, 0) becomes Blue BGR (0, 0, 255)
         self.assertEqual(bgr[:3], bytes([0, 0, 255]))
 
+    def test_image_to_bgr102_tile_fast_path(self):
+        tile = Image.new("RGB", (ICON_SIZE, ICON_SIZE), (10, 20, 30))
+        tile.putpixel((0, 0), (1, 2, 3))
+        bgr = image_to_bgr102(tile)
+        self.assertEqual(bgr[:6], bytes([3, 2, 1, 30, 20, 10]))
+        # Input image must not be modified by encoding
+        self.assertEqual(tile.getpixel((0, 0)), (1, 2, 3))
+
     def test_split_image_to_tiles(self):
         tiles = split_image_to_tiles(self.test_img)
         self.assertEqual(len(tiles), NUM_KEYS)
@@ -68,5 +243,42 @@ class TestDriverImage(unittest.TestCase):
         self.assertEqual(img.size, (ICON_SIZE, ICON_SIZE))
 
 
+class TestAnimationPack(unittest.TestCase):
+
+    def test_compile_gif_pack_and_map_tiles(self):
+        import tempfile
+        frames = [Image.new("RGB", (102, 102), color) for color in ((255, 0, 0), (0, 255, 0), (0, 0, 255))]
+        with tempfile.TemporaryDirectory() as tmp:
+            gif_path = os.path.join(tmp, "anim.gif")
+            frames[0].save(gif_path, save_all=True, append_images=frames[1:], duration=[40, 60, 80], loop=0)
+            pack_path = os.path.join(tmp, "anim.dpak")
+            self.assertEqual(compile_pack(gif_path, pack_path, rotation=90), "tile")
+
+            with AnimationPack.open(pack_path) as pack:
+                self.assertEqual((pack.kind, pack.rotation, pack.durations), ("tile", 90, [40, 60, 80]))
+                tile = pack.tile(1)
+                self.assertIsInstance(tile, memoryview)
+                self.assertEqual(bytes(tile), load_gif_frames(gif_path, rotation=90)[1][0])
+                self.assertEqual(bytes(tile[:3]), bytes([0, 255, 0]))
+                del tile
+
+    def test_compile_static_panel_pack(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "splash.png")
+            Image.new("RGB", (612, 204), (255, 0, 0)).save(src)
+            pack_path = os.path.join(tmp, "splash.dpak")
+            self.assertEqual(compile_pack(src, pack_path), "panel")
+            with AnimationPack.open(pack_path) as pack:
+                self.assertEqual(pack.frame_count, 1)
+                self.assertFalse(pack.is_animated)
+                self.assertEqual([bytes(t) for t in pack.frame(0)], split_image_to_tiles(src))
+
+            with open(pack_path, "r+b") as f:
+                f.write(b"NOPE")
+            with self.assertRaises(Exception):
+                AnimationPack.open(pack_path)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,7 +2,9 @@
 
 import os
 import sys
+import time
 import unittest
+from unittest import mock
 from PIL import Image
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../packages/driver/src')))
@@ -11,6 +13,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../p
 from displaypad_lib.key import Key, LabelKey, IconKey
 from displaypad_lib.keycontext import KeyContext
 from displaypad_lib.page import Page, PageManager
+from displaypad_lib.stats import PerfStats
 
 
 class DummyKey(Key):
@@ -33,6 +36,47 @@ class DummyKey(Key):
         ctx.fill("red")
 
 
+class CountingKey(LabelKey):
+    def __init__(self, label):
+        super().__init__(label)
+        self.renders = 0
+
+    def render(self, ctx: KeyContext):
+        self.renders += 1
+        super().render(ctx)
+
+
+class RecordingDriver:
+    """Stand-in for displaypad_driver.DisplayPad that records uploads."""
+
+    def __init__(self):
+        self.connected = True
+        self.panels = []
+        self.buttons = []
+
+    def upload_panel(self, tiles_bgr, key_events=None):
+        self.panels.append(list(tiles_bgr))
+
+    def upload_button(self, key_index, bgr_pixels, key_events=None):
+        self.buttons.append((key_index, bgr_pixels))
+
+    def poll_key(self, timeout=150):
+        time.sleep(timeout / 1000)  # Mimic a blocking HID read
+        return {'pressed': [], 'released': [], 'current': []}
+
+    def set_brightness(self, percent=100):
+        pass
+
+    def close(self):
+        self.connected = False
+
+
+def make_pad(**kwargs):
+    from displaypad_lib import displaypad
+    with mock.patch.object(displaypad, "Driver", RecordingDriver):
+        return displaypad.DisplayPad(**kwargs)
+
+
 class TestLibrary(unittest.TestCase):
 
     def test_key_hooks(self):
@@ -114,6 +158,73 @@ class TestLibrary(unittest.TestCase):
         self.assertTrue(key.pressed)
         self.assertTrue(key.released)
 
+    def test_gesture_engine_timers(self):
+        from displaypad_lib.gestures import GestureEngine, LONG_PRESS, REPEAT, SINGLE_PRESS
+        engine = GestureEngine()
+        self.assertIsNone(engine.next_deadline())
+
+        engine.press(0, 10.0, long_press=0.8, repeat=(0.4, 0.1), window=0.5)
+        self.assertEqual(engine.next_deadline(), 10.4)
+        self.assertEqual(engine.pop_due(10.45), [(0, REPEAT)])
+        self.assertEqual(engine.pop_due(10.85), [(0, REPEAT), (0, LONG_PRESS)])
+        self.assertEqual(engine.pop_due(12.0), [(0, REPEAT)])  # Late loop: no burst of repeats
+        self.assertAlmostEqual(engine.release(0, 12.0), 2.0)
+        self.assertEqual(engine.pop_due(20.0), [])  # Held for long: no single press either
+
+        self.assertFalse(engine.press(1, 30.0, long_press=0.8, window=0.5))
+        engine.release(1, 30.1)
+        self.assertTrue(engine.press(1, 30.3, long_press=0.8, window=0.5))  # Double press
+        engine.release(1, 30.4)
+        self.assertEqual(engine.pop_due(31.5), [])
+
+        engine.press(2, 40.0, window=0.5)
+        engine.release(2, 40.1)
+        self.assertEqual(engine.pop_due(40.49), [])
+        self.assertEqual(engine.pop_due(40.5), [(2, SINGLE_PRESS)])
+
+    def test_long_press_and_repeat_fire_while_held(self):
+        events = []
+
+        class VolumeKey(LabelKey):
+            repeat_interval = 0.05
+
+            def on_long_press(self):
+                events.append("long")
+
+            def on_repeat(self):
+                events.append("repeat")
+
+            def on_single_press(self):
+                events.append("single")
+
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        pad[0] = VolumeKey("Vol+")
+        pad[1] = LabelKey("Plain")
+        pad._dispatch_input({'pressed': [0, 1], 'released': [], 'current': [0, 1]}, 100.0)
+        self.assertEqual(pad.gestures.next_deadline(), 100.4)  # Plain keys arm no timers
+        pad._fire_gestures(100.5)
+        pad._fire_gestures(100.56)
+        pad._fire_gestures(100.9)
+        self.assertEqual(events, ["repeat", "repeat", "repeat", "long"])
+        pad._dispatch_input({'pressed': [], 'released': [0, 1], 'current': []}, 101.0)
+        pad._fire_gestures(102.0)
+        self.assertEqual(len(events), 4)  # Nothing after the release
+
+        del events[:]
+        pad._dispatch_input({'pressed': [0], 'released': [], 'current': [0]}, 200.0)
+        pad._dispatch_input({'pressed': [], 'released': [0], 'current': []}, 200.1)
+        pad._fire_gestures(200.5)
+        self.assertEqual(events, [])
+        pad._fire_gestures(200.6)
+        self.assertEqual(events, ["single"])
+
+    def test_import_is_light(self):
+        from test_driver import IMPORT_TIME_BUDGET, measure_import
+        elapsed, heavy = measure_import("import displaypad_lib; from displaypad_lib import DisplayPadClient")
+        self.assertEqual(heavy, [])
+        self.assertLess(elapsed, IMPORT_TIME_BUDGET)
+
     def test_keycontext_native_imagedraw_and_forwarding(self):
         img = Image.new("RGB", (102, 102), (0, 0, 0))
         ctx = KeyContext(width=102, height=102, image=img)
@@ -126,12 +237,89 @@ class TestLibrary(unittest.TestCase):
         ctx.line(0, 0, 50, 50, fill=(0, 255, 0), width=2)
         self.assertEqual(img.getpixel((10, 10)), (0, 255, 0))
 
+    def test_keycontext_layers_redraw_only_changed_layers(self):
+        draws = []
+
+        def icon(c):
+            draws.append("icon")
+            c.rectangle(10, 10, 60, 60, fill=(0, 0, 255))
+
+        def frame(c):
+            draws.append("frame")
+            c.rectangle(0, 96, 102, 6, fill=(0, 255, 0))
+
+        def badge(count):
+            def draw(c):
+                draws.append("badge")
+                c.rectangle(50, 50, 40, 40, fill=(255, 0, 0) if count else (255, 255, 0))
+            return draw
+
+        def direct(count, color=(0, 0, 255)):
+            ctx = KeyContext()
+            ctx.rectangle(10, 10, 60, 60, fill=color)
+            ctx.rectangle(0, 96, 102, 6, fill=(0, 255, 0))
+            ctx.rectangle(50, 50, 40, 40, fill=(255, 0, 0) if count else (255, 255, 0))
+            return ctx.image.tobytes()
+
+        ctx = KeyContext()
+        for count in (0, 1, 1, 2):
+            ctx.reset()
+            ctx.fill("white")  # Covered by the layers
+            ctx.layer("icon", icon)
+            ctx.layer("frame", frame)
+            ctx.layer("badge", badge(count), state=count)
+            self.assertEqual(ctx.image.tobytes(), direct(count))
+        self.assertEqual(draws, ["icon", "frame", "badge", "badge", "badge"])
+
+        # Invalidating the bottom layer recomposites everything above it from the cached rasters
+        draws.clear()
+        ctx.invalidate_layer("icon")
+        icon_color = []
+        for _ in range(2):
+            ctx.reset()
+            ctx.layer("icon", lambda c: icon_color.append(1) or c.rectangle(10, 10, 60, 60, fill="white"))
+            ctx.layer("frame", frame)
+            ctx.layer("badge", badge(2), state=2)
+            self.assertEqual(ctx.image.tobytes(), direct(2, color=(255, 255, 255)))
+        self.assertEqual((draws, len(icon_color)), ([], 1))
+        self.assertGreater(ctx.layers.nbytes, 0)
+
+    def test_key_layer_cache_follows_the_key(self):
+        class BadgeKey(Key):
+            def __init__(self):
+                super().__init__()
+                self.count = 0
+                self.icon_draws = 0
+
+            def draw_icon(self, c):
+                self.icon_draws += 1
+                c.ellipse(10, 10, 80, 80, fill="blue")
+
+            def render(self, ctx):
+                ctx.layer("icon", self.draw_icon)
+                ctx.layer("badge", lambda c: c.center_text(str(self.count)), state=self.count)
+
+        pad = make_pad(collect_stats=False)
+        self.addCleanup(pad.disable)
+        key = pad[3] = BadgeKey()
+        pad[4] = BadgeKey()
+        for _ in range(3):
+            key.count += 1
+            key.request_redraw()
+            pad.update(0)
+        self.assertEqual((key.icon_draws, pad[4].icon_draws), (1, 1))
+        key.invalidate_layer("icon")
+        pad.update(0)
+        self.assertEqual(key.icon_draws, 2)
+
     def test_isolated_key_rendering_and_clipping(self):
         from displaypad_lib import DisplayPad
         pad = DisplayPad.__new__(DisplayPad)
         pad.width = 612
         pad.height = 204
         pad.image_buffer = Image.new("RGB", (pad.width, pad.height), (0, 0, 0))
+        pad._surfaces = [None] * 12
+        pad.perf = PerfStats(enabled=False)
         
         class OversizedKey(Key):
             def render(self, ctx: KeyContext):
@@ -146,6 +334,957 @@ class TestLibrary(unittest.TestCase):
         # Key 1 tile (102..203, 0..101) MUST NOT be affected (remains 0, 0, 0 black)
         self.assertEqual(pad.image_buffer.getpixel((102, 50)), (0, 0, 0))
 
+    def test_parallel_render_matches_serial(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from displaypad_lib import DisplayPad
+
+        def make_pad(pool):
+            pad = DisplayPad.__new__(DisplayPad)
+            pad.width = 612
+            pad.height = 204
+            pad.image_buffer = Image.new("RGB", (pad.width, pad.height), (0, 0, 0))
+            pad._surfaces = [None] * 12
+            pad.perf = PerfStats(enabled=False)
+            pad._render_pool = pool
+            return pad
+
+        class MainThreadKey(LabelKey):
+            parallel_render = False
+
+        keys = [LabelKey(f"K{i}", bg_color="red") for i in range(11)] + [MainThreadKey("M")]
+        serial = make_pad(None)
+        serial._render_keys(list(enumerate(keys)))
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            parallel = make_pad(pool)
+            for key in keys:
+                key.request_redraw()
+            parallel._render_keys(list(enumerate(keys)))
+
+        self.assertEqual(serial.image_buffer.tobytes(), parallel.image_buffer.tobytes())
+        self.assertFalse(any(key._needs_redraw for key in keys))
+
+    def test_render_surfaces_are_reused_per_slot(self):
+        from displaypad_lib import DisplayPad
+        pad = DisplayPad.__new__(DisplayPad)
+        pad.width = 612
+        pad.height = 204
+        pad.image_buffer = Image.new("RGB", (pad.width, pad.height), (0, 0, 0))
+        pad._surfaces = [None] * 12
+        pad.perf = PerfStats(enabled=False)
+
+        first = pad._render_key_surface(3, LabelKey("A", bg_color="red"))
+        second = pad._render_key_surface(3, DummyKey())
+        self.assertIs(first, second)
+        self.assertIsNot(first, pad._render_key_surface(4, DummyKey()))
+        self.assertEqual(second.getpixel((50, 50)), (255, 0, 0))
+
+    def test_page_switch_reuses_cached_tiles(self):
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        main_key = CountingKey("Main")
+        pad[0] = main_key
+        pad.update(0)
+
+        other = Page(name="Other")
+        other_key = CountingKey("Other")
+        other[0] = other_key
+        pad.add_page("Other", other)
+
+        self.assertTrue(pad.switch_to_page("Other"))
+        self.assertEqual(other_key.renders, 1)
+        self.assertTrue(pad.switch_to_page("Main"))
+        self.assertEqual(main_key.renders, 1)
+        self.assertEqual(pad.driver.panels[-1][0], pad.driver.panels[0][0])
+        self.assertEqual(pad.image_buffer.getpixel((2, 2)), (0, 0, 128))
+
+        # A redraw request invalidates only that key's cached tile
+        other_key.request_redraw()
+        pad.switch_to_page("Other")
+        self.assertEqual(other_key.renders, 2)
+
+    def test_lazy_pages_build_on_demand_and_unload_over_budget(self):
+        built = []
+        unmounted = []
+
+        class HeavyKey(LabelKey):
+            def resource_bytes(self):
+                return 1000
+
+            def on_unmount(self):
+                unmounted.append(self.label)
+
+        def factory(name):
+            def build():
+                built.append(name)
+                page = Page(name=name)
+                page[0] = HeavyKey(name)
+                return page
+            return build
+
+        pm = PageManager(page_budget=1500)
+        for name in ("A", "B", "C"):
+            pm.add_page(name, factory(name))
+        self.assertEqual(built, [])
+        self.assertTrue(pm.has_page("A"))
+        self.assertFalse(pm.switch_to("Missing"))
+
+        self.assertTrue(pm.switch_to("A"))
+        self.assertEqual(pm.get_current_page().name, "A")
+        pm.switch_to("B")
+        self.assertEqual(unmounted, [])  # A (1000 bytes) still fits the budget
+        pm.switch_to("C")
+        self.assertEqual(unmounted, ["A"])  # A + B exceed it: least recently used goes
+        self.assertNotIn("A", pm.pages)
+        pm.switch_to("A")
+        self.assertEqual(built, ["A", "B", "C", "A"])
+        self.assertFalse(pm.unload_page("A"))  # Active page stays loaded
+        self.assertFalse(pm.unload_page("Main"))  # Eager pages cannot be rebuilt
+
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        pad.add_page("Lazy", factory("Lazy"))
+        self.assertTrue(pad.switch_to_page("Lazy"))
+        self.assertEqual(pad[0].label, "Lazy")
+
+        # Replacing a loaded lazy page unmounts its keys; the active one after the new page is shown
+        pm.switch_to("B")
+        unmounted.clear()
+        pm.add_page("A", factory("A2"))
+        pm.get_page("A")
+        pm.add_page("A", Page(name="A3"))  # An eager page replacing a loaded lazy one
+        self.assertEqual(unmounted, ["A", "A2"])
+        old_key = pad[0]
+        with mock.patch.object(pad, "_show_page", side_effect=lambda page: unmounted.append("shown")):
+            pad.add_page("Lazy", factory("Lazy2"))
+        self.assertEqual(unmounted, ["A", "A2", "shown", "Lazy"])
+        self.assertIsNot(pad[0], old_key)
+        self.assertEqual(pad[0].label, "Lazy2")
+
+    def test_page_snapshot_budget_evicts_inactive_pages(self):
+        pm = PageManager(snapshot_budget=50000)
+        pages = []
+        for name in ("A", "B"):
+            page = Page(name=name)
+            page[0] = LabelKey(name)
+            page.store_snapshot(0, page[0], bytes(31212))
+            pm.add_page(name, page)
+            pages.append(page)
+        pm.switch_to("A")
+        pm.note_snapshot(pages[1])
+        pm.note_snapshot(pages[0])
+        self.assertEqual(pages[0].snapshot_bytes, 31212)
+        self.assertEqual(pages[1].snapshot_bytes, 0)
+
+    def test_run_loop_sleeps_until_redraw_request(self):
+        import threading
+
+        class IdleKey(CountingKey):
+            ticks = 0
+
+            def on_tick(self):
+                self.ticks += 1
+
+            def next_wakeup(self):
+                return None
+
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        key = IdleKey("Idle")
+        pad[0] = key
+        loop = threading.Thread(target=pad.run, kwargs={"poll_timeout": 5})
+        loop.start()
+        try:
+            time.sleep(0.2)
+            self.assertEqual(key.renders, 1)
+            self.assertEqual(key.ticks, 1)
+
+            # A redraw requested from another thread wakes the sleeping loop
+            threading.Thread(target=key.request_redraw).start()
+            deadline = time.time() + 2.0
+            while key.renders < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(key.renders, 2)
+            self.assertEqual(key.ticks, 1)
+        finally:
+            pad.stop()
+            loop.join(timeout=2.0)
+        self.assertFalse(loop.is_alive())
+
+    def test_page_timeout_deadline(self):
+        pm = PageManager()
+        pm.add_page("Idle", Page(name="Idle", timeout_mode="idle", timeout_seconds=5, timeout_target="Main"))
+        self.assertIsNone(pm.next_timeout_deadline())
+        pm.switch_to("Idle")
+        self.assertAlmostEqual(pm.next_timeout_deadline(), pm.last_activity_time + 5)
+        self.assertIsNone(pm.check_timeout())
+        pm.last_activity_time -= 6
+        self.assertEqual(pm.check_timeout(), "Main")
+
+    def test_async_hooks_are_scheduled_not_awaited(self):
+        import threading
+        done = threading.Event()
+
+        class AsyncKey(CountingKey):
+            async def on_press(self):
+                self.press_thread = threading.current_thread()
+                done.set()
+
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        key = AsyncKey("A")
+        pad[0] = key
+        pad._dispatch_input({'pressed': [0], 'released': [], 'current': [0]}, time.time())
+        self.assertTrue(done.wait(2.0))
+        self.assertIsNot(key.press_thread, threading.current_thread())
+
+    def test_finished_hook_does_not_untrack_a_newer_one(self):
+        from concurrent.futures import Future
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        key = CountingKey("A")
+        older, newer = Future(), Future()
+        pad._track_hook(key, "on_tick", older)
+        pad._track_hook(key, "on_tick", newer)
+        older.set_result(None)
+        self.assertTrue(pad._hook_pending(key, "on_tick"))
+        newer.set_result(None)
+        self.assertEqual(pad._pending_hooks, {})
+
+    def test_run_async_resolves_async_render_state(self):
+        import asyncio
+
+        class StatusKey(CountingKey):
+            tick_interval = 0.01
+
+            seen = None
+
+            async def render_state(self):
+                await asyncio.sleep(0)
+                return "online"
+
+            def render(self, ctx):
+                self.seen = self.current_render_state()
+                super().render(ctx)
+
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        key = StatusKey("S")
+        pad[0] = key
+
+        async def scenario():
+            task = asyncio.create_task(pad.run_async(poll_timeout=5))
+            for _ in range(200):
+                if key.seen == "online":
+                    break
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        # The resolved state is rendered without being awaited in the render path
+        self.assertEqual(key.seen, "online")
+
+    def test_async_render_state_refreshes_every_render_state_interval(self):
+        class StatusKey(Key):
+            calls = 0
+
+            async def render_state(self):
+                self.calls += 1
+                return self.calls
+
+            def render(self, ctx):
+                pass
+
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        key = StatusKey()
+        pad[0] = key
+        now = time.time()
+
+        def tick(at):
+            pad._tick_and_render(at)
+            pending = pad._pending_hooks.get((id(key), "render_state"))
+            if pending is not None:
+                pending.result(timeout=5)
+
+        # One second of 50 Hz ticks refreshes the state once, not fifty times
+        for i in range(50):
+            tick(now + i * 0.02)
+        self.assertEqual(key.calls, 1)
+        self.assertEqual(key.next_wakeup(), now + key.render_state_interval)
+        tick(now + key.render_state_interval)
+        self.assertEqual(key.calls, 2)
+
+    def test_action_executor_policies_serialize_per_key(self):
+        import threading
+        from displaypad_lib import ActionExecutor
+
+        release = threading.Event()
+        lock = threading.Lock()
+        runs = []
+        active = []
+        max_active = [0]
+
+        def handler(tag):
+            with lock:
+                active.append(tag)
+                max_active[0] = max(max_active[0], len(active))
+            release.wait(2.0)
+            with lock:
+                runs.append(tag)
+                active.remove(tag)
+
+        executor = ActionExecutor(max_workers=4, slow_threshold=10.0)
+        self.addCleanup(executor.shutdown)
+        for policy, expected in (("queue", [0, 1, 2]), ("drop", [0]), ("latest", [0, 2])):
+            runs.clear()
+            release.clear()
+            for tag in range(3):
+                executor.submit("key", policy, handler, tag, policy=policy)
+            release.set()
+            deadline = time.time() + 2.0
+            while (len(runs) < len(expected) or active) and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            self.assertEqual(runs, expected, policy)
+        # Handlers of the same key never overlapped
+        self.assertEqual(max_active[0], 1)
+
+        report = executor.report()
+        self.assertEqual(report["drop"]["dropped"], 2)
+        self.assertEqual(report["latest"]["dropped"], 1)
+        self.assertEqual(report["queue"]["calls"], 3)
+
+    def test_background_hook_does_not_block_dispatch(self):
+        import threading
+        from displaypad_lib import background
+        started = threading.Event()
+        release = threading.Event()
+
+        class SlowKey(CountingKey):
+            @background(policy="drop")
+            def on_press(self):
+                started.set()
+                release.wait(2.0)
+
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        self.addCleanup(release.set)
+        pad[0] = SlowKey("Slow")
+        pad._dispatch_input({'pressed': [0], 'released': [], 'current': [0]}, time.time())
+        self.assertTrue(started.wait(2.0))
+        release.set()
+
+    def test_stats_snapshot_and_prometheus_export(self):
+        import tempfile
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        pad[0] = CountingKey("A")
+        pad[1] = CountingKey("B")
+        pad.update(0)
+        pad[1].request_redraw()
+        pad.update(0)
+
+        stats = pad.stats()
+        self.assertEqual(stats['keys']['Main/0']['redraws'], 1)
+        self.assertEqual(stats['keys']['Main/1']['redraws'], 2)
+        self.assertEqual(stats['keys']['Main/1']['render']['count'], 2)
+        self.assertEqual(stats['keys']['Main/1']['key'], "CountingKey")
+        self.assertEqual(stats['pages']['Main']['redraws'], 3)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "displaypad.prom")
+            pad.perf.write_prometheus(path)
+            with open(path) as f:
+                text = f.read()
+        self.assertIn('displaypad_key_render_seconds_count{page="Main",slot="1",key="CountingKey"} 2', text)
+        self.assertIn('# TYPE displaypad_key_skipped_frames_total counter', text)
+
+    def test_export_stats_replaces_the_previous_exporter(self):
+        import tempfile
+        import threading
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+
+        def exporters():
+            return [t for t in threading.enumerate() if t.name == "displaypad-stats"]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pad.export_stats(os.path.join(tmp, "a.prom"), interval=0.01)
+            pad.export_stats(os.path.join(tmp, "b.prom"), interval=0.01)
+            self.assertEqual(len(exporters()), 1)
+            time.sleep(0.05)
+            pad.disable()
+            self.assertEqual(exporters(), [])
+            self.assertTrue(os.path.exists(os.path.join(tmp, "b.prom")))
+
+    def test_offscreen_driver_records_frames(self):
+        import tempfile
+        from displaypad_lib import DisplayPad, FrameRecorder, OffscreenDriver, read_raw_frames, run_offscreen
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_path = os.path.join(tmp, "frames.raw")
+            pad = DisplayPad(driver=OffscreenDriver(FrameRecorder(raw_path, fmt="raw")), collect_stats=False)
+            self.addCleanup(pad.disable)
+            key = DummyKey()
+            pad[0] = key
+            pad.driver.press(0)
+            report = run_offscreen(pad, frames=5, force_redraw=True, budget=10.0)
+            pad.disable()
+
+            self.assertTrue(key.pressed)
+            self.assertEqual(report.frames, 5)
+            self.assertEqual(report.over_budget, [])
+            # Initial full panel, then one tile per frame for the forced redraws
+            self.assertGreaterEqual(report.tiles, 12 + 1)
+            tiles = list(read_raw_frames(raw_path))
+            self.assertEqual(len(tiles), report.tiles)
+            self.assertEqual(len(tiles[0].bgr), 102 * 102 * 3)
+            self.assertEqual(pad.driver.recorder.panel.getpixel((2, 2)), (255, 0, 0))
+            self.assertEqual([t.key_index for t in tiles[:12]], list(range(12)))
+            self.assertEqual(tiles, pad.driver.recorder.tiles)
+
+    def test_press_latency_trace_reaches_upload(self):
+        from displaypad_lib.stats import Histogram
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        key = CountingKey("A")
+        key.on_press = key.request_redraw
+        pad[0] = key
+        pad.update(0)
+
+        read_at = time.perf_counter()
+        pad._dispatch_input({'pressed': [0], 'released': [], 'current': [0], 'timestamp': read_at}, time.time())
+        pad._tick_and_render(time.time())
+        pad.flush()
+
+        latency = pad.stats()['keys']['Main/0']['latency']
+        self.assertEqual(latency['count'], 1)
+        self.assertGreater(latency['max'], 0)
+        self.assertEqual(set(latency['stages']), {"dispatch", "redraw", "render", "queued", "upload"})
+        self.assertEqual(latency['stages']['upload']['count'], 1)
+        self.assertEqual(pad._traces, {})
+
+        # A press that never redraws its key does not produce a sample
+        pad._dispatch_input({'pressed': [1], 'released': [], 'current': [1]}, time.time())
+        pad._tick_and_render(time.time())
+        self.assertEqual(pad.stats()['keys'].get('Main/1', {}).get('latency', {}).get('count', 0), 0)
+
+        hist = Histogram((0.01, 0.02))
+        for value in (0.005, 0.015, 0.015, 0.05):
+            hist.add(value)
+        self.assertAlmostEqual(hist.percentile(50), 0.015)
+        self.assertEqual(hist.percentile(99), 0.05)
+        self.assertIn('displaypad_key_press_latency_seconds_bucket{page="Main",slot="0",key="CountingKey",le="+Inf"} 1',
+                      pad.perf.to_prometheus())
+
+    def test_press_trace_expires_before_an_unrelated_redraw(self):
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        pad.trace_timeout = 0.02
+        key = CountingKey("A")  # on_press does not redraw
+        pad[0] = key
+        pad.update(0)
+
+        pad._dispatch_input({'pressed': [0], 'released': [], 'current': [0]}, time.time())
+        time.sleep(0.05)
+        key.request_redraw()  # e.g. a status change, long after the press
+        pad._tick_and_render(time.time())
+        pad.flush()
+        self.assertEqual(pad.stats()['keys']['Main/0'].get('latency', {}).get('count', 0), 0)
+        self.assertEqual(pad._traces, {})
+
+    def test_media_key_streams_with_bounded_prefetch_and_drops_late_frames(self):
+        from displaypad_lib import MediaKey
+        frames = (Image.new("RGB", (300, 200), (i % 256, 0, 0)) for i in range(200))
+        key = MediaKey(frames, fps=200, loop=False, prefetch=3)
+        self.addCleanup(key.close)
+        key.start()
+        time.sleep(0.05)
+        self.assertLessEqual(key._frames.qsize(), 3)
+        self.assertEqual(key.shown_frames, 0)
+
+        deadline = time.time() + 10
+        while key.is_playing and time.time() < deadline:
+            key.on_tick()
+            time.sleep(0.02)  # Slower than the clip: most frames must be dropped
+        self.assertFalse(key.is_playing)
+        self.assertGreater(key.dropped_frames, 100)
+        self.assertEqual(key.shown_frames + key.dropped_frames, 200)
+        self.assertEqual(key._current.size, (102, 102))
+
+        ctx = KeyContext(width=102, height=102, image=Image.new("RGB", (102, 102)))
+        key.render(ctx)
+        self.assertEqual(ctx.image.getpixel((50, 50)), key._current.getpixel((50, 50)))
+
+    def test_media_key_restarts_cleanly_after_unmount(self):
+        from displaypad_lib import MediaKey
+        key = MediaKey([Image.new("RGB", (102, 102), (i * 20, 0, 0)) for i in range(10)], fps=10, loop=False)
+        self.addCleanup(key.close)
+        deadline = time.time() + 5
+        while key.shown_frames < 2 and time.time() < deadline:
+            key.on_tick()
+            time.sleep(0.01)
+        old_stop = key._stop
+        key._clock_start -= 2.0  # As if the page was left for 2 s before unmounting
+        key.on_unmount()
+        self.assertTrue(old_stop.is_set())
+        self.assertIsNone(key._current)
+
+        key.shown_frames = key.dropped_frames = 0
+        deadline = time.time() + 5
+        while key.is_playing and time.time() < deadline:
+            key.on_tick()
+            time.sleep(0.01)
+        self.assertIsNot(key._stop, old_stop)  # The new decoder has its own stop event
+        self.assertEqual((key.shown_frames, key.dropped_frames), (10, 0))
+
+    def test_animation_clock_skips_late_frames_and_keeps_keys_in_sync(self):
+        from displaypad_lib import AnimationClock, GifKey, PreparedImage
+        now = [100.0]
+        clock = AnimationClock(lambda: now[0])
+        frames = [(PreparedImage(Image.new("RGB", (102, 102), color)), 0.1) for color in ("red", "green", "blue")]
+        key = GifKey(frames, clock=clock)
+        self.assertEqual(key.current_frame_idx, 0)
+
+        # Ticks 15 ms late every frame: the lateness does not add up
+        for tick in range(1, 11):
+            now[0] = 100.0 + tick * 0.115
+            key.on_tick()
+        self.assertEqual((key._frame, key.current_frame_idx, key.skipped_frames), (11, 2, 1))
+
+        # A slow tick skips frames instead of slowing the animation down
+        now[0] = 101.55
+        key.on_tick()
+        self.assertEqual((key.current_frame_idx, key.skipped_frames), (0, 4))
+        self.assertAlmostEqual(key.next_wakeup() - time.time(), 0.05, places=2)
+
+        # A key created later (e.g. on another page) shows the same frame
+        late = GifKey(frames, clock=clock)
+        self.assertEqual(late.current_frame_idx, key.current_frame_idx)
+        now[0] = 101.95
+        key.on_tick()
+        late.on_tick()
+        self.assertEqual((key.current_frame_idx, late.current_frame_idx), (1, 1))
+
+    def test_pack_key_uploads_precompiled_tiles(self):
+        import tempfile
+        from displaypad_driver.image import bgr102_to_image
+        from displaypad_driver.pack import write_pack
+        from displaypad_lib import PackKey
+        from displaypad_lib.clock import AnimationClock
+        now = [0.0]
+        clock = AnimationClock(lambda: now[0])
+        red = Image.new("RGB", (102, 102), (255, 0, 0)).tobytes("raw", "BGR")
+        blue = Image.new("RGB", (102, 102), (0, 0, 255)).tobytes("raw", "BGR")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blink.dpak")
+            write_pack(path, [[red], [blue]], [50, 50])
+            pad = make_pad(collect_stats=False)
+            self.addCleanup(pad.disable)
+            key = PackKey(path, clock=clock)
+            self.addCleanup(key.pack.close)
+            decode = mock.patch("displaypad_lib.displaypad.bgr102_to_image", wraps=bgr102_to_image)
+            with mock.patch.object(PackKey, "render") as render, decode as decoded:
+                pad[0] = key
+                pad.update(0)
+                now[0] = 0.05
+                pad.update(0)
+                pad.flush()
+                decoded.assert_not_called()  # Uploaded as-is, decoded once image_buffer is read
+                self.assertEqual(pad.image_buffer.getpixel((5, 5)), (0, 0, 255))
+                self.assertEqual(decoded.call_count, 1)
+            render.assert_not_called()
+            self.assertEqual(key.current_frame_idx, 1)
+            self.assertEqual(bytes(pad.driver.panels[-1][0]), red)
+            self.assertEqual(bytes(pad.driver.buttons[-1][1]), blue)
+            self.assertEqual(pad.image_buffer.getpixel((5, 5)), (0, 0, 255))
+
+            # A pad with another rotation decodes the pack instead
+            rotated = make_pad(rotation=90, collect_stats=False)
+            self.addCleanup(rotated.disable)
+            rotated[0] = PackKey(key.pack, clock=clock)
+            now[0] = 0.1
+            rotated.update(0)
+            self.assertEqual(rotated.image_buffer.getpixel((5, 5)), (255, 0, 0))
+
+            panel_path = os.path.join(tmp, "splash.dpak")
+            write_pack(panel_path, [[blue] * 12], [0], kind="panel")
+            with decode as decoded:
+                pad.push_image(panel_path)
+            decoded.assert_not_called()
+            self.assertEqual([bytes(t) for t in pad.driver.panels[-1]], [blue] * 12)
+            self.assertEqual(pad.image_buffer.getpixel((600, 200)), (0, 0, 255))
+
+    def test_panel_animation_uploads_only_changed_tiles(self):
+        from displaypad_lib import PanelAnimation
+        black = bytes(102 * 102 * 3)
+        frames = []
+        for i in range(4):
+            frame = [bytes(bytearray(black)) for _ in range(12)]  # Equal but distinct objects
+            frame[0] = bytes([i + 1]) * (102 * 102 * 3)
+            if i == 2:
+                frame[5] = bytes([9]) * (102 * 102 * 3)
+            frames.append(frame)
+        anim = PanelAnimation(frames, [0.1] * 4)
+        self.assertEqual(anim.changed[1], {0})
+        self.assertEqual(anim.changed[2], {0, 5})
+        self.assertEqual(anim.changed[0], {0})  # Loop from the last frame back to the first
+        self.assertIs(anim.frames[3][7], anim.frames[0][7])
+        # Frame 0, tile 0 of frames 1-3, tile 5 of frames 2 and 3
+        self.assertEqual(anim.tile_bytes, (12 + 3 + 2) * 102 * 102 * 3)
+
+        from displaypad_lib import AnimationClock
+        clock_now = [0.0]
+        clock = AnimationClock(lambda: clock_now[0])
+        pad = make_pad(collect_stats=False)
+        self.addCleanup(pad.disable)
+        pad[0] = CountingKey("A")
+        pad.play_animation(anim, clock=clock)
+        pad._tick_and_render(time.time())
+        pad.flush()
+        self.assertEqual(sorted(idx for idx, _ in pad.driver.buttons), list(range(12)))
+        self.assertEqual(pad[0].renders, 0)
+
+        pad.driver.buttons.clear()
+        clock_now[0] = 0.15
+        pad._tick_and_render(time.time())
+        pad.flush()
+        self.assertEqual([idx for idx, _ in pad.driver.buttons], [0])
+
+        # Falling behind skips frames 2 and 3 but still applies tile 5's change and revert
+        pad.driver.buttons.clear()
+        clock_now[0] = 0.45
+        pad._tick_and_render(time.time())
+        pad.flush()
+        self.assertEqual([idx for idx, _ in pad.driver.buttons], [0, 5])
+        self.assertEqual(pad.driver.buttons[0][1], frames[0][0])
+        self.assertAlmostEqual(pad._next_deadline(1.0), time.time() + 0.05, places=2)
+
+        pad.stop_animation()
+        pad._tick_and_render(time.time())
+        self.assertEqual(pad[0].renders, 1)
+        self.assertIsNone(anim.frame_at(0.5, loop=False))
+
+    def test_page_switch_during_animation_waits_for_it_to_end(self):
+        from displaypad_lib import AnimationClock, PanelAnimation
+        frames = [[bytes([i + 1]) * (102 * 102 * 3)] * 12 for i in range(2)]
+        pad = make_pad(collect_stats=False)
+        self.addCleanup(pad.disable)
+        other = Page("Other")
+        other[0] = CountingKey("B")
+        pad.add_page("Other", other)
+        clock_now = [0.0]
+        pad.play_animation(PanelAnimation(frames, [0.1, 0.1]), clock=AnimationClock(lambda: clock_now[0]))
+        pad._tick_and_render(time.time())
+        pad.flush()
+
+        pad.switch_to_page("Other")
+        pad.driver.buttons.clear()
+        clock_now[0] = 0.15
+        pad._tick_and_render(time.time())
+        pad.flush()
+        self.assertEqual(pad.driver.panels, [])
+        self.assertEqual(other[0].renders, 0)
+        self.assertEqual([bgr for _, bgr in pad.driver.buttons], [frames[1][0]] * 12)
+
+        pad.stop_animation()
+        pad._tick_and_render(time.time())
+        pad.flush()
+        self.assertEqual(other[0].renders, 1)
+
+    def test_shared_framebuffer_uploads_committed_tiles_at_bounded_rate(self):
+        import tempfile
+        from displaypad_lib import SharedFramebuffer
+        from displaypad_driver.image import image_to_bgr102
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "panel.fb")
+        pad = make_pad(collect_stats=False)
+        self.addCleanup(pad.disable)
+        pad[0] = CountingKey("A")
+        framebuffer = pad.attach_framebuffer(SharedFramebuffer(path, create=True), fps=10)
+        self.addCleanup(framebuffer.close)
+        producer = SharedFramebuffer(path)
+        self.addCleanup(producer.close)
+
+        now = time.time()
+        pad._tick_and_render(now)  # First check shows the whole panel
+        pad.flush()
+        self.assertEqual(sorted(idx for idx, _ in pad.driver.buttons), list(range(12)))
+        self.assertEqual(pad[0].renders, 0)
+
+        # A patch across tiles 1/2/7/8, then a commit of tile 11 before the pad looks again
+        self.assertEqual(producer.write(Image.new("RGB", (40, 40), (255, 0, 0)), (190, 90)),
+                         (1 << 1) | (1 << 2) | (1 << 7) | (1 << 8))
+        producer.commit([11])
+        pad.driver.buttons.clear()
+        pad._tick_and_render(now + 0.05)  # Within the 10 fps interval
+        pad.flush()
+        self.assertEqual(pad.driver.buttons, [])
+        self.assertAlmostEqual(pad._next_deadline(1.0), now + 0.1, places=3)
+
+        pad._tick_and_render(now + 0.1)
+        pad.flush()
+        self.assertEqual([idx for idx, _ in pad.driver.buttons], [1, 2, 7, 8, 11])
+        expected = Image.new("RGB", (102, 102))
+        expected.paste((255, 0, 0), (88, 90, 102, 102))
+        self.assertEqual(pad.driver.buttons[0][1], image_to_bgr102(expected))
+        pad._tick_and_render(now + 0.2)
+        self.assertEqual(producer.seq, 2)
+        self.assertEqual(framebuffer.take_dirty(), 0)
+
+        # A page switch leaves the panel to the framebuffer until it is detached
+        other = Page("Other")
+        other[0] = CountingKey("B")
+        pad.add_page("Other", other)
+        pad.switch_to_page("Other")
+        pad._tick_and_render(now + 0.3)
+        self.assertEqual(pad.driver.panels, [])
+        self.assertEqual(other[0].renders, 0)
+        pad.detach_framebuffer()
+        pad._tick_and_render(now + 0.4)
+        self.assertEqual(other[0].renders, 1)
+
+        bad = os.path.join(tmp.name, "bad.fb")
+        with open(bad, "wb") as f:
+            f.write(bytes(400000))
+        with self.assertRaises(ValueError):
+            SharedFramebuffer(bad)
+
+        pad.detach_framebuffer()
+        pad._tick_and_render(time.time())
+        self.assertEqual(pad[0].renders, 1)
+
+    def test_split_gif_to_tiles_shares_unchanged_tiles(self):
+        import tempfile
+        from displaypad_driver.image import split_gif_to_tiles
+        frames = [Image.new("RGB", (612, 204)) for _ in range(3)]
+        for i, frame in enumerate(frames):
+            frame.paste((255, 255 * (i % 2), 0), (0, 0, 102, 102))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "boot.gif")
+            frames[0].save(path, save_all=True, append_images=frames[1:], duration=50, loop=0)
+            tiles = split_gif_to_tiles(path)
+        self.assertIs(tiles[11][0][0], tiles[11][2][0])
+        self.assertIs(tiles[0][0][0], tiles[0][2][0])
+        self.assertIsNot(tiles[0][0][0], tiles[0][1][0])
+
+    def test_asset_registry_shares_and_releases_images(self):
+        import gc
+        import tempfile
+        from displaypad_lib import AssetRegistry, GifKey
+        from displaypad_lib.assets import source_key
+        registry = AssetRegistry(retain_bytes=0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "back.png")
+            Image.new("RGB", (200, 100), (0, 255, 0)).save(path)
+            keys = [IconKey(path, registry=registry) for _ in range(10)]
+            self.assertTrue(all(k.pil_image is keys[0].pil_image for k in keys))
+            self.assertEqual(registry.report()['misses'], 1)
+
+            ctx = KeyContext(width=102, height=102, image=Image.new("RGB", (102, 102)))
+            for key in keys:
+                key.render(ctx)
+            self.assertIs(keys[0]._fitted, keys[9]._fitted)
+            report = registry.report()
+            self.assertEqual(report['entries'], 2)  # RGBA original + fitted copy
+            self.assertEqual(report['bytes'], 200 * 100 * 4 + 82 * 41 * 3)  # Opaque: prepared without mask
+
+            # Same image content from memory is found by hash; a changed file is a new entry
+            same = IconKey(Image.new("RGB", (200, 100), (0, 255, 0)), registry=registry)
+            other = IconKey(Image.new("RGB", (200, 100), (0, 0, 255)), registry=registry)
+            self.assertIs(same.pil_image, IconKey(same.pil_image.convert("RGB"), registry=registry).pil_image)
+            self.assertIsNot(same.pil_image, other.pil_image)
+            os.utime(path, ns=(0, 0))
+            self.assertIsNot(IconKey(path, registry=registry).pil_image, keys[0].pil_image)
+            # An opened image is identified by its content, even if it was modified in place
+            opened = Image.open(path)
+            first = IconKey(opened, registry=registry).pil_image
+            opened.load()
+            opened.paste((255, 0, 0), (0, 0, 10, 10))
+            self.assertIsNot(IconKey(opened, registry=registry).pil_image, first)
+
+            del keys, key, same, other, opened, first
+            gc.collect()
+            self.assertEqual(registry.report()['entries'], 0)
+
+            frames = [Image.new("RGB", (20, 20), c) for c in ("red", "blue")]
+            gif_path = os.path.join(tmp, "a.gif")
+            frames[0].save(gif_path, save_all=True, append_images=frames[1:], duration=50, loop=0)
+            self.assertIs(GifKey(gif_path, registry=registry).frames, GifKey(gif_path, registry=registry).frames)
+
+            # Animations that differ only after their first frame are not confused
+            other_path = os.path.join(tmp, "b.gif")
+            frames[0].save(other_path, save_all=True, append_images=[frames[0]], duration=50, loop=0)
+            with Image.open(gif_path) as a, Image.open(other_path) as b:
+                self.assertNotEqual(source_key(a), source_key(b))
+                self.assertEqual(a.tell(), 0)
+
+    def test_prepared_image_pastes_like_plain_image(self):
+        from displaypad_lib import GifKey, PreparedImage
+        from PIL import ImageDraw
+        icon = Image.new("RGBA", (200, 100), (0, 0, 0, 0))
+        ImageDraw.Draw(icon).ellipse([0, 0, 199, 99], fill=(200, 30, 90, 180))
+        prepared = PreparedImage.fit(icon, (82, 82))
+        self.assertEqual((prepared.size, prepared.rgb.mode, prepared.mask.mode), ((82, 41), "RGB", "L"))
+        self.assertIsNone(PreparedImage(Image.new("RGB", (10, 10))).mask)  # Opaque: plain paste
+
+        plain, fast = KeyContext(), KeyContext()
+        plain.paste_image(icon.resize((82, 41), Image.LANCZOS), 10, 30)
+        fast.paste_image(prepared, 10, 30)
+        self.assertEqual(plain.image.tobytes(), fast.image.tobytes())
+
+        # Keys show prepared images as given
+        ctx = KeyContext()
+        IconKey(prepared).render(ctx)
+        self.assertEqual(ctx.image.tobytes(), fast.image.tobytes())
+        key = GifKey([(prepared, 0.1), (PreparedImage(Image.new("RGB", (102, 102), "blue")), 0.1)])
+        key.current_frame_idx = 1
+        key.render(ctx)
+        self.assertEqual(ctx.image.getpixel((50, 50)), (0, 0, 255))
+        self.assertEqual(key.resource_bytes(), 82 * 41 * 4 + 102 * 102 * 3)
+
+    def test_process_key_renders_in_worker_process(self):
+        from displaypad_driver.image import image_to_bgr102
+        from displaypad_lib import ProcessKey
+        inner = PidKey()
+        key = ProcessKey(inner)
+        self.addCleanup(key.close)
+        pad = make_pad()
+        self.addCleanup(pad.disable)
+        pad[0] = key
+
+        pad.update(0)  # Job submitted; nothing finished yet
+        self.assertEqual(pad.image_buffer.getpixel((50, 50)), (0, 0, 0))
+        deadline = time.time() + 10
+        while key.renders < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        pad.update(0)
+        self.assertEqual(key.renders, 1)
+        self.assertEqual(pad.image_buffer.getpixel((50, 50)), (0, 200, 0))
+        self.assertNotEqual(inner.rendered_in, os.getpid())  # Never rendered here
+
+        inner.level = 100  # render_state changes: new frame from the worker
+        inner.request_redraw()
+        pad.update(0)
+        while key.renders < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        pad.update(0)
+        pad.flush()
+        self.assertEqual(pad.image_buffer.getpixel((50, 50)), (0, 100, 0))
+        # Uploaded straight from the frame the worker drew into
+        self.assertEqual(pad.driver.buttons[-1], (0, image_to_bgr102(key._frames[key._shown])))
+
+        key.close()
+        self.assertIsNone(key._process)
+
+    def test_icon_key_can_be_sent_to_a_worker_process(self):
+        import pickle
+        from displaypad_lib.assets import AssetRegistry
+        from displaypad_lib.process import _pickle_key
+
+        key = IconKey(Image.new("RGB", (40, 40), "red"), registry=AssetRegistry())
+        clone = pickle.loads(_pickle_key(key))
+        ctx = KeyContext()
+        clone.render(ctx)
+        self.assertEqual(ctx.image.getpixel((50, 50)), (255, 0, 0))
+
+    def test_daemon_applies_client_batches_and_sends_events(self):
+        import tempfile
+        import threading
+        from displaypad_lib import DaemonError, DisplayPad, DisplayPadClient, DisplayPadDaemon, OffscreenDriver
+        from displaypad_driver.image import image_to_bgr102
+
+        driver = OffscreenDriver()
+        pad = DisplayPad(driver=driver)
+        self.addCleanup(pad.disable)
+        tmp = tempfile.mkdtemp()
+        daemon = DisplayPadDaemon(pad=pad, path=os.path.join(tmp, "pad.sock"))
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        daemon.start()
+        thread.start()
+        self.addCleanup(thread.join, 2.0)
+        self.addCleanup(daemon.close)
+
+        with DisplayPadClient(daemon.path) as client:
+            with client.batch():
+                client.set_tile(0, image_to_bgr102(Image.new("RGB", (102, 102), (255, 0, 0))))
+                client.set_label(1, "Hi", bg="blue")
+                client.set_image(2, Image.new("RGB", (30, 30), (0, 255, 0)))
+            with self.assertRaises(DaemonError):
+                with client.batch():
+                    client.set_label(3, "never shown")
+                    client.set_tile(4, b"short")
+            self.assertIsNone(daemon.keys[3].content)  # Rejected batches apply nothing
+
+            deadline = time.time() + 5
+            while pad.image_buffer.getpixel((51 + 102 * 2, 51)) != (0, 255, 0) and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(pad.image_buffer.getpixel((51, 51)), (255, 0, 0))
+            self.assertEqual(pad.image_buffer.getpixel((104, 2)), (0, 0, 255))
+            self.assertEqual(pad.image_buffer.getpixel((51 + 102 * 2, 51)), (0, 255, 0))
+
+            client.subscribe(("press",))
+            driver.press(5)
+            self.assertEqual(client.next_event(timeout=5), {"event": "press", "slot": 5})
+            driver.release(5)
+            self.assertIsNone(client.next_event(timeout=0.2))  # Not subscribed to releases
+
+
+    def test_daemon_broadcast_does_not_wait_for_stalled_clients(self):
+        import tempfile
+        from displaypad_lib import DisplayPadClient, DisplayPadDaemon
+        from displaypad_lib.daemon import EVENT_BACKLOG
+        daemon = DisplayPadDaemon(pad=make_pad(collect_stats=False), path=os.path.join(tempfile.mkdtemp(), "pad.sock"))
+        self.addCleanup(daemon.pad.disable)
+        daemon.start()
+        self.addCleanup(daemon.close)
+        stalled = DisplayPadClient(daemon.path)  # Subscribes, then never reads
+        self.addCleanup(stalled.close)
+        stalled.subscribe(("press",))
+
+        start = time.time()
+        sent = 0
+        while daemon._clients and time.time() - start < 10:
+            daemon.broadcast("press", 0)
+            sent += 1
+        self.assertEqual(daemon._clients, {})  # Dropped once its backlog was full
+        self.assertGreater(sent, EVENT_BACKLOG)
+
+
+    def test_daemon_batches_never_land_mid_tick(self):
+        import tempfile
+        import threading
+        from displaypad_lib import DisplayPadDaemon
+        daemon = DisplayPadDaemon(pad=make_pad(collect_stats=False), path=os.path.join(tempfile.mkdtemp(), "pad.sock"))
+        self.addCleanup(daemon.pad.disable)
+        ops = [{"op": "label", "slot": idx, "text": "new"} for idx in range(3)]
+        with daemon.pad.render_lock:  # A tick is rendering
+            applier = threading.Thread(target=daemon.apply, args=(ops,))
+            applier.start()
+            applier.join(0.1)
+            self.assertEqual([key.content for key in daemon.keys[:3]], [None] * 3)
+        applier.join(2.0)
+        self.assertEqual([key.content[1] for key in daemon.keys[:3]], ["new"] * 3)
+
+
+class PidKey(Key):
+    """Module-level so a spawned worker process can unpickle it."""
+
+    def __init__(self):
+        super().__init__()
+        self.level = 200
+        self.rendered_in = None
+
+    def render_state(self):
+        return self.level
+
+    def render(self, ctx: KeyContext):
+        self.rendered_in = os.getpid()
+        ctx.fill((0, self.current_render_state(), 0))
+
 
 if __name__ == '__main__':
     unittest.main()